@@ -0,0 +1,101 @@
+import io
+import os
+import sys
+import time
+import shutil
+import zipfile
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Run from the repo root: python benchmarks/bench_download.py [--months 3 --rows 2000000]
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scripts.download_data import ingest, archive_name, SYMBOL
+
+def write_fixture(path, rows, seed):
+    """A zip laid out like data.binance.vision: id,price,qty,quote_qty,time,is_buyer_maker,is_best_match"""
+    rng = np.random.default_rng(seed)
+    price = np.round(42000 + np.cumsum(rng.normal(0, 2, rows)), 2)
+    qty = np.round(rng.exponential(0.01, rows), 5)
+    time_ms = 1704067200000 + np.cumsum(rng.integers(0, 40, rows))
+    ibm = np.where(rng.random(rows) < 0.5, "True", "False")
+    lines = io.StringIO()
+    pd.DataFrame({
+        'id': np.arange(rows), 'price': price, 'qty': qty, 'q_qty': np.round(price * qty, 8),
+        'time': time_ms, 'ibm': ibm, 'ibm2': "True",
+    }).to_csv(lines, header=False, index=False)
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as z:
+        z.writestr(os.path.basename(path).replace('.zip', '.csv'), lines.getvalue())
+
+def legacy_month(zip_path, output):
+    """The old download_data.py path: whole zip in RAM, pandas chunks, one month at a time"""
+    with open(zip_path, 'rb') as f:
+        z = zipfile.ZipFile(io.BytesIO(f.read()))
+    with z.open(z.namelist()[0]) as f:
+        writer = None
+        for chunk in pd.read_csv(f, names=["id", "price", "qty", "q_qty", "time", "ibm", "ibm2"], chunksize=500000):
+            df_chunk = chunk[['time', 'price', 'qty', 'ibm']].copy()
+            df_chunk['time'] = df_chunk['time'].astype('uint64')
+            df_chunk['price'] = df_chunk['price'].astype('float32')
+            df_chunk['qty'] = df_chunk['qty'].astype('float32')
+            table = pa.Table.from_pandas(df_chunk)
+            if writer is None:
+                writer = pq.ParquetWriter(output, table.schema)
+            writer.write_table(table)
+        writer.close()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--months", type=int, default=3)
+    parser.add_argument("--rows", type=int, default=2000000, help="trades per month")
+    parser.add_argument("--workers", type=int, default=3)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="hydra_dl_")
+    try:
+        fixtures = os.path.join(root, "archives")
+        os.makedirs(fixtures)
+        months = [f"2024-{m:02d}" for m in range(1, args.months + 1)]
+        print(f"[Bench] Writing {len(months)} fixture archive(s) x {args.rows:,} trades...")
+        for i, month in enumerate(months):
+            write_fixture(os.path.join(fixtures, archive_name(SYMBOL, month)), args.rows, seed=i)
+
+        # 1. Legacy
+        legacy_dir = os.path.join(root, "legacy")
+        os.makedirs(legacy_dir)
+        t0 = time.perf_counter()
+        for month in months:
+            legacy_month(os.path.join(fixtures, archive_name(SYMBOL, month)), os.path.join(legacy_dir, f"{SYMBOL}-{month}.parquet"))
+        legacy_s = time.perf_counter() - t0
+
+        # 2. Arrow pipeline
+        new_dir = os.path.join(root, "arrow")
+        t0 = time.perf_counter()
+        done, failed = ingest(months, source=fixtures, out_dir=new_dir, workers=args.workers)
+        arrow_s = time.perf_counter() - t0
+
+        # 3. Resume: a second run must not touch finished months
+        t0 = time.perf_counter()
+        ingest(months, source=fixtures, out_dir=new_dir, workers=args.workers)
+        resume_s = time.perf_counter() - t0
+
+        same = not failed and all(
+            pq.read_table(os.path.join(legacy_dir, f"{SYMBOL}-{m}.parquet")).replace_schema_metadata(None).equals(
+                pq.read_table(os.path.join(new_dir, f"{SYMBOL}-{m}.parquet")))
+            for m in months)
+
+        rows = args.rows * len(months)
+        print(f"{'Pipeline':<22} {'seconds':>8} {'trades/s':>12}")
+        print("-" * 44)
+        print(f"{'pandas (sequential)':<22} {legacy_s:>8.2f} {rows / legacy_s:>12,.0f}")
+        print(f"{'arrow (' + str(args.workers) + ' workers)':<22} {arrow_s:>8.2f} {rows / arrow_s:>12,.0f}")
+        print(f"{'resume (all done)':<22} {resume_s:>8.2f}")
+        print(f"Speedup: {legacy_s / arrow_s:.1f}x | identical tables: {'yes' if same else 'NO'} | {os.cpu_count()} CPU(s)")
+    finally:
+        shutil.rmtree(root)
+
+if __name__ == "__main__":
+    main()
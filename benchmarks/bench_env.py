@@ -0,0 +1,104 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+# Run from the repo root: python benchmarks/bench_env.py [parquet]
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from hydra_brain.envs.crypto_env import CryptoMarketMakingEnv
+
+DATA_PATH = "data/parquet/BTCUSDT-2024-01.parquet"
+TICKS = 200000          # Rows loaded (the old env is slow; keep this modest)
+CHECK_STEPS = 50000     # Steps compared for identical obs / rewards
+SECONDS = 3.0           # Time budget per implementation
+
+class PandasRowEnv(CryptoMarketMakingEnv):
+    """The previous implementation (df.iloc per step, list + np.std), for reference"""
+
+    def __init__(self, df, max_steps=0):
+        super().__init__(df, max_steps)
+        self.df = df
+        self.recent_prices = []
+
+    def reset(self, seed=None):
+        self.recent_prices = []
+        return super().reset(seed=seed)
+
+    def _next_observation(self):
+        if self.current_step >= len(self.df):
+            self.current_step = len(self.df) - 1
+        row = self.df.iloc[self.current_step]
+        self.recent_prices.append(row['price'])
+        if len(self.recent_prices) > 20:
+            self.recent_prices.pop(0)
+        volatility = np.std(self.recent_prices) if len(self.recent_prices) > 1 else 0.0
+        return np.array([0.0, float(row['ibm']), self.inventory, volatility], dtype=np.float32)
+
+    def step(self, action):
+        self.current_step += 1
+        terminated = (self.current_step >= self.max_steps - 1)
+        row = self.df.iloc[self.current_step]
+        price = float(row['price'])
+        reward = 0
+        spread = price * 0.0001
+        if action == 1:
+            reward += spread
+            self.inventory += 0.001
+        elif action == 3:
+            reward -= spread
+            self.inventory -= 0.001
+        inv_penalty = 0.5 * (self.inventory ** 2)
+        vol = np.std(self.recent_prices) if len(self.recent_prices) > 1 else 0.0
+        reward = reward - inv_penalty - vol * 1.0
+        return self._next_observation(), reward, terminated, False, {}
+
+def rollout(env, actions):
+    obs, _ = env.reset()
+    all_obs, rewards = [obs], []
+    for a in actions:
+        obs, reward, terminated, _, _ = env.step(a)
+        all_obs.append(obs)
+        rewards.append(reward)
+        if terminated:
+            obs, _ = env.reset()
+            all_obs.append(obs)
+    return np.array(all_obs), rewards
+
+def steps_per_sec(env, actions):
+    env.reset()
+    steps = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < SECONDS:
+        for a in actions[:1000]:
+            if env.step(a)[2]:
+                env.reset()
+        steps += 1000
+    return steps / (time.perf_counter() - t0)
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else DATA_PATH
+    df = pd.read_parquet(path, columns=['time', 'price', 'ibm']).head(TICKS)
+    actions = np.random.default_rng(0).integers(0, 4, CHECK_STEPS).tolist()
+
+    t0 = time.perf_counter()
+    fast = CryptoMarketMakingEnv(df, max_steps=20000)
+    build = time.perf_counter() - t0
+    slow = PandasRowEnv(df, max_steps=20000)
+
+    obs_a, rew_a = rollout(slow, actions)
+    obs_b, rew_b = rollout(fast, actions)
+    same = (np.array_equal(obs_a, obs_b) and rew_a == rew_b
+            and [type(r) for r in rew_a] == [type(r) for r in rew_b])
+
+    print(f"[Bench] CryptoMarketMakingEnv: {len(df):,} ticks, precompute {build * 1000:.0f} ms")
+    print(f"[Bench] {CHECK_STEPS:,} random steps, obs + rewards identical: {'YES' if same else 'NO'}")
+    old = steps_per_sec(slow, actions)
+    new = steps_per_sec(fast, actions)
+    print(f"{'Env':<12} {'steps/s':>12}")
+    print("-" * 25)
+    print(f"{'pandas rows':<12} {old:>12,.0f}")
+    print(f"{'arrays':<12} {new:>12,.0f}  ({new / old:.0f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import subprocess
+import numpy as np
+
+# Run from the repo root: python benchmarks/bench_feature_store.py [parquet dir]
+# Each mode runs in a fresh process so RSS is not shared between them.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+DATA_DIR = "data/parquet"
+EPISODE_STEPS = 20000
+STEPS = 20000
+
+def rss_mb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def child(mode, data_dir, store_dir):
+    import pandas as pd
+    from hydra_brain.dataset import resolve_files
+    from hydra_brain.envs.crypto_env import CryptoMarketMakingEnv
+    from hydra_brain.feature_store import open_feature_store
+
+    base = rss_mb()
+    t0 = time.perf_counter()
+    if mode == 'pandas':
+        # The old train.load_all_data(): every file, concatenated and sorted in RAM
+        dfs = [pd.read_parquet(f, columns=['time', 'price', 'ibm']) for f in resolve_files(data_dir)]
+        data = pd.concat(dfs).sort_values('time').reset_index(drop=True)
+        del dfs
+    else:
+        data, _ = open_feature_store(store_dir)
+    env = CryptoMarketMakingEnv(data, max_steps=EPISODE_STEPS, random_start=True)
+    env.reset(seed=0)
+    startup = time.perf_counter() - t0
+
+    actions = np.random.default_rng(0).integers(0, 4, STEPS).tolist()
+    for a in actions:
+        if env.step(a)[2]:
+            env.reset()
+    print(json.dumps({'mode': mode, 'startup_s': startup, 'rss_mb': rss_mb() - base}))
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        child(*sys.argv[2:5])
+        return
+
+    from hydra_brain.feature_store import build_feature_store
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else DATA_DIR
+    store_dir = tempfile.mkdtemp(prefix="hydra_features_")
+    try:
+        t0 = time.perf_counter()
+        manifest = build_feature_store(data_dir, store_dir)
+        build = time.perf_counter() - t0
+
+        print(f"[Bench] {manifest['ticks']:,} ticks, one-time build {build:.1f}s, {STEPS:,} steps per mode")
+        print(f"{'Mode':<10} {'startup':>10} {'RSS added':>11}")
+        print("-" * 33)
+        for mode in ('pandas', 'memmap'):
+            out = subprocess.run([sys.executable, __file__, '--child', mode, data_dir, store_dir],
+                                 capture_output=True, text=True, check=True).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            print(f"{r['mode']:<10} {r['startup_s']:>9.2f}s {r['rss_mb']:>9.0f}MB")
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
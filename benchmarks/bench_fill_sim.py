@@ -0,0 +1,115 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+# Run from the repo root: python benchmarks/bench_fill_sim.py [--ticks 1000000] [--check-ticks 200000]
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from shared_defs.schema import SharedMemoryLayout
+from hydra_brain.shadow import ShadowExecutor
+from hydra_brain.fill_sim import LimitFillSimulator
+from hydra_brain.backtest_engine import BacktestEngine
+
+HALF_SPREAD = 0.005
+BATCH = 100000
+
+def synthetic_ticks(n, seed=0):
+    rng = np.random.default_rng(seed)
+    times = 1704067200000 + np.cumsum(rng.integers(0, 4, n)).astype(np.int64) # Same-ms bursts included
+    prices = np.round(42000 + np.cumsum(rng.normal(0, 0.5, n)), 2)
+    return times, prices
+
+def random_orders(prices, every, seed=1):
+    """~1 order per `every` ticks: market orders, marketable limits and resting limits 0-3$ away"""
+    rng = np.random.default_rng(seed)
+    n = len(prices)
+    actions = np.zeros(n, dtype=np.int8)
+    at = rng.random(n) < 1.0 / every
+    actions[at] = rng.integers(1, 3, at.sum())
+    offset = np.round(rng.uniform(-1.0, 3.0, n), 2)
+    limits = np.where(actions == 1, prices - offset, prices + offset)
+    limits[rng.random(n) < 0.3] = 0.0 # Market
+    return actions, np.where(actions > 0, limits, 0.0)
+
+class RecordingShadow(ShadowExecutor):
+    """The shadow engine, recording (tick, side, price, usdt, btc) of every accepted fill"""
+    tick = 0
+
+    def __init__(self, layout, **kwargs):
+        super().__init__(layout, verbose=False, **kwargs)
+        self.ledger = []
+
+    def _fill(self, fill_price):
+        side, before = self.pending_action, self.fills
+        super()._fill(fill_price)
+        if self.fills > before:
+            self.ledger.append((self.tick, side, fill_price, self.usdt, self.btc))
+
+def shadow_reference(times, prices, actions, limits):
+    """Tick by tick, in replayer.py order: the engine checks its pending order against the
+    new quote, then the strategy's command for that tick is picked up"""
+    layout = SharedMemoryLayout()
+    shadow = RecordingShadow(layout)
+    bid, ask = prices - HALF_SPREAD, prices + HALF_SPREAD
+    for i in range(len(times)):
+        shadow.tick = i
+        shadow.on_ticks(times[i:i + 1], bid[i:i + 1], ask[i:i + 1])
+        if actions[i]:
+            layout.command.action = int(actions[i])
+            layout.command.quantity = 0.001
+            layout.command.price = float(limits[i])
+            layout.command.command_id += 1
+            shadow.poll_command(int(times[i]))
+    return shadow.ledger
+
+def run_engine(times, prices, actions, limits, execution):
+    engine = BacktestEngine(plot_path=None, execution=execution)
+    for s in range(0, len(prices), BATCH):
+        e = s + BATCH
+        engine._apply_batch(prices[s:e], actions[s:e], times[s:e], {}, None if limits is None else limits[s:e])
+    return engine
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ticks", type=int, default=2000000)
+    parser.add_argument("--check-ticks", type=int, default=200000)
+    parser.add_argument("--every", type=int, default=200, help="mean ticks between orders")
+    args = parser.parse_args()
+
+    # 1. Fills vs the shadow engine (fixed 20ms latency, SIM_FEE_RATE both sides)
+    times, prices = synthetic_ticks(args.check_ticks)
+    actions, limits = random_orders(prices, args.every)
+    t0 = time.perf_counter()
+    expected = shadow_reference(times, prices, actions, limits)
+    ref_time = time.perf_counter() - t0
+    engine = run_engine(times, prices, actions, limits, LimitFillSimulator(half_spread=HALF_SPREAD))
+    f = engine.ledger.fills
+    got = list(zip(f['tick'].tolist(), f['side'].tolist(), f['price'].tolist(), f['cash'].tolist(), f['position'].tolist()))
+    print(f"[FillSim] {args.check_ticks:,} ticks, {int((actions > 0).sum()):,} orders -> {len(expected):,} shadow fills, "
+          f"{len(got):,} simulated: {'IDENTICAL' if got == expected else 'MISMATCH'}")
+    print(f"[FillSim] Shadow engine tick by tick: {args.check_ticks / ref_time / 1e3:,.0f}k ticks/s")
+
+    # 2. Throughput on a longer run, vs the instant-fill engine and a raw scan
+    times, prices = synthetic_ticks(args.ticks, seed=2)
+    actions, limits = random_orders(prices, args.every, seed=3)
+    runs = [
+        ('raw scan', lambda: [np.flatnonzero(prices[s:s + BATCH] > 42000.0) for s in range(0, args.ticks, BATCH)]),
+        ('instant fills', lambda: run_engine(times, prices, actions, None, None)),
+        ('limit orders', lambda: run_engine(times, prices, actions, limits, LimitFillSimulator(half_spread=HALF_SPREAD))),
+        ('limit+jitter', lambda: run_engine(times, prices, actions, limits,
+                                            LimitFillSimulator(jitter_ms=10.0, maker_fee=0.0002, half_spread=HALF_SPREAD, seed=0))),
+    ]
+    print(f"\n{'Execution':<15} {'ticks/s':>12} {'fills':>8}")
+    print("-" * 37)
+    for name, fn in runs:
+        best = float('inf')
+        for _ in range(3):
+            t0 = time.perf_counter()
+            result = fn()
+            best = min(best, time.perf_counter() - t0)
+        fills = len(result.ledger.fills) if isinstance(result, BacktestEngine) else '-'
+        print(f"{name:<15} {args.ticks / best / 1e6:>10.1f}M {fills:>8}")
+
+if __name__ == "__main__":
+    main()
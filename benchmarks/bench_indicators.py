@@ -0,0 +1,92 @@
+import os
+import sys
+import time
+import tracemalloc
+from collections import deque
+import numpy as np
+
+# Run from the repo root: python benchmarks/bench_indicators.py
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from hydra_brain.indicators import SMA, EMA, RollingVariance, RollingMax, RollingMin
+
+WINDOW = 30000        # live_trend.py LONG_WINDOW
+TICKS = 200000
+BATCH = 100000        # BacktestEngine chunk size
+
+def synthetic_prices(n, seed=7):
+    rng = np.random.default_rng(seed)
+    return np.round(42000 + np.cumsum(rng.normal(0, 0.5, n)), 2).astype(np.float32).astype(np.float64)
+
+class DequeSMA:
+    """The old inline live_trend.py moving average (reference)"""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.sum = 0.0
+
+    def update(self, x):
+        if len(self.values) == self.window:
+            self.sum -= self.values[0]
+        self.values.append(x)
+        self.sum += x
+        return self.sum / self.window
+
+def retained_bytes(factory, prices):
+    """Memory held by one indicator after a full window of ticks"""
+    tracemalloc.start()
+    ind = factory()
+    for x in prices[:WINDOW + 10].tolist():
+        ind.update(x)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del ind
+    return size
+
+def ns_per_update(factory, prices):
+    ind = factory()
+    values = prices.tolist()
+    t0 = time.perf_counter_ns()
+    for x in values:
+        ind.update(x)
+    return (time.perf_counter_ns() - t0) / len(values)
+
+def ns_per_batch_tick(factory, prices):
+    ind = factory()
+    t0 = time.perf_counter_ns()
+    for i in range(0, len(prices), BATCH):
+        ind.update_batch(prices[i:i + BATCH])
+    return (time.perf_counter_ns() - t0) / len(prices)
+
+def identical(factory, prices):
+    a, b = factory(), factory()
+    ref = np.array([a.update(x) for x in prices.tolist()])
+    got = np.concatenate([b.update_batch(prices[i:i + 33333]) for i in range(0, len(prices), 33333)])
+    return np.array_equal(ref, got)
+
+def main():
+    prices = synthetic_prices(TICKS)
+    cases = [
+        ('deque SMA', lambda: DequeSMA(WINDOW)),
+        ('SMA', lambda: SMA(WINDOW)),
+        ('EMA', lambda: EMA(span=WINDOW)),
+        ('RollingVariance', lambda: RollingVariance(WINDOW)),
+        ('RollingMax', lambda: RollingMax(WINDOW)),
+        ('RollingMin', lambda: RollingMin(WINDOW)),
+    ]
+
+    print(f"[Bench] Indicators: window {WINDOW:,}, {TICKS:,} ticks, batch {BATCH:,}")
+    print(f"{'Indicator':<16} {'memory':>10} {'update ns':>10} {'batch ns/tick':>14} {'identical':>10}")
+    print("-" * 64)
+    for name, factory in cases:
+        mem = retained_bytes(factory, prices)
+        per_tick = ns_per_update(factory, prices)
+        if hasattr(factory(), 'update_batch'):
+            batch = f"{ns_per_batch_tick(factory, prices):.0f}"
+            same = "yes" if identical(factory, prices) else "NO"
+        else:
+            batch, same = "-", "-"
+        print(f"{name:<16} {mem / 1024:>8.0f}KB {per_tick:>10.0f} {batch:>14} {same:>10}")
+
+if __name__ == "__main__":
+    main()
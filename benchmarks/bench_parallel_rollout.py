@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import numpy as np
+
+# Run from the repo root: python benchmarks/bench_parallel_rollout.py [parquet dir] [--ppo]
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from hydra_brain.feature_store import build_feature_store, open_feature_store
+from hydra_brain.envs.vec_env import VecMarketMakingEnv, SubprocMarketMakingEnv
+
+DATA_DIR = "data/parquet"
+N_ENVS = 64                # Total sub-envs, split across the workers
+WORKERS = [1, 2, 4, 8]
+EPISODE_STEPS = 50000
+SECONDS = 3.0
+PPO_TIMESTEPS = 32768      # Timed RecurrentPPO run per setting (--ppo), extrapolated to 1M
+
+def env_steps_per_sec(env):
+    actions = np.random.default_rng(0).integers(0, 4, (128, env.num_envs))
+    env.reset()
+    steps = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < SECONDS:
+        for a in actions:
+            env.step(a)
+        steps += actions.size
+    return steps / (time.perf_counter() - t0)
+
+def ppo_seconds_per_million(env):
+    from sb3_contrib import RecurrentPPO
+    model = RecurrentPPO("MlpLstmPolicy", env, n_steps=128, batch_size=1024, verbose=0,
+                         policy_kwargs={"enable_critic_lstm": False})
+    t0 = time.perf_counter()
+    model.learn(total_timesteps=PPO_TIMESTEPS)
+    return (time.perf_counter() - t0) / model.num_timesteps * 1e6
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    with_ppo = '--ppo' in sys.argv
+    data_dir = args[0] if args else DATA_DIR
+
+    store_dir = tempfile.mkdtemp(prefix="hydra_features_")
+    try:
+        manifest = build_feature_store(data_dir, store_dir)
+        print(f"[Bench] {manifest['ticks']:,} ticks, {N_ENVS} envs, {os.cpu_count()} CPU(s)")
+        header = f"{'Setup':<14} {'env steps/s':>12} {'env s / 1M':>11}"
+        print(header + (f" {'PPO s / 1M':>11}" if with_ppo else ""))
+        print("-" * (len(header) + (12 if with_ppo else 0)))
+
+        setups = [('in-process', lambda: VecMarketMakingEnv(open_feature_store(store_dir)[0], num_envs=N_ENVS,
+                                                             max_steps=EPISODE_STEPS, random_start=True, seed=0))]
+        setups += [(f"{w} worker(s)", (lambda w: lambda: SubprocMarketMakingEnv(store_dir, num_envs=N_ENVS, n_workers=w,
+                                                                          max_steps=EPISODE_STEPS, random_start=True, seed=0))(w))
+                   for w in WORKERS]
+
+        for name, make in setups:
+            env = make()
+            try:
+                rate = env_steps_per_sec(env)
+                line = f"{name:<14} {rate:>12,.0f} {1e6 / rate:>10.1f}s"
+                if with_ppo:
+                    line += f" {ppo_seconds_per_million(env):>10.0f}s"
+                print(line)
+            finally:
+                env.close()
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Run from the repo root: python benchmarks/bench_parquet_layout.py [--ticks 4000000 | --source data/parquet]
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from hydra_brain.dataset import TickDataset, resolve_files
+from hydra_brain.parquet_layout import convert, DAY_MS
+
+def legacy_month(path, n, seed=0):
+    """A month written like the old download_data.py: pandas chunks of 500k rows, default encodings"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'time': (1704067200000 + np.cumsum(rng.exponential(2600e6 / n, n))).astype(np.uint64),
+        'price': np.round(42000 + np.cumsum(rng.normal(0, 2, n)), 2).astype(np.float32),
+        'qty': np.round(rng.exponential(0.01, n), 5).astype(np.float32),
+        'ibm': rng.random(n) < 0.5,
+    })
+    writer = None
+    for s in range(0, n, 500000):
+        table = pa.Table.from_pandas(df.iloc[s:s + 500000])
+        writer = writer or pq.ParquetWriter(path, table.schema)
+        writer.write_table(table)
+    writer.close()
+
+def best_of(fn, repeats=3):
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return min(times), result
+
+def engine_scan(source, columns, start=None, end=None):
+    """What BacktestEngine.run() reads: TickDataset batches converted to pandas"""
+    ds = TickDataset(source, columns=columns, start=start, end=end, batch_size=100000, prefetch=0)
+    rows = 0
+    for batch in ds:
+        rows += len(batch.to_pandas())
+    return rows, ds.row_groups_read, ds.row_groups_total
+
+def load_all(source):
+    """The old train.load_all_data(): every file into one DataFrame"""
+    return pd.concat([pd.read_parquet(f) for f in resolve_files(source)], ignore_index=True)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source", help="existing parquet files (default: a synthetic month)")
+    parser.add_argument("--ticks", type=int, default=4000000)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="hydra_layout_")
+    try:
+        source = args.source
+        if source is None:
+            source = os.path.join(root, "legacy")
+            os.makedirs(source)
+            legacy_month(os.path.join(source, "BTCUSDT-2024-01.parquet"), args.ticks)
+        days_dir = os.path.join(root, "days")
+        convert(source, days_dir)
+
+        layouts = [('current', source), ('day/tuned', days_dir)]
+        first_day = resolve_files(days_dir)[0]
+        day = int(pq.read_table(first_day, columns=['time'])['time'][0].as_py()) // DAY_MS + 1
+        window = (day * DAY_MS, (day + 1) * DAY_MS)
+
+        print(f"\n{'Layout':<10} {'MB':>7} {'files':>6} {'scan time,price':>16} {'scan all':>10} {'1-day window':>16} {'load_all':>9}")
+        print("-" * 80)
+        results = {}
+        for name, path in layouts:
+            files = resolve_files(path)
+            mb = sum(os.path.getsize(f) for f in files) / 1e6
+            t_tp, (n, _, _) = best_of(lambda: engine_scan(path, ['time', 'price']))
+            t_all, _ = best_of(lambda: engine_scan(path, None))
+            t_win, (_, read, total) = best_of(lambda: engine_scan(path, ['time', 'price'], *window))
+            t_load, df = best_of(lambda: load_all(path), repeats=1)
+            results[name] = df
+            print(f"{name:<10} {mb:>7.1f} {len(files):>6} {n / t_tp / 1e6:>11.1f}M t/s {n / t_all / 1e6:>6.1f}M t/s "
+                  f"{t_win * 1000:>7.1f}ms {read:>3}/{total:<3} {t_load:>8.2f}s")
+
+        same = results['current'].sort_values('time', kind='stable').reset_index(drop=True).equals(results['day/tuned'])
+        print(f"Same ticks in time order: {'yes' if same else 'NO'}")
+    finally:
+        shutil.rmtree(root)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Run from the repo root: python benchmarks/bench_policy_inference.py [--model checkpoints/hydra_lstm_v1.zip]
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from hydra_brain.lstm_policy import LstmPolicy, export_policy
+
+STEPS = 20000
+RESET_EVERY = 5000   # episode_start=True every this many calls (state must reset identically)
+
+def untrained_model(train_steps):
+    """A fresh MlpLstmPolicy with train.py's settings, optionally trained for a few steps"""
+    from sb3_contrib import RecurrentPPO
+    from hydra_brain.envs.crypto_env import CryptoMarketMakingEnv
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({
+        'price': (42000 + np.cumsum(rng.normal(0, 5, 20000))).astype(np.float32),
+        'ibm': rng.random(20000) < 0.5,
+    })
+    model = RecurrentPPO("MlpLstmPolicy", CryptoMarketMakingEnv(df), n_steps=256, batch_size=128,
+                         seed=0, device='cpu', policy_kwargs={"enable_critic_lstm": False})
+    if train_steps:
+        model.learn(total_timesteps=train_steps)
+    # A barely trained policy picks one action everywhere; widen the action head
+    # so all four actions (and close calls between them) show up in the comparison
+    import torch
+    with torch.no_grad():
+        model.policy.action_net.weight.normal_(0, 1, generator=torch.Generator().manual_seed(0))
+        model.policy.action_net.bias.zero_()
+    return model
+
+def live_observations(n, seed=11):
+    """main_strategy.py observations: [0, ofi, real_btc, 0]"""
+    rng = np.random.default_rng(seed)
+    obs = np.zeros((n, 4))
+    obs[:, 1] = rng.uniform(-1, 1, n)
+    obs[:, 2] = np.clip(np.cumsum(rng.choice([-0.001, 0, 0.001], n, p=[0.01, 0.98, 0.01])), 0, 0.005)
+    return obs
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", help="RecurrentPPO .zip (default: a freshly initialized policy)")
+    parser.add_argument("--train-steps", type=int, default=2048, help="PPO steps for the default model")
+    args = parser.parse_args()
+
+    from sb3_contrib import RecurrentPPO
+    model = RecurrentPPO.load(args.model, device='cpu') if args.model else untrained_model(args.train_steps)
+    npz = os.path.join(tempfile.mkdtemp(), 'policy.npz')
+    export_policy(model, npz)
+    policy = LstmPolicy(npz)
+
+    obs = live_observations(STEPS)
+    starts = (np.arange(STEPS) % RESET_EVERY) == 0
+
+    # 1. SB3 (exactly the main_strategy.py call)
+    sb3_actions = np.zeros(STEPS, dtype=np.int64)
+    states = None
+    t0 = time.perf_counter_ns()
+    for k in range(STEPS):
+        action, states = model.predict(obs[k].reshape(1, -1), state=states, episode_start=starts[k:k + 1], deterministic=True)
+        sb3_actions[k] = int(action[0])
+    sb3_ns = (time.perf_counter_ns() - t0) / STEPS
+
+    # 2. NumPy
+    np_actions = np.zeros(STEPS, dtype=np.int64)
+    rows = obs.tolist()
+    t0 = time.perf_counter_ns()
+    for k in range(STEPS):
+        np_actions[k] = policy.act(rows[k], starts[k])
+    np_ns = (time.perf_counter_ns() - t0) / STEPS
+
+    # 3. Identity on wide random observations too (the live feed barely moves the logits)
+    wide = np.random.default_rng(5).normal(0, 2, (STEPS, 4))
+    wide_sb3, wide_np = np.zeros(STEPS, dtype=np.int64), np.zeros(STEPS, dtype=np.int64)
+    states = None
+    policy.reset()
+    for k in range(STEPS):
+        action, states = model.predict(wide[k].reshape(1, -1), state=states, episode_start=starts[k:k + 1], deterministic=True)
+        wide_sb3[k] = int(action[0])
+        wide_np[k] = policy.act(wide[k], starts[k])
+    sb3_actions = np.concatenate((sb3_actions, wide_sb3))
+    np_actions = np.concatenate((np_actions, wide_np))
+
+    mismatches = int((sb3_actions != np_actions).sum())
+    print(f"[Bench] MlpLstmPolicy inference, {STEPS:,} sequential calls (reset every {RESET_EVERY:,})")
+    print(f"{'Backend':<10} {'us/call':>10} {'calls/s':>12}")
+    print("-" * 34)
+    print(f"{'SB3':<10} {sb3_ns / 1000:>10.1f} {1e9 / sb3_ns:>12,.0f}")
+    print(f"{'NumPy':<10} {np_ns / 1000:>10.1f} {1e9 / np_ns:>12,.0f}")
+    print(f"Speedup: {sb3_ns / np_ns:.1f}x | action mix {np.bincount(np_actions, minlength=4).tolist()}")
+    print(f"Actions identical ({len(np_actions):,} live + wide calls): {'yes' if mismatches == 0 else f'NO ({mismatches} differ)'} | "
+          f"final hidden state max |diff| {np.abs(states[0].ravel() - policy.h.ravel()).max():.2e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import os
+import sys
+import csv
+import time
+import shutil
+import tempfile
+import numpy as np
+
+# Run from the repo root: python benchmarks/bench_recorder.py
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from shared_defs.schema import TickRecord
+from hydra_brain.recorder import TickParquetWriter
+
+TICKS = 500000
+BATCH = 200 # Ticks drained per reader.read() in a busy market
+
+def synthetic_ticks(n, seed=7):
+    """Ring-shaped structured array (same dtype as TickReader.poll output)"""
+    rng = np.random.default_rng(seed)
+    ticks = np.zeros(n, dtype=np.ctypeslib.as_array((TickRecord * 1)()).dtype)
+    # bookTicker: most updates only change queue sizes, the top price moves ~1 in 5
+    moves = rng.integers(-3, 4, n) * (rng.random(n) < 0.2)
+    bid = np.round(42000 + np.cumsum(moves) * 0.01, 2)
+    ticks['seq'] = np.arange(1, n + 1)
+    ticks['local_time_ms'] = 1704067200000 + np.cumsum(rng.integers(0, 3, n))
+    ticks['bid_price'] = bid
+    ticks['ask_price'] = np.round(bid + 0.01, 2) # Exact decimals, like prices parsed from the feed
+    ticks['bid_qty'] = np.round(rng.exponential(1.0, n), 5)
+    ticks['ask_qty'] = np.round(rng.exponential(1.0, n), 5)
+    return ticks
+
+def record_csv(ticks, out_dir):
+    """The old per-tick csv.DictWriter path (reference)"""
+    path = os.path.join(out_dir, "ticks.csv")
+    with open(path, 'w', newline='') as csvfile:
+        fieldnames = ['local_time', 'bid_price', 'bid_qty', 'ask_price', 'ask_qty', 'spread', 'ofi']
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer.writeheader()
+        for t in ticks:
+            spread = t['ask_price'] - t['bid_price']
+            total_qty = t['bid_qty'] + t['ask_qty']
+            ofi = (t['bid_qty'] - t['ask_qty']) / total_qty if total_qty > 0 else 0
+            writer.writerow({
+                'local_time': t['local_time_ms'],
+                'bid_price': t['bid_price'],
+                'bid_qty': t['bid_qty'],
+                'ask_price': t['ask_price'],
+                'ask_qty': t['ask_qty'],
+                'spread': f"{spread:.2f}",
+                'ofi': f"{ofi:.4f}"
+            })
+    return [path]
+
+def record_parquet(ticks, out_dir):
+    writer = TickParquetWriter(out_dir)
+    for i in range(0, len(ticks), BATCH):
+        writer.append(ticks[i:i + BATCH])
+    writer.close()
+    return writer.files
+
+def run(name, func, ticks):
+    out_dir = tempfile.mkdtemp(prefix="hydra_rec_")
+    try:
+        t0 = time.process_time()
+        files = func(ticks, out_dir)
+        cpu = time.process_time() - t0
+        size = sum(os.path.getsize(f) for f in files)
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+    return {'mode': name, 'ns_per_tick': cpu / len(ticks) * 1e9, 'bytes_per_tick': size / len(ticks),
+            'ticks_per_sec': len(ticks) / cpu}
+
+def main():
+    ticks = synthetic_ticks(TICKS)
+    print(f"[Bench] Recorder: {TICKS:,} ticks, {BATCH} ticks per drain")
+    print(f"{'Mode':<10} {'CPU ns/tick':>12} {'bytes/tick':>11} {'ticks/s':>12}")
+    print("-" * 48)
+    for name, func in (('csv', record_csv), ('parquet', record_parquet)):
+        r = run(name, func, ticks)
+        print(f"{r['mode']:<10} {r['ns_per_tick']:>12.0f} {r['bytes_per_tick']:>11.1f} {r['ticks_per_sec']:>12,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from stable_baselines3.common.vec_env import DummyVecEnv
+
+# Run from the repo root: python benchmarks/bench_vec_env.py [parquet]
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from hydra_brain.envs.crypto_env import CryptoMarketMakingEnv
+from hydra_brain.envs.vec_env import VecMarketMakingEnv
+
+DATA_PATH = "data/parquet/BTCUSDT-2024-01.parquet"
+TICKS = 1000000
+MAX_STEPS = 5000          # Short episodes so auto-reset is exercised
+CHECK_ENVS = 4
+CHECK_STEPS = 20000
+ENV_COUNTS = [1, 2, 4, 8, 16, 32, 64]
+SECONDS = 2.0
+
+def check_identical(df):
+    """Each sub-env must match a CryptoMarketMakingEnv on its own slice (DummyVecEnv semantics)"""
+    vec = VecMarketMakingEnv(df, num_envs=CHECK_ENVS, max_steps=MAX_STEPS)
+    ref = DummyVecEnv([
+        (lambda off: lambda: CryptoMarketMakingEnv(df.iloc[off:].reset_index(drop=True), max_steps=MAX_STEPS))(int(off))
+        for off in vec.offsets
+    ])
+    rng = np.random.default_rng(0)
+    if not np.array_equal(vec.reset(), ref.reset()):
+        return False
+    for _ in range(CHECK_STEPS):
+        actions = rng.integers(0, 4, CHECK_ENVS)
+        o1, r1, d1, i1 = vec.step(actions)
+        o2, r2, d2, i2 = ref.step(actions)
+        if not (np.array_equal(o1, o2) and np.array_equal(r1, r2) and np.array_equal(d1, d2)):
+            return False
+        for a, b in zip(i1, i2):
+            if ('terminal_observation' in a) != ('terminal_observation' in b):
+                return False
+            if 'terminal_observation' in a and not np.array_equal(a['terminal_observation'], b['terminal_observation']):
+                return False
+    return True
+
+def steps_per_sec(env):
+    rng = np.random.default_rng(1)
+    actions = rng.integers(0, 4, (256, env.num_envs))
+    env.reset()
+    steps = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < SECONDS:
+        for a in actions:
+            env.step(a)
+        steps += len(actions) * env.num_envs
+    return steps / (time.perf_counter() - t0)
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else DATA_PATH
+    df = pd.read_parquet(path, columns=['time', 'price', 'ibm']).head(TICKS)
+    print(f"[Bench] Market-making envs: {len(df):,} ticks, episodes of {MAX_STEPS:,} steps")
+    print(f"[Bench] {CHECK_ENVS} sub-envs x {CHECK_STEPS:,} steps identical to DummyVecEnv: {'YES' if check_identical(df) else 'NO'}")
+
+    print(f"{'N envs':>6} {'DummyVecEnv':>14} {'VecMarketMaking':>16} {'speedup':>8}")
+    print("-" * 48)
+    for n in ENV_COUNTS:
+        dummy = DummyVecEnv([lambda: CryptoMarketMakingEnv(df, max_steps=MAX_STEPS) for _ in range(n)])
+        slow = steps_per_sec(dummy)
+        fast = steps_per_sec(VecMarketMakingEnv(df, num_envs=n, max_steps=MAX_STEPS))
+        print(f"{n:>6} {slow:>14,.0f} {fast:>16,.0f} {fast / slow:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
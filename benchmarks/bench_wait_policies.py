@@ -0,0 +1,93 @@
+import os
+import sys
+import time
+import mmap
+import resource
+import multiprocessing as mp
+import numpy as np
+
+# Run from the repo root: python benchmarks/bench_wait_policies.py
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from shared_defs.schema import SharedMemoryLayout, SHM_SIZE
+from hydra_brain.bridge import TickReader, TickWriter, WAIT_POLICIES, futex_available
+
+# Workload: Poisson arrivals with occasional same-millisecond bursts
+TICKS = 5000
+RATE = 1000          # Mean ticks per second
+BURST_EVERY = 100    # Every Nth tick starts a burst...
+BURST_SIZE = 20      # ...of this many back-to-back ticks
+
+def producer(mm, start_evt):
+    layout = SharedMemoryLayout.from_buffer(mm)
+    writer = TickWriter(layout)
+    rng = np.random.default_rng(42)
+    gaps = rng.exponential(1.0 / RATE, TICKS)
+
+    start_evt.wait()
+    time.sleep(0.2) # Let the reader reach its wait loop
+    i = 0
+    while i < TICKS:
+        time.sleep(gaps[i])
+        n = BURST_SIZE if i % BURST_EVERY == 0 else 1
+        for _ in range(min(n, TICKS - i)):
+            # The publish timestamp travels in bid_qty (monotonic ns fits a double's 53 bits)
+            writer.publish(int(time.time() * 1000), 42000.0, float(time.monotonic_ns()), 42000.1, 1.0)
+            i += 1
+    del layout, writer
+
+def measure(policy_name):
+    mm = mmap.mmap(-1, SHM_SIZE) # Anonymous MAP_SHARED, inherited by the forked producer
+    layout = SharedMemoryLayout.from_buffer(mm)
+    reader = TickReader(layout, wait=WAIT_POLICIES[policy_name]())
+
+    start_evt = mp.get_context('fork').Event()
+    proc = mp.get_context('fork').Process(target=producer, args=(mm, start_evt))
+    proc.start()
+
+    latencies = []
+    received = 0
+    ru0 = resource.getrusage(resource.RUSAGE_SELF)
+    wall0 = time.monotonic()
+    start_evt.set()
+    while received < TICKS:
+        ticks = reader.read(timeout=0.5)
+        now = time.monotonic_ns()
+        if len(ticks) == 0:
+            if not proc.is_alive() and reader.pending() == 0:
+                break
+            continue
+        latencies.append(now - ticks['bid_qty'])
+        received += len(ticks)
+    wall = time.monotonic() - wall0
+    ru1 = resource.getrusage(resource.RUSAGE_SELF)
+    proc.join()
+
+    cpu = (ru1.ru_utime - ru0.ru_utime) + (ru1.ru_stime - ru0.ru_stime)
+    lat_us = np.concatenate(latencies) / 1000.0 if latencies else np.zeros(1)
+    result = {
+        'policy': policy_name,
+        'cpu_pct': 100.0 * cpu / wall,
+        'p50_us': float(np.percentile(lat_us, 50)),
+        'p99_us': float(np.percentile(lat_us, 99)),
+        'max_us': float(lat_us.max()),
+        'received': received,
+        'overruns': reader.overruns,
+    }
+    del reader, layout
+    mm.close()
+    return result
+
+def main():
+    print(f"[Bench] Wait policies: {TICKS} ticks @ ~{RATE}/s, bursts of {BURST_SIZE} every {BURST_EVERY} ticks")
+    print(f"[Bench] Cores: {os.cpu_count()} (spin numbers are only meaningful with a spare core)")
+    print(f"{'Policy':<10} {'CPU %':>7} {'p50 us':>9} {'p99 us':>9} {'max us':>10} {'Ticks':>7} {'Overruns':>9}")
+    print("-" * 66)
+    for name in WAIT_POLICIES:
+        if name == 'doorbell' and not futex_available():
+            print(f"{name:<10} (futex not available)")
+            continue
+        r = measure(name)
+        print(f"{r['policy']:<10} {r['cpu_pct']:>7.1f} {r['p50_us']:>9.1f} {r['p99_us']:>9.1f} {r['max_us']:>10.1f} {r['received']:>7} {r['overruns']:>9}")
+
+if __name__ == "__main__":
+    main()
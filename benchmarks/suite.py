@@ -0,0 +1,339 @@
+import io
+import os
+import sys
+import json
+import mmap
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
+import subprocess
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Offline performance suite: synthetic data only, no network, no engine binary.
+#
+#   python benchmarks/suite.py                    # run, write benchmarks/results/latest.json, compare
+#   python benchmarks/suite.py --only backtest    # name filter (substring)
+#   python benchmarks/suite.py --update-baseline  # accept the current numbers as benchmarks/baseline.json
+#
+# Every benchmark is the best of --repeats runs. A result is flagged as a
+# REGRESSION when it is worse than the baseline by more than --threshold
+# (ratio), and the exit code is 1 if anything regressed. Baselines are only
+# comparable on the machine that recorded them (see "machine" in the JSON).
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from shared_defs.schema import SharedMemoryLayout, SHM_SIZE, TickRecord
+from hydra_brain.backtest_engine import BacktestEngine
+from hydra_brain.strategies import TrendStrategy
+from hydra_brain.envs.crypto_env import CryptoMarketMakingEnv
+from hydra_brain.bridge import TickReader, TickWriter
+from hydra_brain.recorder import TickParquetWriter
+from hydra_brain.sweep import sweep
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+RESULTS_PATH = os.path.join(BENCH_DIR, "results", "latest.json")
+THRESHOLD = 0.15   # Flag anything >15% worse than the baseline
+
+TICKS = 2000000          # Synthetic trade file for the backtest / optimizer benchmarks
+ROW_TICKS = 200000       # Row-mode backtest and decide() are ~50x slower: smaller slice
+ENV_STEPS = 100000
+SHM_ROUNDS = 50000
+RECORDER_TICKS = 1000000
+RECORDER_DRAIN = 200     # Ticks per TickReader.poll() in a busy market
+PARAMS = dict(short_window=2000, long_window=10000, threshold=0.0005)
+SWEEP_GRID = [(s, l, t) for s in (500, 1000, 2000, 5000) for l in (10000, 20000, 50000) for t in (0.0, 0.0005, 0.001, 0.002)]
+
+# -----------------------------------------------------------------------------
+# SYNTHETIC DATA
+# -----------------------------------------------------------------------------
+def synthetic_trades(n, seed=0):
+    """Trade ticks with the download_data.py schema: random walk + same-ms bursts"""
+    rng = np.random.default_rng(seed)
+    return pa.table({
+        'time': (1704067200000 + np.cumsum(rng.integers(0, 4, n))).astype(np.uint64),
+        'price': np.round(42000 + np.cumsum(rng.normal(0, 1, n)), 2).astype(np.float32),
+        'qty': np.round(rng.exponential(0.01, n), 5).astype(np.float32),
+        'ibm': rng.random(n) < 0.5,
+    })
+
+def synthetic_ring_ticks(n, seed=7):
+    """Structured array with the TickReader.poll() dtype"""
+    rng = np.random.default_rng(seed)
+    ticks = np.zeros(n, dtype=np.ctypeslib.as_array((TickRecord * 1)()).dtype)
+    bid = np.round(42000 + np.cumsum(rng.integers(-3, 4, n) * (rng.random(n) < 0.2)) * 0.01, 2)
+    ticks['seq'] = np.arange(1, n + 1)
+    ticks['local_time_ms'] = 1704067200000 + np.cumsum(rng.integers(0, 3, n))
+    ticks['bid_price'] = bid
+    ticks['ask_price'] = np.round(bid + 0.01, 2) # Exact decimals, like prices parsed from the feed
+    ticks['bid_qty'] = np.round(rng.exponential(1.0, n), 5)
+    ticks['ask_qty'] = np.round(rng.exponential(1.0, n), 5)
+    return ticks
+
+# -----------------------------------------------------------------------------
+# BENCHMARKS: each returns (value, unit); ctx holds the shared synthetic data
+# -----------------------------------------------------------------------------
+def quiet(fn, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args)
+
+def bench_backtest_batch(ctx):
+    engine = BacktestEngine(plot_path=None)
+    t0 = time.perf_counter()
+    quiet(engine.run_batch, ctx['trades_path'], TrendStrategy(**PARAMS).decide_batch)
+    return engine.total_ticks / (time.perf_counter() - t0), 'ticks/s'
+
+def bench_backtest_row(ctx):
+    engine = BacktestEngine(plot_path=None)
+    t0 = time.perf_counter()
+    quiet(engine.run, ctx['row_path'], TrendStrategy(**PARAMS).decide)
+    return engine.total_ticks / (time.perf_counter() - t0), 'ticks/s'
+
+def bench_strategy_decide(ctx):
+    prices = ctx['prices'][:ROW_TICKS].tolist()
+    strategy = TrendStrategy(**PARAMS)
+    decide = strategy.decide
+    row = type('Row', (), {})()
+    t0 = time.perf_counter()
+    for price in prices:
+        row.price = price
+        decide(row, 0.0, 0.0)
+    return (time.perf_counter() - t0) / len(prices) * 1e9, 'ns/tick'
+
+def bench_strategy_decide_batch(ctx):
+    prices = ctx['prices']
+    strategy = TrendStrategy(**PARAMS)
+    t0 = time.perf_counter()
+    for s in range(0, len(prices), 100000):
+        strategy.decide_batch({'price': prices[s:s + 100000]}, 0.0, 0.0)
+    return (time.perf_counter() - t0) / len(prices) * 1e9, 'ns/tick'
+
+def bench_env_step(ctx):
+    env = ctx['env']
+    actions = ctx['actions']
+    env.reset(seed=0)
+    t0 = time.perf_counter()
+    for a in actions:
+        if env.step(a)[2]:
+            env.reset()
+    return len(actions) / (time.perf_counter() - t0), 'steps/s'
+
+def _ring():
+    mm = mmap.mmap(-1, SHM_SIZE)
+    layout = SharedMemoryLayout.from_buffer(mm)
+    return mm, layout, TickWriter(layout), TickReader(layout)
+
+def bench_shm_poll_empty(ctx):
+    """TickReader.poll() with nothing new: the idle cost of every consumer loop"""
+    mm, layout, writer, reader = _ring()
+    writer.publish(1704067200000, 42000.0, 1.0, 42000.01, 1.0)
+    reader.poll()
+    poll = reader.poll
+    t0 = time.perf_counter()
+    for _ in range(SHM_ROUNDS):
+        poll()
+    ns = (time.perf_counter() - t0) / SHM_ROUNDS * 1e9
+    del writer, reader, layout, poll # Views into the mmap must go before it can close
+    mm.close()
+    return ns, 'ns'
+
+def bench_shm_publish_poll(ctx):
+    """One tick published then polled (same process): the ring's own read latency"""
+    mm, layout, writer, reader = _ring()
+    publish, poll = writer.publish, reader.poll
+    t0 = time.perf_counter()
+    for i in range(SHM_ROUNDS):
+        publish(1704067200000 + i, 42000.0, 1.0, 42000.01, 1.0)
+        poll()
+    ns = (time.perf_counter() - t0) / SHM_ROUNDS * 1e9
+    del writer, reader, layout, publish, poll
+    mm.close()
+    return ns, 'ns/tick'
+
+def bench_recorder(ctx):
+    ticks = ctx['ring_ticks']
+    out_dir = tempfile.mkdtemp(dir=ctx['root'])
+    def record():
+        writer = TickParquetWriter(out_dir)
+        for i in range(0, len(ticks), RECORDER_DRAIN):
+            writer.append(ticks[i:i + RECORDER_DRAIN])
+        writer.close()
+    try:
+        t0 = time.perf_counter()
+        quiet(record)
+        return len(ticks) / (time.perf_counter() - t0), 'ticks/s'
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+def bench_optimizer(ctx):
+    t0 = time.perf_counter()
+    quiet(sweep, ctx['trades_path'], SWEEP_GRID)
+    return len(SWEEP_GRID) / (time.perf_counter() - t0), 'combos/s'
+
+# name -> (function, higher is better)
+BENCHMARKS = {
+    'backtest_batch_ticks_per_sec': (bench_backtest_batch, True),
+    'backtest_row_ticks_per_sec': (bench_backtest_row, True),
+    'strategy_decide_ns_per_tick': (bench_strategy_decide, False),
+    'strategy_decide_batch_ns_per_tick': (bench_strategy_decide_batch, False),
+    'env_steps_per_sec': (bench_env_step, True),
+    'shm_poll_empty_ns': (bench_shm_poll_empty, False),
+    'shm_publish_poll_ns': (bench_shm_publish_poll, False),
+    'recorder_ticks_per_sec': (bench_recorder, True),
+    'optimizer_combos_per_sec': (bench_optimizer, True),
+}
+
+def calibration():
+    """Fixed Python + NumPy workload (ms): how fast the machine is right now"""
+    values = np.random.default_rng(0).random(500000)
+    t0 = time.perf_counter()
+    total = 0
+    for i in range(300000):
+        total += i & 7
+    np.sort(values)
+    return (time.perf_counter() - t0) * 1000
+
+def make_context(root, names):
+    """Builds only the data the selected benchmarks need"""
+    ctx = {'root': root}
+    trades = synthetic_trades(TICKS)
+    ctx['prices'] = trades['price'].to_numpy().astype(np.float64)
+    if any(n.startswith(('backtest_batch', 'optimizer')) for n in names):
+        ctx['trades_path'] = os.path.join(root, "trades.parquet")
+        pq.write_table(trades, ctx['trades_path'], row_group_size=200000)
+    if any(n.startswith('backtest_row') for n in names):
+        ctx['row_path'] = os.path.join(root, "trades_row.parquet")
+        pq.write_table(trades.slice(0, ROW_TICKS), ctx['row_path'])
+    if any(n.startswith('env') for n in names):
+        df = trades.slice(0, 200000).select(['time', 'price', 'ibm']).to_pandas()
+        ctx['env'] = CryptoMarketMakingEnv(df, max_steps=20000)
+        ctx['actions'] = np.random.default_rng(0).integers(0, 4, ENV_STEPS).tolist()
+    if any(n.startswith('recorder') for n in names):
+        ctx['ring_ticks'] = synthetic_ring_ticks(RECORDER_TICKS)
+    return ctx
+
+# -----------------------------------------------------------------------------
+# RESULTS / BASELINE
+# -----------------------------------------------------------------------------
+def machine_info():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=BENCH_DIR, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ''
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'pyarrow': pa.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'commit': commit,
+    }
+
+def compare(results, baseline, threshold):
+    """-> list of (name, status, change) with change > 0 = better than the baseline"""
+    rows = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if base is None or base['value'] <= 0 or r['value'] <= 0:
+            rows.append((name, 'new', None))
+            continue
+        change = r['value'] / base['value'] - 1 if r['higher_is_better'] else base['value'] / r['value'] - 1
+        if change < -threshold:
+            status = 'REGRESSION'
+        elif change > threshold:
+            status = 'faster'
+        else:
+            status = 'ok'
+        rows.append((name, status, change))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline performance suite")
+    parser.add_argument("--only", default="", help="comma-separated name filters (substring match)")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--out", default=RESULTS_PATH)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="write the results as the new baseline")
+    args = parser.parse_args()
+
+    filters = [f for f in args.only.split(',') if f]
+    names = [n for n in BENCHMARKS if not filters or any(f in n for f in filters)]
+    if not names:
+        parser.error(f"No benchmark matches {args.only}")
+
+    root = tempfile.mkdtemp(prefix="hydra_suite_")
+    results = {}
+    try:
+        print(f"[Suite] Building synthetic data ({TICKS:,} trades)...")
+        ctx = make_context(root, names)
+        # Repeats are interleaved (round by round), so a slow phase of the machine
+        # costs every benchmark one run instead of costing one benchmark all of them
+        runs = {name: [] for name in names}
+        units = {}
+        calib = []
+        for r in range(args.repeats):
+            calib.append(calibration())
+            for name in names:
+                value, units[name] = BENCHMARKS[name][0](ctx)
+                runs[name].append(value)
+            print(f"\r[Suite] Round {r + 1}/{args.repeats} done", end="", flush=True)
+        print()
+        for name in names:
+            higher = BENCHMARKS[name][1]
+            best = max(runs[name]) if higher else min(runs[name])
+            results[name] = {'value': best, 'unit': units[name], 'higher_is_better': higher, 'runs': runs[name]}
+            print(f"[Suite] {name:<36} {best:>14,.1f} {units[name]}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    machine = machine_info()
+    machine['calibration_ms'] = min(calib)
+    report = {'machine': machine, 'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), 'results': results}
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"[Suite] Results written to {args.out}")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"[Suite] Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"[Suite] No baseline at {args.baseline} (create one with --update-baseline)")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline['machine'].get('platform') != report['machine']['platform'] or baseline['machine'].get('cpus') != report['machine']['cpus']:
+        print(f"[Suite] Warning: baseline recorded on a different machine ({baseline['machine'].get('platform')}, "
+              f"{baseline['machine'].get('cpus')} cpus)")
+
+    base_calib = baseline['machine'].get('calibration_ms')
+    if base_calib:
+        speed = base_calib / machine['calibration_ms'] - 1
+        print(f"[Suite] Calibration workload: {machine['calibration_ms']:.1f}ms vs {base_calib:.1f}ms in the baseline "
+              f"({speed:+.1%}){' - the machine itself is slower/faster, read the changes with that in mind' if abs(speed) > args.threshold / 2 else ''}")
+
+    rows = compare(results, baseline['results'], args.threshold)
+    print(f"\n{'Benchmark':<36} {'Current':>14} {'Baseline':>14} {'Change':>8}  Status")
+    print("-" * 86)
+    for name, status, change in rows:
+        base = baseline['results'].get(name)
+        base_s = f"{base['value']:>14,.1f}" if base else f"{'-':>14}"
+        change_s = f"{change:>+7.1%}" if change is not None else f"{'-':>7}"
+        print(f"{name:<36} {results[name]['value']:>14,.1f} {base_s} {change_s}  {status}")
+    regressions = [name for name, status, _ in rows if status == 'REGRESSION']
+    print(f"\n[Suite] {len(regressions)} regression(s) beyond {args.threshold:.0%} "
+          f"(baseline {baseline['machine'].get('commit') or '?'} from {baseline.get('created', '?')})")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,31 +1,54 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import pyarrow.parquet as pq
+from hydra_brain.dataset import TickDataset
+from hydra_brain.ledger import Ledger
 
 class BacktestEngine:
-    def __init__(self, initial_cash=10000.0, fee_rate=0.001):
+    def __init__(self, initial_cash=10000.0, fee_rate=0.001, ledger_path=None, plot_path="backtest_result.png", execution=None):
         self.initial_cash = initial_cash
         self.fee_rate = fee_rate
+        # None = instant fills at the trade price (fee_rate); or a hydra_brain/fill_sim.py
+        # LimitFillSimulator for latency + pending limit orders + maker/taker fees (batch modes)
+        self.execution = execution
         self.cash = initial_cash
         self.btc = 0.0
         
-        # Optimization: Don't store every single equity point (too much RAM)
-        # Store equity every 1000 ticks
-        self.equity_curve = [] 
-        self.trades = []
+        # Every fill + equity every 1000 ticks, in growable NumPy columns (hydra_brain/ledger.py)
+        self.ledger = Ledger()
+        self.ledger_path = ledger_path  # Written as <path>_fills.parquet / <path>_equity.parquet
+        self.plot_path = plot_path      # None = no chart (matplotlib is only imported to draw one)
         self.total_ticks = 0
+        self.metrics = None
+
+    @property
+    def equity_curve(self):
+        return self.ledger.equity['equity']
         
-    def run(self, parquet_path, strategy_func):
-        print(f"[Backtest] Streaming data from: {parquet_path}")
-        
-        # 1. Open Parquet File Stream
-        parquet_file = pq.ParquetFile(parquet_path)
+    def _open(self, source, strategy_func, start, end, columns):
+        # Column projection: explicit list > the strategy's declared `columns` > everything
+        if columns is None:
+            owner = getattr(strategy_func, '__self__', strategy_func)
+            columns = getattr(owner, 'columns', None)
+        if columns is not None:
+            # The engine fills at the trade price and timestamps the ledger
+            columns = list(columns) + [c for c in ('price', 'time') if c not in columns]
+
+        dataset = TickDataset(source, columns=columns, start=start, end=end, batch_size=100000)
+        print(f"[Backtest] {len(dataset.files)} file(s), columns: {columns or 'all'}, window: [{start}, {end})")
+        return dataset
+
+    def run(self, source, strategy_func, start=None, end=None, columns=None):
+        """source: parquet file, directory, glob or list of monthly files (read as one timeline)"""
+        print(f"[Backtest] Streaming data from: {source}")
+        if self.execution is not None:
+            raise ValueError("Execution models need run_batch() / run_bars()")
         
-        # 2. Iterate in batches of 100,000 rows
-        batch_size = 100000
+        # 1. Open the (multi-file) Parquet Stream, 100,000 rows per batch
+        dataset = self._open(source, strategy_func, start, end, columns)
         
-        for batch in parquet_file.iter_batches(batch_size=batch_size):
+        # 2. Iterate in batches (next batch is decoded in the background)
+        final_price = None
+        for batch in dataset:
             # Convert only this chunk to Pandas (Low RAM usage)
             df_chunk = batch.to_pandas()
             
@@ -37,7 +60,7 @@ class BacktestEngine:
                 # Calculate Equity (Optimization: Only record every 1000 ticks)
                 if self.total_ticks % 1000 == 0:
                     equity = self.cash + (self.btc * current_price)
-                    self.equity_curve.append(equity)
+                    self.ledger.equity.append(self.total_ticks - 1, row.time, equity)
                 
                 # STRATEGY DECISION
                 action = strategy_func(row, self.btc, self.cash)
@@ -49,8 +72,7 @@ class BacktestEngine:
                     if self.cash >= (cost + fee):
                         self.cash -= (cost + fee)
                         self.btc += 0.001
-                        # Only log trades, not every tick
-                        # self.trades.append(...) 
+                        self.ledger.fills.append(self.total_ticks - 1, row.time, 1, current_price, 0.001, fee, self.cash, self.btc)
 
                 elif action == 2: # SELL
                     if self.btc >= 0.001:
@@ -58,18 +80,178 @@ class BacktestEngine:
                         fee = revenue * self.fee_rate
                         self.cash += (revenue - fee)
                         self.btc -= 0.001
+                        self.ledger.fills.append(self.total_ticks - 1, row.time, 2, current_price, 0.001, fee, self.cash, self.btc)
 
             # Progress Indicator
+            if len(df_chunk) > 0:
+                final_price = df_chunk.iloc[-1]['price']
             print(f"\r[Backtest] Processed {self.total_ticks:,} ticks...", end="", flush=True)
 
         # Final Report
-        final_price = df_chunk.iloc[-1]['price']
+        print(f"\n[Backtest] Row groups read: {dataset.row_groups_read}/{dataset.row_groups_total}")
         self.generate_report(final_price)
 
+    def run_batch(self, source, strategy_func, start=None, end=None, columns=None):
+        """Batch mode: strategy_func(columns, btc, cash) -> action array per record batch
+        (or (actions, limit prices) for the execution model; 0 = market order)"""
+        print(f"[Backtest] Streaming data from: {source} (batch mode)")
+
+        dataset = self._open(source, strategy_func, start, end, columns)
+        final_price = None
+
+        for batch in dataset:
+            # Hand the strategy raw NumPy columns (no to_pandas round-trip)
+            columns = {name: batch.column(name).to_numpy(zero_copy_only=False) for name in batch.schema.names}
+
+            # Fills use float64 prices, same as the Python floats of the row path
+            prices = columns['price'].astype(np.float64)
+
+            # STRATEGY DECISION (whole batch at once)
+            actions, limits = self._decide(strategy_func, columns)
+
+            # EXECUTION LOGIC (vectorized)
+            self._apply_batch(prices, actions, columns['time'], columns, limits)
+            if len(prices) > 0:
+                final_price = prices[-1]
+
+            print(f"\r[Backtest] Processed {self.total_ticks:,} ticks...", end="", flush=True)
+
+        print(f"\n[Backtest] Row groups read: {dataset.row_groups_read}/{dataset.row_groups_total}")
+        self.generate_report(final_price)
+
+    def run_bars(self, bars, strategy_func, batch_size=100000):
+        """Batch mode on bars (hydra_brain/bars.py load_bars()): the strategy gets the bar
+        columns plus 'price' = close, and every bar is one "tick" (fills at the close)"""
+        n = len(bars['close'])
+        print(f"[Backtest] Running on {n:,} bars (batch mode)")
+        final_price = None
+        for s in range(0, n, batch_size):
+            columns = {name: values[s:s + batch_size] for name, values in bars.items()}
+            columns['price'] = columns['close']
+            prices = np.asarray(columns['close'], dtype=np.float64)
+            actions, limits = self._decide(strategy_func, columns)
+            self._apply_batch(prices, actions, columns['time'], columns, limits)
+            if len(prices) > 0:
+                final_price = prices[-1]
+        self.generate_report(final_price)
+
+    def _decide(self, strategy_func, columns):
+        out = strategy_func(columns, self.btc, self.cash)
+        if isinstance(out, tuple):
+            return np.asarray(out[0]), np.asarray(out[1], dtype=np.float64)
+        return np.asarray(out), None
+
+    def _apply_batch(self, prices, actions, times, columns=None, limits=None):
+        start_tick = self.total_ticks
+        start_cash, start_btc = self.cash, self.btc
+
+        if self.execution is None:
+            fill_idx, cash_after, btc_after = self._resolve_fills(prices, actions)
+            sides, fill_prices, fee_rate = actions[fill_idx], prices[fill_idx], self.fee_rate
+        else:
+            # Pending orders vs the batch's quotes -> fills at the touch, then the same wallet pass
+            bid, ask = self.execution.quotes(columns or {}, prices)
+            fill_idx, sides, fill_prices, fee_rate = self.execution.on_batch(times, bid, ask, actions, limits)
+            accepted, cash_after, btc_after = self._settle(sides == 1, fill_prices, fee_rate)
+            fill_idx, sides, fill_prices, fee_rate = fill_idx[accepted], sides[accepted], fill_prices[accepted], fee_rate[accepted]
+            cash_after, btc_after = cash_after[accepted], btc_after[accepted]
+        if len(fill_idx) > 0:
+            self.ledger.fills.extend(start_tick + fill_idx, times[fill_idx], sides, fill_prices,
+                                     np.full(len(fill_idx), 0.001), fill_prices * 0.001 * fee_rate, cash_after, btc_after)
+
+        # Equity sample every 1000th tick, valued with the state BEFORE that tick's fill
+        first = (999 - start_tick) % 1000
+        samples = np.arange(first, len(prices), 1000)
+        if len(samples) > 0:
+            k = np.searchsorted(fill_idx, samples, side='left') - 1
+            has_fill = k >= 0
+            k = np.maximum(k, 0)
+            if len(fill_idx) > 0:
+                cash_s = np.where(has_fill, cash_after[k], start_cash)
+                btc_s = np.where(has_fill, btc_after[k], start_btc)
+            else:
+                cash_s = np.full(len(samples), start_cash)
+                btc_s = np.full(len(samples), start_btc)
+            self.ledger.equity.extend(start_tick + samples, times[samples], cash_s + btc_s * prices[samples])
+
+        if len(fill_idx) > 0:
+            self.cash = float(cash_after[-1])
+            self.btc = float(btc_after[-1])
+        self.total_ticks += len(prices)
+
+    def _resolve_fills(self, prices, actions):
+        """Returns (tick index, cash after, btc after) for every accepted order in the batch"""
+        orders = np.flatnonzero((actions == 1) | (actions == 2))
+        accepted, cash_after, btc_after = self._settle(actions[orders] == 1, prices[orders], self.fee_rate)
+        return orders[accepted], cash_after[accepted], btc_after[accepted]
+
+    def _settle(self, is_buy, fill_prices, fee_rate):
+        """Applies 0.001 BTC fills in order: (accepted mask, cash after, btc after) per fill.
+        fee_rate: scalar or one rate per fill"""
+        if len(is_buy) == 0:
+            empty = np.empty(0)
+            return np.zeros(0, dtype=bool), empty, empty
+
+        n = len(is_buy)
+        notional = fill_prices * 0.001
+        fee = notional * fee_rate
+        buy_cost = notional + fee
+
+        # Same arithmetic as the row path: cash -= (cost + fee) / cash += (revenue - fee)
+        cash_delta = np.where(is_buy, -buy_cost, notional - fee)
+        btc_delta = np.where(is_buy, 0.001, -0.001)
+
+        accepted = np.zeros(n, dtype=bool)
+        cash_after = np.empty(n)
+        btc_after = np.empty(n)
+        cash, btc = self.cash, self.btc
+        pos = 0
+        rejections = 0
+
+        # Optimistic pass: assume every order fills, then cut at the first one that
+        # the wallet can't cover. np.cumsum adds left-to-right, so the running
+        # balances are bit-identical to applying the fills one by one.
+        while pos < n and rejections < 32:
+            cash_path = np.cumsum(np.concatenate(([cash], cash_delta[pos:])))
+            btc_path = np.cumsum(np.concatenate(([btc], btc_delta[pos:])))
+            ok = np.where(is_buy[pos:], cash_path[:-1] >= buy_cost[pos:], btc_path[:-1] >= 0.001)
+
+            bad = np.flatnonzero(~ok)
+            stop = bad[0] if len(bad) > 0 else len(ok)
+            accepted[pos:pos + stop] = True
+            cash_after[pos:pos + stop] = cash_path[1:stop + 1]
+            btc_after[pos:pos + stop] = btc_path[1:stop + 1]
+            cash, btc = cash_path[stop], btc_path[stop]
+            if len(bad) == 0:
+                pos = n
+                break
+            pos += stop + 1
+            rejections += 1
+
+        # Lots of rejected orders (e.g. SELL spam while flat): finish order by order
+        for j in range(pos, n):
+            if is_buy[j]:
+                if cash >= buy_cost[j]:
+                    cash -= buy_cost[j]
+                    btc += 0.001
+                    accepted[j] = True
+            elif btc >= 0.001:
+                cash += cash_delta[j]
+                btc -= 0.001
+                accepted[j] = True
+            cash_after[j] = cash
+            btc_after[j] = btc
+
+        return accepted, cash_after, btc_after
+
     def generate_report(self, final_price):
-        final_equity = self.cash + (self.btc * final_price)
-        pnl = final_equity - self.initial_cash
-        ret = (pnl / self.initial_cash) * 100
+        if self.total_ticks == 0 or final_price is None:
+            # Empty source / window: nothing traded, equity is the cash balance
+            print("[Backtest] No ticks in window")
+            final_equity = self.cash
+        else:
+            final_equity = self.cash + (self.btc * final_price)
+        self.metrics = m = self.ledger.metrics(self.initial_cash, final_equity)
         
         print("\n\n" + "="*40)
         print("          BACKTEST RESULTS          ")
@@ -77,17 +259,34 @@ class BacktestEngine:
         print(f"Total Ticks:    {self.total_ticks:,}")
         print(f"Initial Cash:   ${self.initial_cash:.2f}")
         print(f"Final Equity:   ${final_equity:.2f}")
-        print(f"Net Profit:     ${pnl:.2f} ({ret:.2f}%)")
+        print(f"Net Profit:     ${m['net_pnl']:.2f} ({m['return_pct']:.2f}%)")
+        print(f"Sharpe/Sortino: {m['sharpe']:.2f} / {m['sortino']:.2f} (annualized)")
+        print(f"Max Drawdown:   {m['max_drawdown_pct']:.2f}% (longest {m['max_drawdown_hours']:.1f}h under water)")
+        print(f"Trades:         {m['fills']:,} fills, {m['round_trips']:,} round trips, {m['win_rate_pct']:.1f}% won")
+        print(f"Turnover:       {m['turnover']:.2f}x capital | Fees: ${m['fees']:.2f} ({m['fee_drag_pct']:.2f}% drag)")
+        if self.execution is not None:
+            ex = self.execution
+            print(f"Execution:      {ex.orders:,} orders ({ex.replaced:,} replaced), {ex.latency_ms}+-{ex.jitter_ms}ms latency, "
+                  f"maker/taker {ex.maker_fee * 100:.3f}%/{ex.taker_fee * 100:.3f}%")
         print("="*40)
-        
+
+        if self.ledger_path:
+            fills_path, equity_path = self.ledger.to_parquet(self.ledger_path)
+            print(f"Ledger saved to {fills_path} / {equity_path}")
+        if self.plot_path and len(self.equity_curve) > 0:
+            self.plot(self.plot_path, m['return_pct'])
+
+    def plot(self, path, ret):
+        from matplotlib.figure import Figure # Lazy, and no pyplot/GUI backend involved
+
         # Plotting (Downsampled)
-        if len(self.equity_curve) > 0:
-            plt.figure(figsize=(12, 6))
-            plt.plot(self.equity_curve, label='Equity (x1000 ticks)')
-            plt.title(f"Backtest: {ret:.2f}% Return")
-            plt.xlabel("Time (x1000 ticks)")
-            plt.ylabel("Portfolio Value ($)")
-            plt.legend()
-            # Save plot instead of showing (better for headless servers)
-            plt.savefig("backtest_result.png")
-            print("Chart saved to backtest_result.png")
\ No newline at end of file
+        fig = Figure(figsize=(12, 6))
+        ax = fig.subplots()
+        ax.plot(self.equity_curve, label='Equity (x1000 ticks)')
+        ax.set_title(f"Backtest: {ret:.2f}% Return")
+        ax.set_xlabel("Time (x1000 ticks)")
+        ax.set_ylabel("Portfolio Value ($)")
+        ax.legend()
+        # Save plot instead of showing (better for headless servers)
+        fig.savefig(path)
+        print(f"Chart saved to {path}")
@@ -0,0 +1,209 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from hydra_brain.dataset import TickDataset, resolve_files
+
+# Bars from tick parquet, several resolutions in ONE streaming pass, cached on disk.
+#
+#   specs: "1s", "1m", "5m", "1h" (time bars, UTC-aligned) or "1000t" (every 1000 trades)
+#   columns per bar:
+#     time          open time (epoch ms; tick bars: time of the first trade)
+#     open, high, low, close, vwap          float64
+#     volume, buy_volume, sell_volume       float64 (aggressor side from ibm:
+#                                           buyer is maker -> the taker sold)
+#     trades        int64
+#
+# Time bars only exist where trades happened (no empty bars are synthesized).
+# The cache (data/bars/) is keyed by the sources' content hash + the spec, so
+# re-downloaded or edited files are picked up automatically:
+#
+#   python hydra_brain/bars.py data/parquet 1s 1m 5m 1000t
+
+BAR_COLUMNS = ['time', 'open', 'high', 'low', 'close', 'vwap', 'volume', 'buy_volume', 'sell_volume', 'trades']
+TICK_COLUMNS = ['time', 'price', 'qty', 'ibm']
+CACHE_DIR = "data/bars"
+CACHE_VERSION = 1    # Bump when the bar maths change
+_UNITS = {'s': 1000, 'm': 60000, 'h': 3600000, 'd': 86400000}
+
+def parse_spec(spec):
+    """'5m' -> ('time', 300000), '1000t' -> ('tick', 1000)"""
+    spec = spec.strip().lower()
+    try:
+        size = int(spec[:-1])
+    except ValueError:
+        size = 0
+    if size <= 0 or (spec[-1] != 't' and spec[-1] not in _UNITS):
+        raise ValueError(f"Bad bar spec '{spec}' (use e.g. 1s, 1m, 5m, 1h or 1000t)")
+    if spec[-1] == 't':
+        return 'tick', size
+    return 'time', size * _UNITS[spec[-1]]
+
+class _BarBuilder:
+    """Aggregates one spec batch by batch; the last (still open) bar carries over"""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.kind, self.size = parse_spec(spec)
+        self.chunks = []
+        self.open_bar = None  # dict of 1-element arrays + 'key'
+        self.last_key = None
+
+    def add(self, time_ms, price, qty, ibm, first_tick):
+        if len(time_ms) == 0:
+            return
+        if self.kind == 'time':
+            keys = time_ms // self.size
+        else:
+            keys = (first_tick + np.arange(len(time_ms), dtype=np.int64)) // self.size
+        if (self.last_key is not None and keys[0] < self.last_key) or (keys[1:] < keys[:-1]).any():
+            raise ValueError("Ticks are not in time order (rewrite them with hydra_brain/parquet_layout.py)")
+        self.last_key = keys[-1]
+
+        # Contiguous runs of one key = one bar each
+        starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        ends = np.append(starts[1:], len(keys))
+        taker_buy = qty * ~ibm
+        bars = {
+            'key': keys[starts],
+            'time': time_ms[starts],
+            'open': price[starts],
+            'high': np.maximum.reduceat(price, starts),
+            'low': np.minimum.reduceat(price, starts),
+            'close': price[ends - 1],
+            'volume': np.add.reduceat(qty, starts),
+            'notional': np.add.reduceat(price * qty, starts),
+            'buy_volume': np.add.reduceat(taker_buy, starts),
+            'trades': (ends - starts).astype(np.int64),
+        }
+
+        # Merge the first bar into the one left open by the previous batch
+        prev = self.open_bar
+        if prev is not None:
+            if prev['key'][0] == bars['key'][0]:
+                bars['time'][0] = prev['time'][0]
+                bars['open'][0] = prev['open'][0]
+                bars['high'][0] = max(prev['high'][0], bars['high'][0])
+                bars['low'][0] = min(prev['low'][0], bars['low'][0])
+                for name in ('volume', 'notional', 'buy_volume', 'trades'):
+                    bars[name][0] += prev[name][0]
+            else:
+                self.chunks.append(prev)
+
+        # Everything but the last bar is final
+        self.chunks.append({k: v[:-1] for k, v in bars.items()})
+        self.open_bar = {k: v[-1:].copy() for k, v in bars.items()}
+
+    def finish(self):
+        chunks = self.chunks + ([self.open_bar] if self.open_bar is not None else [])
+        if not chunks:
+            return {name: np.zeros(0, dtype=np.int64 if name in ('time', 'trades') else np.float64) for name in BAR_COLUMNS}
+        cols = {k: np.concatenate([c[k] for c in chunks]) for k in chunks[0]}
+        volume = cols['volume']
+        bars = {name: cols[name] for name in ('time', 'open', 'high', 'low', 'close')}
+        bars['time'] = bars['time'].astype(np.int64)
+        bars['vwap'] = np.divide(cols['notional'], volume, out=cols['close'].copy(), where=volume > 0)
+        bars['volume'] = volume
+        bars['buy_volume'] = cols['buy_volume']
+        bars['sell_volume'] = volume - cols['buy_volume']
+        bars['trades'] = cols['trades']
+        return bars
+
+def build_bars(source, specs, start=None, end=None, batch_size=1000000):
+    """{spec: {column: array}} for every spec, from one pass over the ticks"""
+    builders = [_BarBuilder(s) for s in specs]
+    ticks = 0
+    for batch in TickDataset(source, columns=TICK_COLUMNS, start=start, end=end, batch_size=batch_size):
+        time_ms = batch.column('time').to_numpy().astype(np.int64)
+        price = batch.column('price').to_numpy().astype(np.float64)
+        qty = batch.column('qty').to_numpy().astype(np.float64)
+        ibm = batch.column('ibm').to_numpy(zero_copy_only=False)
+        for b in builders:
+            b.add(time_ms, price, qty, ibm, ticks)
+        ticks += len(time_ms)
+    return {b.spec: b.finish() for b in builders}, ticks
+
+# -----------------------------------------------------------------------------
+# CACHE
+# -----------------------------------------------------------------------------
+def _file_hash(path, index):
+    """blake2b of the file contents, memoized per (size, mtime) in the cache index"""
+    st = os.stat(path)
+    key = os.path.abspath(path)
+    entry = index.get(key)
+    if entry and entry['bytes'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+        return entry['hash']
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(8 << 20), b''):
+            h.update(chunk)
+    index[key] = {'bytes': st.st_size, 'mtime_ns': st.st_mtime_ns, 'hash': h.hexdigest()}
+    return index[key]['hash']
+
+def source_hash(source, cache_dir=CACHE_DIR):
+    """One hash over the contents of every source file (in order)"""
+    index_path = os.path.join(cache_dir, "hashes.json")
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            index = json.load(f)
+    h = hashlib.blake2b(digest_size=12)
+    for path in resolve_files(source):
+        h.update(_file_hash(path, index).encode())
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(index_path, 'w') as f:
+        json.dump(index, f)
+    return h.hexdigest()
+
+def _cache_path(cache_dir, spec, src_hash, start, end):
+    h = hashlib.blake2b(f"{src_hash}|{parse_spec(spec)}|{start}|{end}|v{CACHE_VERSION}".encode(), digest_size=12)
+    return os.path.join(cache_dir, f"bars-{spec}-{h.hexdigest()}.npz")
+
+def load_bars(source, specs, start=None, end=None, cache_dir=CACHE_DIR):
+    """Bars for each spec (a string or a list), from the cache when the sources are unchanged.
+    Missing specs are built together in one pass and stored."""
+    single = isinstance(specs, str)
+    specs = [specs] if single else list(specs)
+    src_hash = source_hash(source, cache_dir)
+
+    result = {}
+    missing = []
+    for spec in specs:
+        path = _cache_path(cache_dir, spec, src_hash, start, end)
+        if os.path.exists(path):
+            with np.load(path) as f:
+                result[spec] = {name: f[name] for name in BAR_COLUMNS}
+        else:
+            missing.append(spec)
+
+    if missing:
+        start_time = time.time()
+        built, ticks = build_bars(source, missing, start, end)
+        for spec, bars in built.items():
+            path = _cache_path(cache_dir, spec, src_hash, start, end)
+            tmp = path[:-len('.npz')] + ".tmp.npz"
+            np.savez(tmp, **bars)
+            os.replace(tmp, path)
+            result[spec] = bars
+        sizes = ", ".join(f"{s}: {len(built[s]['close']):,}" for s in missing)
+        print(f"[Bars] Built {sizes} bars from {ticks:,} ticks in {time.time() - start_time:.1f}s")
+    return result[specs[0]] if single else result
+
+def main():
+    parser = argparse.ArgumentParser(description="Build / refresh the bar cache")
+    parser.add_argument("source", help="parquet file, directory, or glob")
+    parser.add_argument("specs", nargs="+", help="bar specs, e.g. 1s 1m 5m 1000t")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    args = parser.parse_args()
+
+    bars = load_bars(args.source, args.specs, cache_dir=args.cache_dir)
+    for spec, b in bars.items():
+        print(f"[Bars] {spec:>6}: {len(b['close']):>12,} bars, {int(b['trades'].sum()):,} trades")
+
+if __name__ == "__main__":
+    main()
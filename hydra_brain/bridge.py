@@ -0,0 +1,364 @@
+import os
+import sys
+import time
+import ctypes
+import platform
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from shared_defs.schema import TICK_RING_CAPACITY
+
+# -----------------------------------------------------------------------------
+# 1. FUTEX (shared-memory doorbell, Linux only)
+# -----------------------------------------------------------------------------
+_SYS_FUTEX = {'x86_64': 202, 'aarch64': 98, 'i686': 240, 'armv7l': 240}.get(platform.machine())
+_FUTEX_WAIT = 0 # Not FUTEX_PRIVATE: the word lives in memory shared with the C++ engine
+_FUTEX_WAKE = 1
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+try:
+    _libc = ctypes.CDLL(None, use_errno=True)
+    _libc.syscall.restype = ctypes.c_long
+except (OSError, AttributeError):
+    _libc = None
+
+def futex_available():
+    return _libc is not None and _SYS_FUTEX is not None and sys.platform.startswith('linux')
+
+def futex_wait(addr, expected, timeout):
+    """Sleeps while *addr == expected (returns at once if it already changed)"""
+    ts = _Timespec(int(timeout), int((timeout % 1) * 1e9))
+    _libc.syscall(ctypes.c_long(_SYS_FUTEX), ctypes.c_void_p(addr), ctypes.c_int(_FUTEX_WAIT),
+                  ctypes.c_uint32(expected), ctypes.byref(ts), None, ctypes.c_int(0))
+
+def futex_wake(addr):
+    _libc.syscall(ctypes.c_long(_SYS_FUTEX), ctypes.c_void_p(addr), ctypes.c_int(_FUTEX_WAKE),
+                  ctypes.c_int(2**31 - 1), None, None, ctypes.c_int(0))
+
+# -----------------------------------------------------------------------------
+# 2. WAIT POLICIES (what a reader does while the ring is empty)
+# -----------------------------------------------------------------------------
+class SpinWait:
+    """Busy-poll. Lowest detection latency, burns a full core."""
+    name = "spin"
+
+    def attach(self, reader):
+        pass
+
+    def wait(self, reader, deadline):
+        while reader.pending() == 0:
+            if time.monotonic() >= deadline:
+                return
+
+class YieldWait:
+    """Spin briefly, then give the core away with sched_yield() between polls."""
+    name = "yield"
+
+    def __init__(self, spin=200):
+        self.spin = spin
+
+    def attach(self, reader):
+        pass
+
+    def wait(self, reader, deadline):
+        for _ in range(self.spin):
+            if reader.pending() > 0:
+                return
+        while reader.pending() == 0:
+            if time.monotonic() >= deadline:
+                return
+            os.sched_yield()
+
+class SleepWait:
+    """Spin briefly, then sleep with exponential backoff (min_sleep -> max_sleep)."""
+    name = "sleep"
+
+    def __init__(self, spin=200, min_sleep=50e-6, max_sleep=2e-3):
+        self.spin = spin
+        self.min_sleep = min_sleep
+        self.max_sleep = max_sleep
+
+    def attach(self, reader):
+        pass
+
+    def wait(self, reader, deadline):
+        for _ in range(self.spin):
+            if reader.pending() > 0:
+                return
+        nap = self.min_sleep
+        while reader.pending() == 0:
+            now = time.monotonic()
+            if now >= deadline:
+                return
+            time.sleep(min(nap, deadline - now))
+            nap = min(nap * 2, self.max_sleep)
+
+class DoorbellWait:
+    """Spin briefly, then block on the ring's futex doorbell until the engine publishes."""
+    name = "doorbell"
+
+    def __init__(self, spin=200):
+        self.spin = spin
+
+    def attach(self, reader):
+        self.addr = ctypes.addressof(reader.ring) + type(reader.ring).doorbell.offset
+
+    def wait(self, reader, deadline):
+        for _ in range(self.spin):
+            if reader.pending() > 0:
+                return
+        # Armed only around the sleep: while we spin or process ticks the producer
+        # skips the FUTEX_WAKE syscall (single reader: the ring is SPSC)
+        ring = reader.ring
+        ring.doorbell_armed = 1
+        try:
+            while True:
+                # Read the doorbell AFTER arming and BEFORE re-checking the ring: a publish
+                # that missed the flag still changes the word, so futex_wait returns at once
+                bell = ring.doorbell
+                if reader.pending() > 0:
+                    return
+                now = time.monotonic()
+                if now >= deadline:
+                    return
+                futex_wait(self.addr, bell, deadline - now)
+        finally:
+            ring.doorbell_armed = 0
+
+WAIT_POLICIES = {p.name: p for p in (SpinWait, YieldWait, SleepWait, DoorbellWait)}
+
+def make_wait_policy(name=None):
+    """Policy by name; HYDRA_WAIT env var overrides the caller's default"""
+    name = os.environ.get('HYDRA_WAIT', name or 'spin')
+    if name not in WAIT_POLICIES:
+        raise ValueError(f"Unknown wait policy '{name}' (choose from {', '.join(WAIT_POLICIES)})")
+    if name == 'doorbell' and not futex_available():
+        print("[Bridge] futex not available on this platform, falling back to 'sleep'")
+        name = 'sleep'
+    return WAIT_POLICIES[name]()
+
+# -----------------------------------------------------------------------------
+# 3. TICK RING READER / WRITER
+# -----------------------------------------------------------------------------
+class TickReader:
+    """Consumer side of the shared-memory tick ring (one reader per process).
+
+    poll() drains every tick published since the previous call as ONE NumPy
+    structured array (fields: seq, local_time_ms, bid_price, bid_qty, ask_price,
+    ask_qty, recv_ns, publish_ns). Ticks the producer overwrote before we got to them are counted
+    in `overruns` instead of being silently lost. read() does the same but
+    first waits for data using the configured wait policy.
+    """
+
+    def __init__(self, layout, from_start=False, wait=None):
+        self.ring = layout.ticks
+        if self.ring.capacity not in (0, TICK_RING_CAPACITY):
+            raise RuntimeError(f"Tick ring capacity mismatch: engine={self.ring.capacity} python={TICK_RING_CAPACITY}")
+
+        # Zero-copy view of the slots
+        self.slots = np.ctypeslib.as_array(self.ring.slots)
+        self.capacity = len(self.slots)
+        self.mask = self.capacity - 1
+
+        # Start at the live edge unless asked to replay what is still in the ring
+        write_seq = self.ring.write_seq
+        self.last_seq = max(0, write_seq - self.capacity) if from_start else write_seq
+        self.overruns = 0
+        self.ticks_read = 0
+
+        self.wait_policy = wait if wait is not None else SpinWait()
+        self.wait_policy.attach(self)
+
+    def pending(self):
+        return self.ring.write_seq - self.last_seq
+
+    def read(self, timeout=1.0, max_ticks=None):
+        """Waits up to `timeout` seconds for new ticks, then drains them (may be empty)"""
+        if self.pending() == 0:
+            self.wait_policy.wait(self, time.monotonic() + timeout)
+        return self.poll(max_ticks)
+
+    def poll(self, max_ticks=None):
+        write_seq = self.ring.write_seq
+        first = self.last_seq + 1
+        if write_seq < first:
+            return self.slots[:0].copy() # Never hand out a view: it would pin the mmap
+
+        # Lapped: the oldest ticks are already gone
+        if write_seq - first + 1 > self.capacity:
+            self.overruns += write_seq - first + 1 - self.capacity
+            first = write_seq - self.capacity + 1
+
+        last = write_seq if max_ticks is None else min(write_seq, first + max_ticks - 1)
+        seqs = np.arange(first, last + 1, dtype=np.uint64)
+        idx = seqs & self.mask
+
+        # Seqlock check: the slot must carry the expected sequence number both
+        # before AND after the copy, otherwise the producer lapped us mid-copy.
+        # Laps overwrite the oldest slots first, so drop everything up to the last bad one.
+        ticks = self.slots[idx]
+        valid = (ticks['seq'] == seqs) & (self.slots['seq'][idx] == seqs)
+        if not valid.all():
+            cut = int(np.flatnonzero(~valid)[-1]) + 1
+            self.overruns += cut
+            ticks = ticks[cut:]
+
+        self.last_seq = last
+        self.ticks_read += len(ticks)
+        return ticks
+
+class TickWriter:
+    """Python producer with the same publish protocol as publish_tick() in main.cpp
+    (replay tools and benchmarks; the live producer is the C++ engine)."""
+
+    def __init__(self, layout):
+        self.layout = layout
+        self.ring = layout.ticks
+        self.ring.capacity = TICK_RING_CAPACITY
+        self.mask = TICK_RING_CAPACITY - 1
+        self.slots = np.ctypeslib.as_array(self.ring.slots)
+        self.doorbell_addr = ctypes.addressof(self.ring) + type(self.ring).doorbell.offset
+        self.can_wake = futex_available()
+
+    def publish(self, time_ms, bid, bid_qty, ask, ask_qty):
+        ring = self.ring
+        seq = ring.write_seq + 1
+        slot = ring.slots[seq & self.mask]
+        slot.seq = 0
+        slot.local_time_ms = time_ms
+        slot.bid_price = bid
+        slot.bid_qty = bid_qty
+        slot.ask_price = ask
+        slot.ask_qty = ask_qty
+        slot.recv_ns = slot.publish_ns = time.monotonic_ns() # No socket: received == published
+        slot.seq = seq
+        ring.write_seq = seq
+
+        self._finish(time_ms, bid, bid_qty, ask, ask_qty)
+        return seq
+
+    def publish_batch(self, times, bid, bid_qty, ask, ask_qty):
+        """Publishes many ticks with NumPy slot writes (same seqlock order, per slot group)"""
+        ring = self.ring
+        n = len(times)
+        pos = 0
+        while pos < n:
+            # Never lap ourselves inside one write
+            take = min(n - pos, TICK_RING_CAPACITY)
+            first = ring.write_seq + 1
+            now_ns = time.monotonic_ns()
+            seqs = np.arange(first, first + take, dtype=np.uint64)
+            idx = seqs & self.mask
+            src = slice(pos, pos + take)
+
+            self.slots['seq'][idx] = 0
+            self.slots['local_time_ms'][idx] = times[src]
+            self.slots['bid_price'][idx] = bid[src]
+            self.slots['bid_qty'][idx] = bid_qty[src]
+            self.slots['ask_price'][idx] = ask[src]
+            self.slots['ask_qty'][idx] = ask_qty[src]
+            self.slots['recv_ns'][idx] = now_ns
+            self.slots['publish_ns'][idx] = now_ns
+            self.slots['seq'][idx] = seqs
+            ring.write_seq = first + take - 1
+            pos += take
+
+        if n > 0:
+            self._finish(int(times[-1]), float(bid[-1]), float(bid_qty[-1]), float(ask[-1]), float(ask_qty[-1]))
+        return ring.write_seq
+
+    def _finish(self, time_ms, bid, bid_qty, ask, ask_qty):
+        # Latest-quote snapshot, like the engine
+        market = self.layout.market
+        market.bid_price = bid
+        market.ask_price = ask
+        market.bid_qty = bid_qty
+        market.ask_qty = ask_qty
+        market.local_time_ms = time_ms
+
+        ring = self.ring
+        ring.doorbell = (ring.doorbell + 1) & 0xFFFFFFFF
+        if ring.doorbell_armed and self.can_wake:
+            futex_wake(self.doorbell_addr)
+
+# -----------------------------------------------------------------------------
+# 4. CONFLATION (what a slow consumer does with the ticks that piled up)
+# -----------------------------------------------------------------------------
+CONFLATION_MODES = ('every', 'latest', 'aggregate')
+
+def tick_ofi(ticks):
+    """Per-tick order flow imbalance (bid_qty - ask_qty) / (bid_qty + ask_qty), 0 on an empty book"""
+    bid, ask = ticks['bid_qty'], ticks['ask_qty']
+    total = bid + ask
+    return np.divide(bid - ask, total, out=np.zeros(len(ticks)), where=total > 0)
+
+class Conflator:
+    """Turns one drained batch into the records the strategy decides on:
+
+      every       one record per tick (nothing dropped; decision latency grows with bursts)
+      latest      only the newest tick
+      aggregate   one record for the whole batch: the newest quote plus n_ticks,
+                  ofi_sum (sum of tick_ofi) and the high/low mid price of the batch
+
+    Every mode yields the same record dtype (tick fields + the four summary
+    fields; n_ticks=1 for a single tick), so the consumer loop doesn't change.
+    Ticks that never reach a decision are counted in `conflated`.
+    """
+
+    def __init__(self, mode='every'):
+        if mode not in CONFLATION_MODES:
+            raise ValueError(f"Unknown conflation mode '{mode}' (choose from {', '.join(CONFLATION_MODES)})")
+        self.mode = mode
+        self.dtype = None
+        self.ticks_in = 0
+        self.conflated = 0
+        self.last_report = time.monotonic()
+
+    def _records(self, ticks, n):
+        if self.dtype is None:
+            self.dtype = np.dtype(ticks.dtype.descr + [('n_ticks', '<u4'), ('ofi_sum', '<f8'), ('mid_high', '<f8'), ('mid_low', '<f8')])
+        out = np.zeros(n, dtype=self.dtype)
+        src = ticks[-n:]
+        for name in ticks.dtype.names:
+            out[name] = src[name]
+        return out
+
+    def conflate(self, ticks):
+        n = len(ticks)
+        self.ticks_in += n
+        if n == 0 or self.mode == 'every':
+            out = self._records(ticks, n)
+            if n:
+                out['n_ticks'] = 1
+                out['ofi_sum'] = tick_ofi(ticks)
+                out['mid_high'] = out['mid_low'] = (ticks['bid_price'] + ticks['ask_price']) / 2
+            return out
+
+        out = self._records(ticks, 1)
+        self.conflated += n - 1
+        if self.mode == 'latest':
+            out['n_ticks'] = 1
+            out['ofi_sum'] = tick_ofi(ticks[-1:])
+            out['mid_high'] = out['mid_low'] = (ticks['bid_price'][-1] + ticks['ask_price'][-1]) / 2
+        else:
+            mid = (ticks['bid_price'] + ticks['ask_price']) / 2
+            out['n_ticks'] = n
+            out['ofi_sum'] = tick_ofi(ticks).sum()
+            out['mid_high'] = mid.max()
+            out['mid_low'] = mid.min()
+        return out
+
+    def report(self, interval=60.0):
+        """Prints the conflated share at most once per `interval` seconds"""
+        now = time.monotonic()
+        if now - self.last_report < interval:
+            return
+        self.last_report = now
+        pct = 100.0 * self.conflated / self.ticks_in if self.ticks_in else 0.0
+        print(f"\n[Bridge] Conflation '{self.mode}': {self.conflated:,} of {self.ticks_in:,} ticks conflated ({pct:.1f}%)")
+
+def make_conflator(name=None):
+    """Conflator by mode name; HYDRA_CONFLATE env var overrides the caller's default"""
+    return Conflator(os.environ.get('HYDRA_CONFLATE', name or 'every'))
@@ -0,0 +1,154 @@
+import os
+import glob
+import queue
+import numbers
+import threading
+import numpy as np
+import pandas as pd
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# Sentinel pushed by the read-ahead thread when the dataset is exhausted
+_DONE = object()
+
+def resolve_files(source):
+    """Directory, glob, single file or list of files -> sorted list of parquet paths"""
+    if isinstance(source, (list, tuple)):
+        files = []
+        for s in source:
+            files.extend(resolve_files(s))
+        return files
+
+    source = os.fspath(source)
+    if os.path.isdir(source):
+        return sorted(glob.glob(os.path.join(source, '*.parquet')))
+    if any(ch in source for ch in '*?['):
+        return sorted(glob.glob(source))
+    return [source]
+
+def to_ms(ts):
+    """Epoch milliseconds from a number (Python or NumPy), a date string or a datetime (naive = UTC)"""
+    if ts is None:
+        return None
+    if isinstance(ts, (numbers.Real, np.integer, np.floating)): # Before pd.Timestamp, which reads NumPy ints as ns
+        return int(ts)
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize('UTC')
+    return ts.value // 1_000_000
+
+class TickDataset:
+    """Several monthly parquet files streamed as ONE time-ordered sequence of record batches.
+
+    - columns:     only these columns are decoded (None = all)
+    - start / end: keep ticks with start <= time < end; row groups entirely outside
+                   the window are skipped using the parquet min/max statistics
+    - prefetch:    batches decoded ahead by a background thread (0 = read inline)
+    """
+
+    def __init__(self, source, columns=None, start=None, end=None, batch_size=100000, prefetch=2):
+        self.files = resolve_files(source)
+        if not self.files:
+            raise FileNotFoundError(f"No parquet files found for {source}")
+
+        self.start = to_ms(start)
+        self.end = to_ms(end)
+        self.batch_size = batch_size
+        self.prefetch = prefetch
+
+        self.columns = None
+        if columns is not None:
+            self.columns = list(dict.fromkeys(columns))
+            if self.has_window and 'time' not in self.columns:
+                self.columns.append('time') # Needed to trim the boundary row groups
+
+        self.row_groups_total = 0
+        self.row_groups_read = 0
+
+    @property
+    def has_window(self):
+        return self.start is not None or self.end is not None
+
+    def _select_row_groups(self, parquet_file):
+        n = parquet_file.metadata.num_row_groups
+        self.row_groups_total += n
+        if not self.has_window:
+            self.row_groups_read += n
+            return list(range(n))
+
+        time_idx = parquet_file.schema_arrow.get_field_index('time')
+        selected = []
+        for i in range(n):
+            stats = parquet_file.metadata.row_group(i).column(time_idx).statistics
+            # No statistics -> we can't prove the group is outside the window, so read it
+            if stats is not None and stats.has_min_max:
+                if self.end is not None and stats.min >= self.end:
+                    continue
+                if self.start is not None and stats.max < self.start:
+                    continue
+            selected.append(i)
+        self.row_groups_read += len(selected)
+        return selected
+
+    def _read(self):
+        for path in self.files:
+            parquet_file = pq.ParquetFile(path)
+            row_groups = self._select_row_groups(parquet_file)
+            if not row_groups:
+                continue
+
+            for batch in parquet_file.iter_batches(batch_size=self.batch_size, row_groups=row_groups, columns=self.columns):
+                if self.has_window:
+                    mask = None
+                    if self.start is not None:
+                        mask = pc.greater_equal(batch.column('time'), self.start)
+                    if self.end is not None:
+                        upper = pc.less(batch.column('time'), self.end)
+                        mask = upper if mask is None else pc.and_(mask, upper)
+                    batch = batch.filter(mask)
+                    if batch.num_rows == 0:
+                        continue
+                yield batch
+
+    def __iter__(self):
+        if self.prefetch <= 0:
+            yield from self._read()
+            return
+
+        # Read-ahead: Arrow releases the GIL while decoding, so the next batch is
+        # decompressed on this thread while the caller simulates the current one
+        q = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def producer():
+            try:
+                for batch in self._read():
+                    if not put(batch):
+                        return
+                put(_DONE)
+            except BaseException as e:
+                put(e)
+
+        thread = threading.Thread(target=producer, name="hydra-readahead", daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = q.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # Consumer stopped early (or finished): release the producer
+            stop.set()
+            thread.join()
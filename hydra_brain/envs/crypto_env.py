@@ -1,91 +1,123 @@
 import gymnasium as gym
 import numpy as np
-import pandas as pd
 from gymnasium import spaces
 
+VOL_WINDOW = 20          # Ticks in the volatility window
+VOL_CHUNK = 1 << 16      # Windows per vectorized np.std call (bounds the temporary copy)
+
+def rolling_volatility(prices, window=VOL_WINDOW):
+    """np.std of the last `window` prices (fewer at the start, 0 for a single price)
+    for every tick, bit-identical to calling np.std on each window on its own."""
+    n = len(prices)
+    vol = np.zeros(n, dtype=np.result_type(prices.dtype, np.float32))
+
+    # Warmup: growing windows
+    for k in range(1, min(window - 1, n)):
+        vol[k] = np.std(prices[:k + 1])
+
+    # Full windows: copy each block of windows into contiguous rows so the
+    # per-row reduction is the same pairwise sum np.std does on a lone window
+    windows = np.lib.stride_tricks.sliding_window_view(prices, window) if n >= window else prices[:0].reshape(0, window)
+    for start in range(0, len(windows), VOL_CHUNK):
+        block = np.ascontiguousarray(windows[start:start + VOL_CHUNK])
+        vol[start + window - 1:start + window - 1 + len(block)] = np.std(block, axis=1)
+    return vol
+
+def env_columns(data):
+    """(price, ibm, volatility) from a DataFrame (converted once) or from an
+    open_feature_store() dict (memmaps used as they are, nothing is loaded)"""
+    if isinstance(data, dict):
+        return data['price'], data['ibm'], data['vol']
+    # Price keeps its float32 file dtype so the maths match the old row access exactly
+    price = np.ascontiguousarray(data['price'].to_numpy())
+    return price, np.ascontiguousarray(data['ibm'].to_numpy(), dtype=np.float32), rolling_volatility(price)
+
 class CryptoMarketMakingEnv(gym.Env):
-    def __init__(self, df, max_steps=0):
+    """data: DataFrame (price, ibm) or a feature-store dict. With random_start,
+    every reset() samples a new max_steps episode window from the whole dataset."""
+
+    def __init__(self, data, max_steps=0, random_start=False):
         super(CryptoMarketMakingEnv, self).__init__()
-        
-        # 1. Use the Pre-loaded DataFrame
-        self.df = df
-        self.max_steps = len(self.df) if max_steps == 0 else min(len(self.df), max_steps)
-        self.current_step = 0
-        
+
+        # 1. Contiguous columns (or memmaps) + precomputed volatility
+        self.price, self.ibm, self.volatility = env_columns(data)
+        self.n_ticks = len(self.price)
+        self.max_steps = self.n_ticks if max_steps == 0 else min(self.n_ticks, max_steps)
+        self.random_start = random_start
+        self.start = 0          # First tick of the current episode
+        self.current_step = 0   # Ticks since reset
+
         # 2. Define Action Space
         # 0=Hold, 1=Aggressive, 2=Passive, 3=Dump
         self.action_space = spaces.Discrete(4)
-        
+
         # 3. Define Observation Space
         # [Spread, OFI, Inventory, Volatility]
         self.observation_space = spaces.Box(
             low=-np.inf, high=np.inf, shape=(4,), dtype=np.float32
         )
-        
+
         # Simulation State
         self.inventory = 0.0
-        self.cash = 10000.0 
-        
-        # Volatility Tracking (For Reward)
-        self.recent_prices = []
+        self.cash = 10000.0
+        self._obs = np.zeros(4, dtype=np.float32) # Spread stays 0.0 (price-only data)
 
     def reset(self, seed=None):
         super().reset(seed=seed)
+        if self.random_start:
+            self.start = int(self.np_random.integers(0, self.n_ticks - self.max_steps + 1))
         self.current_step = 0
         self.inventory = 0.0
         self.cash = 10000.0
-        self.recent_prices = []
         return self._next_observation(), {}
-    
+
+    def _episode_volatility(self, i):
+        # Window of the last 20 prices up to tick i, never reaching back before the episode start
+        k = self.current_step
+        if k >= VOL_WINDOW - 1 or self.start == 0:
+            return self.volatility[i] # Precomputed
+        return np.std(self.price[self.start:i + 1]) if k > 0 else 0.0
+
     def _next_observation(self):
-        if self.current_step >= len(self.df):
-            self.current_step = len(self.df) - 1
-            
-        row = self.df.iloc[self.current_step]
-        
-        # Maintain a rolling window of last 20 prices for volatility
-        self.recent_prices.append(row['price'])
-        if len(self.recent_prices) > 20:
-            self.recent_prices.pop(0)
-            
-        volatility = np.std(self.recent_prices) if len(self.recent_prices) > 1 else 0.0
-
-        obs = np.array([
-            0.0, # Placeholder for Spread (Parquet data might only have price)
-            float(row['ibm']), # 'is_buyer_maker' acts as a proxy for flow direction
-            self.inventory,
-            volatility
-        ], dtype=np.float32)
-        return obs
-    
+        if self.start + self.current_step >= self.n_ticks:
+            self.current_step = self.n_ticks - 1 - self.start
+
+        i = self.start + self.current_step
+        self.last_volatility = self._episode_volatility(i)
+
+        obs = self._obs
+        obs[1] = self.ibm[i] # 'is_buyer_maker' acts as a proxy for flow direction
+        obs[2] = self.inventory
+        obs[3] = self.last_volatility
+        return obs.copy()
+
     def step(self, action):
         self.current_step += 1
         terminated = (self.current_step >= self.max_steps - 1)
         truncated = False
-        
-        row = self.df.iloc[self.current_step]
-        price = float(row['price'])
+
+        price = float(self.price[self.start + self.current_step])
         reward = 0
-        
+
         # --- EXECUTION LOGIC ---
         # We simulate a 0.01% spread capture
-        spread = price * 0.0001 
-        
+        spread = price * 0.0001
+
         if action == 1: # Aggressive (Buy)
             reward += spread
             self.inventory += 0.001
         elif action == 3: # Dump (Sell)
             reward -= spread
             self.inventory -= 0.001
-            
+
         # --- AVELLANEDA-STOIKOV REWARD ---
         # 1. Inventory Risk (Quadratic Penalty)
         inv_penalty = 0.5 * (self.inventory ** 2)
-        
-        # 2. Volatility Penalty
-        vol = np.std(self.recent_prices) if len(self.recent_prices) > 1 else 0.0
+
+        # 2. Volatility Penalty (window up to the PREVIOUS tick; a single price has none)
+        vol = self.last_volatility if self.current_step >= 2 else 0.0
         vol_penalty = vol * 1.0
-        
+
         reward = reward - inv_penalty - vol_penalty
-        
-        return self._next_observation(), reward, terminated, truncated, {}
\ No newline at end of file
+
+        return self._next_observation(), reward, terminated, truncated, {}
@@ -0,0 +1,369 @@
+import json
+import os
+import multiprocessing as mp
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.vec_env import VecEnv
+
+from hydra_brain.envs.crypto_env import env_columns, VOL_WINDOW
+
+SPREAD_RATE = np.float64(0.0001) # float64 scalar: float32 prices * rate is computed in float64, like float(row) * 0.0001
+
+class VecMarketMakingEnv(VecEnv):
+    """N CryptoMarketMakingEnv episodes stepped together as arrays (SB3 VecEnv).
+
+    All sub-envs share one set of tick columns; sub-env i replays the slice
+    starting at offsets[i] (default: evenly spaced), restarts there when its
+    episode ends, and keeps its own cursor / inventory / cash / volatility in
+    length-N vectors. Sub-env i behaves exactly like
+    DummyVecEnv([lambda: CryptoMarketMakingEnv(df.iloc[offsets[i]:], max_steps)]).
+
+    data is a DataFrame or a feature-store dict (memmaps). With random_start,
+    a sub-env draws a fresh max_steps window anywhere in the data on every reset.
+    """
+
+    def __init__(self, data, num_envs=8, max_steps=0, offsets=None, random_start=False, seed=None):
+        # 1. Shared Columns (same as CryptoMarketMakingEnv)
+        self.price, self.ibm, self.volatility = env_columns(data)
+        self.n_ticks = len(self.price)
+
+        # 2. Episode Layout: one slice per sub-env
+        if offsets is None:
+            offsets = np.arange(num_envs) * (self.n_ticks // num_envs)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        if len(self.offsets) != num_envs or self.offsets.min() < 0 or self.offsets.max() >= self.n_ticks:
+            raise ValueError(f"need {num_envs} offsets inside [0, {self.n_ticks})")
+        span = self.n_ticks // num_envs if max_steps == 0 else max_steps # 0 = each env's share
+        self.lengths = np.minimum(self.n_ticks - self.offsets, span)
+        self.max_steps = span
+        self.random_start = random_start
+        self.rng = np.random.default_rng(seed)
+
+        # 3. Per-Env State Vectors
+        self.steps = np.zeros(num_envs, dtype=np.int64)      # Ticks since reset
+        self.inventory = np.zeros(num_envs)
+        self.cash = np.full(num_envs, 10000.0)
+        self.vol = np.zeros(num_envs, dtype=self.volatility.dtype) # Volatility in the last obs
+        self.obs = np.zeros((num_envs, 4), dtype=np.float32)
+        self.actions = np.zeros(num_envs, dtype=np.int64)
+        self.all_envs = np.arange(num_envs)
+        self.render_mode = None
+
+        super().__init__(
+            num_envs,
+            spaces.Box(low=-np.inf, high=np.inf, shape=(4,), dtype=np.float32),
+            spaces.Discrete(4),
+        )
+
+    # -------------------------------------------------------------------------
+    # Core
+    # -------------------------------------------------------------------------
+    def _reset_envs(self, idx):
+        if self.random_start:
+            span = min(self.max_steps, self.n_ticks)
+            self.offsets[idx] = self.rng.integers(0, self.n_ticks - span + 1, len(idx))
+            self.lengths[idx] = span
+        self.steps[idx] = 0
+        self.inventory[idx] = 0.0
+        self.cash[idx] = 10000.0
+        self.vol[idx] = 0.0
+        self._observe(idx)
+
+    def _observe(self, idx):
+        cursor = self.offsets[idx] + self.steps[idx]
+        k = self.steps[idx]
+
+        # Volatility window never reaches back before the episode start
+        full = k >= VOL_WINDOW - 1
+        self.vol[idx[full]] = self.volatility[cursor[full]]
+        for i, n in zip(idx[~full].tolist(), k[~full].tolist()):
+            start = self.offsets[i]
+            self.vol[i] = np.std(self.price[start:start + n + 1]) if n > 0 else 0.0
+
+        self.obs[idx, 1] = self.ibm[cursor]
+        self.obs[idx, 2] = self.inventory[idx]
+        self.obs[idx, 3] = self.vol[idx]
+
+    def _observe_all(self):
+        # Fast path once every env is past the volatility warmup: whole-column writes only
+        if self.steps.min() < VOL_WINDOW - 1:
+            self._observe(self.all_envs)
+            return
+        cursor = self.offsets + self.steps
+        self.vol[:] = self.volatility[cursor]
+        self.obs[:, 1] = self.ibm[cursor]
+        self.obs[:, 2] = self.inventory
+        self.obs[:, 3] = self.vol
+
+    def reset(self):
+        if self._seeds[0] is not None: # From VecEnv.seed()
+            self.rng = np.random.default_rng(self._seeds[0])
+        self._reset_envs(self.all_envs)
+        self._reset_seeds()
+        self._reset_options()
+        return self.obs.copy()
+
+    def step_async(self, actions):
+        self.actions = np.asarray(actions).reshape(self.num_envs)
+
+    def step_wait(self):
+        self.steps += 1
+        dones = self.steps >= self.lengths - 1
+
+        # --- EXECUTION LOGIC --- (0.01% spread capture; +1 buy, -1 dump, 0 otherwise)
+        side = (self.actions == 1).astype(np.float64) - (self.actions == 3)
+        spread = self.price[self.offsets + self.steps] * SPREAD_RATE
+        self.inventory += 0.001 * side
+
+        # --- AVELLANEDA-STOIKOV REWARD --- (volatility from the previous observation)
+        inv_penalty = 0.5 * (self.inventory ** 2)
+        rewards = ((spread * side - inv_penalty).astype(self.vol.dtype) - self.vol).astype(np.float32, copy=False)
+
+        self._observe_all()
+
+        infos = [{"TimeLimit.truncated": False} for _ in range(self.num_envs)]
+        if dones.any():
+            done_idx = np.flatnonzero(dones)
+            for i in done_idx.tolist():
+                infos[i]["terminal_observation"] = self.obs[i].copy()
+            self._reset_envs(done_idx)
+        return self.obs.copy(), rewards, dones, infos
+
+    def close(self):
+        pass
+
+    # -------------------------------------------------------------------------
+    # VecEnv plumbing (there are no per-env Python objects to forward to)
+    # -------------------------------------------------------------------------
+    def _indices(self, indices):
+        if indices is None:
+            return range(self.num_envs)
+        if isinstance(indices, int):
+            return [indices]
+        return indices
+
+    def get_attr(self, attr_name, indices=None):
+        value = getattr(self, attr_name)
+        if isinstance(value, np.ndarray) and value.shape[:1] == (self.num_envs,):
+            return [value[i] for i in self._indices(indices)]
+        return [value for _ in self._indices(indices)]
+
+    def _per_env(self, attr_name):
+        """True if the attribute holds one value per sub-env (a (num_envs, ...) array)"""
+        value = getattr(self, attr_name, None)
+        return isinstance(value, np.ndarray) and value.shape[:1] == (self.num_envs,)
+
+    def set_attr(self, attr_name, value, indices=None):
+        indices = list(self._indices(indices))
+        if not indices:
+            return
+        if self._per_env(attr_name):
+            current = getattr(self, attr_name)
+            for i in indices:
+                current[i] = value
+        elif set(indices) != set(range(self.num_envs)):
+            # A scalar is shared by all sub-envs: setting it for some would set it for all
+            raise ValueError(f"'{attr_name}' is shared by all {self.num_envs} sub-envs: set it with indices=None")
+        else:
+            setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        """Calls a CryptoMarketMakingEnv method on each sub-env: the per-env versions are
+        _env_<name>(i, ...) below (reset, render, get_wrapper_attr)"""
+        method = getattr(self, f"_env_{method_name}", None)
+        if method is None:
+            raise AttributeError(f"VecMarketMakingEnv sub-envs have no method '{method_name}'")
+        return [method(i, *method_args, **method_kwargs) for i in self._indices(indices)]
+
+    def _env_reset(self, i, seed=None):
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self._reset_envs(np.array([i]))
+        return self.obs[i].copy()
+
+    def _env_render(self, i):
+        return None # render_mode is None, like CryptoMarketMakingEnv
+
+    def _env_get_wrapper_attr(self, i, name):
+        return self.get_attr(name, [i])[0]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._indices(indices)]
+
+
+# -----------------------------------------------------------------------------
+# Multi-process rollouts
+# -----------------------------------------------------------------------------
+def _worker(remote, parent_remote, store_dir, env_kwargs, buffers, lo, hi):
+    """Runs one VecMarketMakingEnv over the memmapped feature store (nothing is pickled but the path).
+
+    Observations / rewards / dones go straight into the parent's shared buffers
+    (rows lo:hi); the pipe only carries commands and the infos of finished episodes.
+    """
+    from hydra_brain.feature_store import open_feature_store # Worker-side import (keeps the module graph acyclic)
+
+    parent_remote.close()
+    data, _ = open_feature_store(store_dir)
+    env = VecMarketMakingEnv(data, **env_kwargs)
+    obs_buf = np.frombuffer(buffers[0], dtype=np.float32).reshape(-1, 4)[lo:hi]
+    rew_buf = np.frombuffer(buffers[1], dtype=np.float32)[lo:hi]
+    done_buf = np.frombuffer(buffers[2], dtype=np.bool_)[lo:hi]
+    try:
+        while True:
+            cmd, arg = remote.recv()
+            if cmd == 'step':
+                obs, rewards, dones, infos = env.step(arg)
+                obs_buf[:] = obs
+                rew_buf[:] = rewards
+                done_buf[:] = dones
+                remote.send([(i, info) for i, info in enumerate(infos) if 'terminal_observation' in info])
+            elif cmd == 'reset':
+                if arg is not None:
+                    env.rng = np.random.default_rng(arg)
+                obs_buf[:] = env.reset()
+                remote.send(None)
+            elif cmd == 'get_attr':
+                remote.send(env.get_attr(*arg))
+            elif cmd == 'set_attr':
+                remote.send(env.set_attr(*arg))
+            elif cmd == 'per_env':
+                remote.send(env._per_env(arg))
+            elif cmd == 'env_method':
+                name, args, kwargs, local = arg
+                remote.send(env.env_method(name, *args, indices=local, **kwargs))
+            elif cmd == 'close':
+                break
+    except (KeyboardInterrupt, EOFError):
+        pass
+    finally:
+        remote.close()
+
+class SubprocMarketMakingEnv(VecEnv):
+    """num_envs market-making episodes split over n_workers processes (SubprocVecEnv-style).
+
+    Every worker maps the same feature store (the OS page cache holds ONE copy
+    of the ticks) and steps its share of the sub-envs as arrays; the parent
+    only ships actions out and observations / rewards back. Sub-env i sees the
+    same offsets it would in a single VecMarketMakingEnv.
+    """
+
+    def __init__(self, store_dir, num_envs=8, n_workers=2, max_steps=0, random_start=False, seed=None, start_method=None):
+        with open(os.path.join(store_dir, "manifest.json")) as f:
+            n_ticks = json.load(f)['ticks']
+        n_workers = max(1, min(n_workers, num_envs))
+        offsets = np.arange(num_envs) * (n_ticks // num_envs)
+        span = n_ticks // num_envs if max_steps == 0 else max_steps
+        self.splits = np.array_split(np.arange(num_envs), n_workers)
+        self.base_seed = seed
+
+        # forkserver / spawn: workers must not inherit the parent's torch threads
+        if start_method is None:
+            start_method = 'forkserver' if 'forkserver' in mp.get_all_start_methods() else 'spawn'
+        ctx = mp.get_context(start_method)
+
+        # Shared step results: workers write their rows, the parent reads them without unpickling
+        buffers = (ctx.RawArray('b', num_envs * 4 * 4), ctx.RawArray('b', num_envs * 4), ctx.RawArray('b', num_envs))
+        self.obs = np.frombuffer(buffers[0], dtype=np.float32).reshape(num_envs, 4)
+        self.rewards = np.frombuffer(buffers[1], dtype=np.float32)
+        self.dones = np.frombuffer(buffers[2], dtype=np.bool_)
+
+        self.remotes, self.processes = [], []
+        for w, idx in enumerate(self.splits):
+            env_kwargs = {
+                'num_envs': len(idx), 'max_steps': span, 'offsets': offsets[idx],
+                'random_start': random_start, 'seed': None if seed is None else seed + w,
+            }
+            remote, work_remote = ctx.Pipe()
+            process = ctx.Process(target=_worker, daemon=True,
+                                  args=(work_remote, remote, store_dir, env_kwargs, buffers, int(idx[0]), int(idx[-1]) + 1))
+            process.start()
+            work_remote.close()
+            self.remotes.append(remote)
+            self.processes.append(process)
+        self.closed = False
+
+        super().__init__(
+            num_envs,
+            spaces.Box(low=-np.inf, high=np.inf, shape=(4,), dtype=np.float32),
+            spaces.Discrete(4),
+        )
+
+    def reset(self):
+        for w, remote in enumerate(self.remotes):
+            seed = None if self._seeds[0] is None else self._seeds[0] + w # From VecEnv.seed()
+            remote.send(('reset', seed))
+        for remote in self.remotes:
+            remote.recv()
+        self._reset_seeds()
+        self._reset_options()
+        return self.obs.copy()
+
+    def step_async(self, actions):
+        actions = np.asarray(actions).reshape(self.num_envs)
+        for remote, idx in zip(self.remotes, self.splits):
+            remote.send(('step', actions[idx]))
+
+    def step_wait(self):
+        infos = [{"TimeLimit.truncated": False} for _ in range(self.num_envs)]
+        for remote, idx in zip(self.remotes, self.splits):
+            for local, info in remote.recv():
+                infos[idx[local]] = info
+        return self.obs.copy(), self.rewards.copy(), self.dones.copy(), infos
+
+    def close(self):
+        if self.closed:
+            return
+        for remote in self.remotes:
+            remote.send(('close', None))
+        for process in self.processes:
+            process.join()
+        self.closed = True
+
+    def _indices(self, indices):
+        if indices is None:
+            return range(self.num_envs)
+        if isinstance(indices, int):
+            return [indices]
+        return indices
+
+    def get_attr(self, attr_name, indices=None):
+        for remote in self.remotes:
+            remote.send(('get_attr', (attr_name,)))
+        values = [v for remote in self.remotes for v in remote.recv()]
+        return [values[i] for i in self._indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        wanted = set(self._indices(indices))
+        if not wanted:
+            return
+        if wanted != set(range(self.num_envs)):
+            # Checked here, not per worker: a worker holding all of its own
+            # sub-envs would still set a shared attribute for them
+            self.remotes[0].send(('per_env', attr_name))
+            if not self.remotes[0].recv():
+                raise ValueError(f"'{attr_name}' is shared by all {self.num_envs} sub-envs: set it with indices=None")
+        sent = []
+        for remote, idx in zip(self.remotes, self.splits):
+            local = [j for j, i in enumerate(idx.tolist()) if i in wanted]
+            if local:
+                remote.send(('set_attr', (attr_name, value, local)))
+                sent.append(remote)
+        for remote in sent:
+            remote.recv()
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        if not hasattr(VecMarketMakingEnv, f"_env_{method_name}"): # Checked here: a worker must not die on it
+            raise AttributeError(f"SubprocMarketMakingEnv sub-envs have no method '{method_name}'")
+        wanted = list(self._indices(indices))
+        calls = []
+        for remote, idx in zip(self.remotes, self.splits):
+            local = [j for j, i in enumerate(idx.tolist()) if i in wanted]
+            remote.send(('env_method', (method_name, method_args, method_kwargs, local)))
+            calls.append((remote, idx[local].tolist()))
+        results = {}
+        for remote, envs in calls:
+            results.update(zip(envs, remote.recv()))
+        return [results[i] for i in wanted]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._indices(indices)]
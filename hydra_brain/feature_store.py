@@ -0,0 +1,132 @@
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+import pyarrow.parquet as pq
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from hydra_brain.dataset import TickDataset, resolve_files
+from hydra_brain.envs.crypto_env import rolling_volatility, VOL_WINDOW
+
+# RL feature store: the env's inputs as flat .npy files that training
+# memory-maps instead of loading every parquet file into one DataFrame.
+#
+#   data/features/
+#     manifest.json   ticks, dtypes, time range, source files (size + mtime)
+#     time.npy        uint64 epoch ms, sorted
+#     price.npy       float32 (file dtype)
+#     ibm.npy         bool
+#     vol.npy         20-tick rolling np.std of price (CryptoMarketMakingEnv semantics)
+#
+#   python hydra_brain/feature_store.py data/parquet data/features
+
+FEATURE_COLUMNS = ['time', 'price', 'ibm']
+MANIFEST = "manifest.json"
+VOL_CHUNK_TICKS = 4000000  # Volatility is computed in slices of this many ticks (bounded RAM)
+
+def _source_stamp(files):
+    return [{'file': os.path.basename(f), 'bytes': os.path.getsize(f), 'mtime_ns': os.stat(f).st_mtime_ns} for f in files]
+
+def is_fresh(store_dir, source):
+    """True if store_dir was built from exactly these (unchanged) parquet files"""
+    path = os.path.join(store_dir, MANIFEST)
+    if not os.path.exists(path):
+        return False
+    with open(path) as f:
+        manifest = json.load(f)
+    return manifest.get('sources') == _source_stamp(resolve_files(source))
+
+def build_feature_store(source, store_dir, batch_size=1000000):
+    """Streams parquet -> .npy memmaps (one batch in RAM at a time) and writes the manifest last"""
+    files = resolve_files(source)
+    if not files:
+        raise FileNotFoundError(f"No parquet files found for {source}")
+    os.makedirs(store_dir, exist_ok=True)
+    manifest_path = os.path.join(store_dir, MANIFEST)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path) # A half-built store must never look valid
+
+    start_time = time.time()
+    n = sum(pq.ParquetFile(f).metadata.num_rows for f in files)
+    price_type = pq.read_schema(files[0]).field('price').type.to_pandas_dtype()
+    print(f"[Features] Building {store_dir} from {len(files)} file(s), {n:,} ticks...")
+
+    def create(name, dtype):
+        return np.lib.format.open_memmap(os.path.join(store_dir, f"{name}.npy"), mode='w+', dtype=dtype, shape=(n,))
+
+    cols = {'time': create('time', np.uint64), 'price': create('price', price_type), 'ibm': create('ibm', np.bool_)}
+
+    # 1. Stream the raw columns
+    pos = 0
+    in_order = True
+    last_time = 0
+    for batch in TickDataset(files, columns=FEATURE_COLUMNS, batch_size=batch_size):
+        times = batch.column('time').to_numpy()
+        k = len(times)
+        cols['time'][pos:pos + k] = times
+        cols['price'][pos:pos + k] = batch.column('price').to_numpy()
+        cols['ibm'][pos:pos + k] = batch.column('ibm').to_numpy(zero_copy_only=False)
+        if k > 0:
+            in_order &= bool(times[0] >= last_time) and bool((times[1:] >= times[:-1]).all())
+            last_time = times[-1]
+        pos += k
+
+    # 2. Time order (monthly files normally arrive sorted; overlapping files don't)
+    if not in_order:
+        print("[Features] Files overlap in time: sorting (one column in RAM at a time)...")
+        order = np.argsort(cols['time'], kind='stable')
+        for name, arr in cols.items():
+            arr[:] = arr[order]
+        del order
+
+    # 3. Volatility, slice by slice (each slice re-reads the previous VOL_WINDOW - 1 prices)
+    vol = create('vol', np.result_type(price_type, np.float32))
+    price = cols['price']
+    for s in range(0, n, VOL_CHUNK_TICKS):
+        lo = max(0, s - (VOL_WINDOW - 1))
+        vol[s:s + VOL_CHUNK_TICKS] = rolling_volatility(np.asarray(price[lo:s + VOL_CHUNK_TICKS]))[s - lo:]
+
+    for arr in list(cols.values()) + [vol]:
+        arr.flush()
+
+    manifest = {
+        'ticks': n,
+        'vol_window': VOL_WINDOW,
+        'dtypes': {name: str(arr.dtype) for name, arr in list(cols.items()) + [('vol', vol)]},
+        'start_ms': int(cols['time'][0]) if n else None,
+        'end_ms': int(cols['time'][-1]) if n else None,
+        'sources': _source_stamp(files),
+        'built_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    del cols, vol, price
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"[Features] Done in {time.time() - start_time:.1f}s ({n:,} ticks)")
+    return manifest
+
+def open_feature_store(store_dir):
+    """Read-only memmaps {'time', 'price', 'ibm', 'vol'} + the manifest. Nothing is read
+    until it is indexed, so RSS follows the pages an episode actually touches."""
+    with open(os.path.join(store_dir, MANIFEST)) as f:
+        manifest = json.load(f)
+    arrays = {name: np.load(os.path.join(store_dir, f"{name}.npy"), mmap_mode='r') for name in manifest['dtypes']}
+    if any(len(a) != manifest['ticks'] for a in arrays.values()):
+        raise RuntimeError(f"Feature store {store_dir} is inconsistent with its manifest (rebuild it)")
+    return arrays, manifest
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the RL feature store (.npy memmaps)")
+    parser.add_argument("source", nargs="?", default="data/parquet", help="parquet file, directory, or glob")
+    parser.add_argument("out", nargs="?", default="data/features", help="output directory")
+    parser.add_argument("--force", action="store_true", help="rebuild even if the sources are unchanged")
+    args = parser.parse_args()
+
+    if not args.force and is_fresh(args.out, args.source):
+        print(f"[Features] {args.out} is up to date.")
+        return
+    build_feature_store(args.source, args.out)
+
+if __name__ == "__main__":
+    main()
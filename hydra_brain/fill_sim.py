@@ -0,0 +1,113 @@
+import numpy as np
+from hydra_brain.shadow import SIM_FEE_RATE, ORDER_LATENCY_MS
+
+class LimitFillSimulator:
+    """Backtest execution with the Shadow Mode rules (hydra_core execution_loop /
+    hydra_brain/shadow.py), vectorized over a batch instead of tick by tick:
+
+    - an order decided on tick i goes live `latency` ms later (never on tick i
+      itself: the engine has already checked that quote) and is the ONE pending
+      order until it fills or the next order replaces it (the replacing tick is
+      still checked against the old order first, like the engine does)
+    - BUY fills at the ask once limit == 0 (market) or limit >= ask,
+      SELL fills at the bid once limit == 0 or limit <= bid
+    - taker_fee if it crosses on its first live tick, maker_fee if it rested first
+      (both default to SIM_FEE_RATE: exactly the shadow engine)
+    - latency ~ Normal(latency_ms, jitter_ms) clipped at 0 per order (jitter 0 = fixed)
+
+    Trade-print data has no book, so quotes are price -/+ half_spread (replayer.py's
+    --spread convention) unless the batch carries bid_price / ask_price columns.
+
+    Orders are cut into disjoint tick windows, so the first crossing tick of every
+    order in the batch comes out of one masked pass + np.unique; the order still
+    pending at the end of a batch carries over to the next one.
+    """
+
+    def __init__(self, latency_ms=ORDER_LATENCY_MS, jitter_ms=0.0, maker_fee=SIM_FEE_RATE,
+                 taker_fee=SIM_FEE_RATE, half_spread=0.005, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.maker_fee = maker_fee
+        self.taker_fee = taker_fee
+        self.half_spread = half_spread
+        self.rng = np.random.default_rng(seed)
+        self.pending = None  # (side, limit, live_from_ms, rested) carried between batches
+        self.orders = 0
+        self.replaced = 0
+
+    def quotes(self, columns, prices):
+        if 'bid_price' in columns and 'ask_price' in columns:
+            return np.asarray(columns['bid_price'], dtype=np.float64), np.asarray(columns['ask_price'], dtype=np.float64)
+        return prices - self.half_spread, prices + self.half_spread
+
+    def _latency(self, n):
+        if self.jitter_ms <= 0:
+            return np.full(n, float(self.latency_ms))
+        return np.maximum(self.rng.normal(self.latency_ms, self.jitter_ms, n), 0.0)
+
+    def on_batch(self, times, bid, ask, actions, limits=None):
+        """-> (tick index, side, fill price, fee rate) of every fill in the batch, in time order"""
+        n = len(times)
+        times = np.asarray(times)
+        placed = np.flatnonzero((actions == 1) | (actions == 2))
+        side = actions[placed].astype(np.int8)
+        limit = np.zeros(len(placed)) if limits is None else np.asarray(limits, dtype=np.float64)[placed]
+        live_ms = times[placed].astype(np.float64) + self._latency(len(placed))
+        rested_before = np.zeros(len(placed), dtype=bool)
+        self.orders += len(placed)
+
+        # The order pending from the previous batch is order -1 (placed before tick 0)
+        if self.pending is not None:
+            p_side, p_limit, p_live, p_rested = self.pending
+            placed = np.concatenate(([-1], placed))
+            side = np.concatenate(([p_side], side)).astype(np.int8)
+            limit = np.concatenate(([p_limit], limit))
+            live_ms = np.concatenate(([p_live], live_ms))
+            rested_before = np.concatenate(([p_rested], rested_before))
+        self.pending = None
+        empty = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int8), np.zeros(0), np.zeros(0))
+        if len(placed) == 0 or n == 0:
+            if len(placed):
+                self.pending = (side[-1], limit[-1], live_ms[-1], rested_before[-1])
+            return empty
+
+        # 1. Live window of every order: [first live tick after placement, tick of the next order]
+        # (integer ms: time >= live_ms  <=>  time >= ceil(live_ms), no float copy of the times)
+        start = np.maximum(placed + 1, np.searchsorted(times, np.ceil(live_ms).astype(times.dtype), side='left'))
+        end = np.append(placed[1:], n - 1)
+        has_window = start <= end
+        k = np.flatnonzero(has_window)
+        last = len(placed) - 1
+        if len(k) == 0:
+            self.replaced += last
+            self.pending = (side[last], limit[last], live_ms[last], bool(rested_before[last]))
+            return empty
+
+        # 2. Which order (if any) is live on every tick (windows never overlap)
+        cover = np.zeros(n + 1, dtype=np.int32)
+        cover[start[k]] += 1
+        cover[end[k] + 1] -= 1
+        inside = np.cumsum(cover[:n], dtype=np.int32) > 0
+        opened = np.zeros(n, dtype=np.int32)
+        opened[start[k]] = 1
+        owner = k[np.maximum(np.cumsum(opened, dtype=np.int32) - 1, 0)]
+
+        # 3. Crossing test for the owning order on every tick, first hit per order
+        o_side, o_limit = side[owner], limit[owner]
+        market = o_limit == 0.0
+        crossed = inside & np.where(o_side == 1, market | (o_limit >= ask), market | (o_limit <= bid))
+        hits = np.flatnonzero(crossed)
+        filled_orders, first = np.unique(owner[hits], return_index=True)
+        fill_idx = hits[first]
+        # Every order but the last is replaced by the next one, unless it filled first
+        self.replaced += last - np.count_nonzero(filled_orders < last)
+
+        # 4. Last order still open at the batch end carries over
+        if len(filled_orders) == 0 or filled_orders[-1] != last:
+            self.pending = (side[last], limit[last], live_ms[last], bool(rested_before[last] or has_window[last]))
+
+        f_side = side[filled_orders]
+        f_price = np.where(f_side == 1, ask[fill_idx], bid[fill_idx])
+        maker = rested_before[filled_orders] | (fill_idx > start[filled_orders])
+        fee_rate = np.where(maker, self.maker_fee, self.taker_fee)
+        return fill_idx, f_side, f_price, fee_rate
@@ -0,0 +1,324 @@
+from array import array
+import numpy as np
+
+# Incremental indicators on preallocated NumPy ring buffers.
+#
+# Every indicator has two entry points that produce bit-identical numbers:
+#   update(x)            one tick, returns a Python float (live loops)
+#   update_batch(xs)     a chunk, returns one float64 per tick (backtests)
+# and both advance the same state, so a live strategy can be warmed up with
+# update_batch() on history and continue tick by tick with update().
+#
+# The trick is doing the same floating point operations in the same order on
+# both paths: running sums drop the evicted value, then add the new one (the
+# order the original TrendStrategy.decide() used), which np.cumsum reproduces
+# exactly over the interleaved (-evicted, new) steps because it accumulates
+# sequentially.
+#
+# Storage is an array('d') with a zero-copy NumPy view on top: 8 bytes per
+# value like a float64 array, but per-tick reads/writes go through the array
+# module (plain Python floats) instead of NumPy scalar boxing.
+
+class RingBuffer:
+    """Fixed-size float64 window. push() returns the value it overwrote (0.0 while filling)."""
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = capacity
+        self.data = array('d', bytes(8 * capacity))
+        self.buf = np.frombuffer(self.data, dtype=np.float64) # Same memory as self.data
+        self.pos = 0   # Next slot to write
+        self.count = 0 # Values held (<= capacity)
+
+    def push(self, x):
+        pos = self.pos
+        if self.count == self.capacity:
+            old = self.data[pos]
+        else:
+            old = 0.0
+            self.count += 1
+        self.data[pos] = x
+        self.pos = pos + 1 if pos + 1 < self.capacity else 0
+        return old
+
+    def push_batch(self, values):
+        """Pushes a chunk; returns what push() would have returned for each value"""
+        values = np.asarray(values, dtype=np.float64)
+        n = len(values)
+        pad = np.zeros(self.capacity - self.count)
+        evicted = np.concatenate((pad, self.values(), values))[:n]
+
+        take = min(n, self.capacity)
+        self.buf[(self.pos + np.arange(n - take, n)) % self.capacity] = values[n - take:]
+        self.pos = (self.pos + n) % self.capacity
+        self.count = min(self.count + n, self.capacity)
+        return evicted
+
+    def values(self):
+        """Held values, oldest first (copy)"""
+        if self.count < self.capacity:
+            return self.buf[:self.count].copy()
+        return np.concatenate((self.buf[self.pos:], self.buf[:self.pos]))
+
+    @property
+    def full(self):
+        return self.count == self.capacity
+
+    @property
+    def nbytes(self):
+        return self.buf.nbytes
+
+
+class SMA:
+    """Simple moving average. Divides by the full window during warmup, like
+    TrendStrategy always has (check `ready` before trusting the value)."""
+
+    def __init__(self, window):
+        self.window = window
+        self.ring = RingBuffer(window)
+        self.sum = 0.0
+        self.value = 0.0
+
+    @property
+    def count(self):
+        return self.ring.count
+
+    @property
+    def ready(self):
+        return self.ring.full
+
+    def update(self, x):
+        # RingBuffer.push() inlined: this is the per-tick hot path of live_trend.py
+        x = float(x)
+        ring = self.ring
+        pos = ring.pos
+        if ring.count == ring.capacity:
+            self.sum -= ring.data[pos] # Baseline order: sum -= oldest; sum += x
+        else:
+            ring.count += 1
+        ring.data[pos] = x
+        ring.pos = pos + 1 if pos + 1 < ring.capacity else 0
+        self.sum += x
+        self.value = self.sum / self.window
+        return self.value
+
+    def update_batch(self, xs):
+        xs = np.asarray(xs, dtype=np.float64)
+        if len(xs) == 0:
+            return np.zeros(0)
+        evicted = self.ring.push_batch(xs)
+        # sum, -evicted_0, x_0, -evicted_1, x_1, ... -> the running sum after every x
+        # (during warmup evicted is 0.0, and s - 0.0 is s: same as skipping the subtraction)
+        steps = np.empty(2 * len(xs) + 1)
+        steps[0] = self.sum
+        np.negative(evicted, out=steps[1::2])
+        steps[2::2] = xs
+        sums = np.cumsum(steps)[2::2]
+        self.sum = float(sums[-1])
+        means = sums / self.window
+        self.value = float(means[-1])
+        return means
+
+
+class EMA:
+    """Exponential moving average, alpha = 2 / (span + 1), seeded with the first value.
+
+    The recursion can't be vectorized without changing the rounding, so
+    update_batch() runs the same scalar loop as update() (still no allocations per tick).
+    """
+
+    def __init__(self, span=None, alpha=None):
+        if (span is None) == (alpha is None):
+            raise ValueError("pass exactly one of span / alpha")
+        self.alpha = float(alpha) if alpha is not None else 2.0 / (span + 1.0)
+        self.value = 0.0
+        self.count = 0
+
+    @property
+    def ready(self):
+        return self.count > 0
+
+    def update(self, x):
+        x = float(x)
+        if self.count == 0:
+            self.value = x
+        else:
+            self.value += self.alpha * (x - self.value)
+        self.count += 1
+        return self.value
+
+    def update_batch(self, xs):
+        xs = np.asarray(xs, dtype=np.float64)
+        out = []
+        value, alpha = self.value, self.alpha
+        for i, x in enumerate(xs.tolist()):
+            if self.count == 0 and i == 0:
+                value = x
+            else:
+                value += alpha * (x - value)
+            out.append(value)
+        self.count += len(xs)
+        self.value = value
+        return np.array(out, dtype=np.float64)
+
+
+class RollingVariance:
+    """Windowed Welford: running mean + M2 with the evicted value removed in the
+    same step. ddof=0 matches np.std / np.var defaults. Like EMA, update_batch()
+    replays the scalar recursion so both paths agree exactly."""
+
+    def __init__(self, window, ddof=0):
+        self.window = window
+        self.ddof = ddof
+        self.ring = RingBuffer(window)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.value = 0.0
+
+    @property
+    def count(self):
+        return self.ring.count
+
+    @property
+    def ready(self):
+        return self.ring.full
+
+    @property
+    def std(self):
+        return self.value ** 0.5
+
+    def _step(self, x, old, n_before):
+        # Returns the new (mean, m2); n_before = values held before x was added
+        if n_before < self.window:
+            delta = x - self.mean
+            mean = self.mean + delta / (n_before + 1)
+            return mean, self.m2 + delta * (x - mean)
+        mean = self.mean + (x - old) / self.window
+        return mean, self.m2 + (x - old) * (x - mean + old - self.mean)
+
+    def _variance(self, n):
+        return max(self.m2, 0.0) / (n - self.ddof) if n > self.ddof else 0.0
+
+    def update(self, x):
+        x = float(x)
+        n_before = self.ring.count
+        old = self.ring.push(x)
+        self.mean, self.m2 = self._step(x, old, n_before)
+        self.value = self._variance(self.ring.count)
+        return self.value
+
+    def update_batch(self, xs):
+        xs = np.asarray(xs, dtype=np.float64)
+        n_before = self.ring.count
+        evicted = self.ring.push_batch(xs)
+        out = []
+        for i, (x, old) in enumerate(zip(xs.tolist(), evicted.tolist())):
+            n = min(n_before + i, self.window)
+            self.mean, self.m2 = self._step(x, old, n)
+            out.append(self._variance(min(n + 1, self.window)))
+        if out:
+            self.value = out[-1]
+        return np.array(out, dtype=np.float64)
+
+
+class RollingMax:
+    """Rolling maximum over the last `window` values (monotonic queue of tick
+    indices, preallocated). Max is exact, so update_batch() uses a fully
+    vectorized van Herk / Gil-Werman pass and rebuilds the queue afterwards."""
+
+    def __init__(self, window):
+        self.window = window
+        self.ring = RingBuffer(window)
+        self.qdata = array('q', bytes(8 * window))  # Absolute tick indices, circular
+        self.queue = np.frombuffer(self.qdata, dtype=np.int64)
+        self.head = 0
+        self.size = 0
+        self.ticks = 0 # Absolute index of the next value
+        self.value = -np.inf
+
+    @property
+    def ready(self):
+        return self.ring.full
+
+    def update(self, x):
+        x = float(x)
+        t = self.ticks
+        buf, queue, w = self.ring.data, self.qdata, self.window
+        self.ring.push(x)
+
+        # Drop the expired front, then everything at the back that x dominates
+        if self.size and queue[self.head] <= t - w:
+            self.head = (self.head + 1) % w
+            self.size -= 1
+        while self.size and buf[queue[(self.head + self.size - 1) % w] % w] <= x:
+            self.size -= 1
+        queue[(self.head + self.size) % w] = t
+        self.size += 1
+
+        self.ticks = t + 1
+        self.value = buf[queue[self.head] % w]
+        return self.value
+
+    def update_batch(self, xs):
+        xs = np.asarray(xs, dtype=np.float64)
+        n, w = len(xs), self.window
+        if n == 0:
+            return np.zeros(0)
+
+        # Window i covers ext[i : i + w]; missing history is -inf
+        history = self.ring.values()[-(w - 1):] if w > 1 else np.zeros(0)
+        ext = np.concatenate((np.full(w - 1 - len(history), -np.inf), history, xs))
+        blocks = -(-len(ext) // w)
+        padded = np.full(blocks * w, -np.inf)
+        padded[:len(ext)] = ext
+        grid = padded.reshape(blocks, w)
+        prefix = np.maximum.accumulate(grid, axis=1).ravel()
+        suffix = np.maximum.accumulate(grid[:, ::-1], axis=1)[:, ::-1].ravel()
+        out = np.maximum(suffix[:n], prefix[w - 1:w - 1 + n])
+
+        self.ring.push_batch(xs)
+        self.ticks += n
+        self._rebuild()
+        self.value = float(out[-1])
+        return out
+
+    def _rebuild(self):
+        # Queue = indices whose value is greater than everything after them in the window
+        vals = self.ring.values()
+        later = np.concatenate((np.maximum.accumulate(vals[::-1])[::-1][1:], [-np.inf]))
+        keep = np.flatnonzero(vals > later)
+        self.head = 0
+        self.size = len(keep)
+        self.queue[:self.size] = self.ticks - len(vals) + keep
+
+    @property
+    def nbytes(self):
+        return self.ring.nbytes + self.queue.nbytes
+
+
+class RollingMin:
+    """Rolling minimum (RollingMax of the negated series; negation is exact)."""
+
+    def __init__(self, window):
+        self.window = window
+        self._max = RollingMax(window)
+        self.value = np.inf
+
+    @property
+    def ready(self):
+        return self._max.ready
+
+    def update(self, x):
+        self.value = -self._max.update(-float(x))
+        return self.value
+
+    def update_batch(self, xs):
+        out = -self._max.update_batch(-np.asarray(xs, dtype=np.float64))
+        if len(out):
+            self.value = float(out[-1])
+        return out
+
+    @property
+    def nbytes(self):
+        return self._max.nbytes
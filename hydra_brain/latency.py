@@ -0,0 +1,188 @@
+import os
+import sys
+import time
+import mmap
+import argparse
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from shared_defs.schema import (
+    SharedMemoryLayout, SHM_NAME, SHM_SIZE, LAT_STAGES, LAT_BUCKETS, LAT_STAGE_NAMES,
+    LAT_PUBLISH_TO_READ, LAT_READ_TO_DECISION, LAT_DECISION_TO_COMMAND, LAT_TICK_TO_ORDER,
+    latency_bucket,
+)
+
+# Tick-to-order latency, stage by stage. The C++ engine and the Python
+# strategy add into the same log-linear histograms in /hydra_shm
+# (LatencyHistograms in schema.h); this file holds the Python side and the
+# reporter:
+#
+#   python hydra_brain/latency.py              # one report
+#   python hydra_brain/latency.py --watch 5    # refresh every 5s
+#   python hydra_brain/latency.py --reset      # zero the histograms
+
+# -----------------------------------------------------------------------------
+# 1. BUCKETS (same as latency_bucket() in schema.h)
+# -----------------------------------------------------------------------------
+def latency_buckets(ns):
+    """Vectorized latency_bucket()"""
+    v = np.maximum(np.asarray(ns, dtype=np.int64), 0)
+    e = np.frexp(v.astype(np.float64))[1].astype(np.int64) - 1 # floor(log2(v))
+    idx = np.where(v < 8, v, (e - 2) * 8 + ((v >> np.maximum(e - 3, 0)) & 7))
+    return np.minimum(idx, LAT_BUCKETS - 1)
+
+def bucket_lower(idx):
+    """Smallest ns value that lands in bucket idx"""
+    idx = np.asarray(idx, dtype=np.int64)
+    e = idx // 8 + 2
+    return np.where(idx < 8, idx, (8 + idx % 8) << np.maximum(e - 3, 0))
+
+def percentile(counts, q, max_ns=0):
+    """q-quantile of one stage histogram (bucket upper edge, capped at the observed max)"""
+    total = int(counts.sum())
+    if total == 0:
+        return 0
+    idx = int(np.searchsorted(np.cumsum(counts), int(np.ceil(q * total))))
+    upper = int(bucket_lower(idx + 1)) - 1 if idx < LAT_BUCKETS - 1 else max_ns
+    return min(upper, max_ns) if max_ns else upper
+
+def record_latency(histograms, stage, ns):
+    """Adds one sample straight into shared memory (low-rate writers, e.g. ShadowExecutor)"""
+    ns = max(int(ns), 0)
+    histograms.counts[stage][latency_bucket(ns)] += 1
+    if ns > histograms.max_ns[stage]:
+        histograms.max_ns[stage] = ns
+
+# -----------------------------------------------------------------------------
+# 2. STRATEGY-SIDE PROBE
+# -----------------------------------------------------------------------------
+class LatencyProbe:
+    """Times the Python stages of the tick -> order path.
+
+        ticks = reader.read()
+        probe.on_read(ticks)                  # publish -> read (every tick)
+        ... strategy logic ...
+        probe.mark_decision()                 # signal fired
+        probe.stamp_command(cmd, recv_ns)     # decision -> command, tick -> order
+        cmd.command_id += 1
+        probe.on_batch_done()                 # read -> decision (whole drain)
+
+    Samples go into a local histogram and are added to /hydra_shm every
+    `flush_seconds`. Those adds are plain (not atomic): run one instrumented
+    strategy per engine, like the single command slot already assumes.
+    """
+
+    def __init__(self, layout, flush_seconds=1.0):
+        self.shared = layout.latency
+        self.local = np.zeros((LAT_STAGES, LAT_BUCKETS), dtype=np.uint64)
+        self.local_max = np.zeros(LAT_STAGES, dtype=np.uint64)
+        self.flush_seconds = flush_seconds
+        self.last_flush = time.monotonic()
+        self.read_ns = 0
+        self.decision_ns = 0
+
+    def record(self, stage, ns):
+        ns = max(int(ns), 0)
+        self.local[stage, latency_bucket(ns)] += 1
+        if ns > self.local_max[stage]:
+            self.local_max[stage] = ns
+
+    def on_read(self, ticks):
+        self.read_ns = time.monotonic_ns()
+        self.decision_ns = 0
+        published = ticks['publish_ns']
+        published = published[published > 0] # Producers that don't stamp leave 0
+        if len(published) > 0:
+            waits = self.read_ns - published.astype(np.int64)
+            np.add.at(self.local[LAT_PUBLISH_TO_READ], latency_buckets(waits), 1)
+            self.local_max[LAT_PUBLISH_TO_READ] = max(int(self.local_max[LAT_PUBLISH_TO_READ]), int(waits.max()))
+
+    def mark_decision(self):
+        self.decision_ns = time.monotonic_ns()
+
+    def stamp_command(self, command, tick_recv_ns=0):
+        """Call right before command_id += 1 (the engine reads write_ns once it sees the new id)"""
+        now = time.monotonic_ns()
+        self.record(LAT_DECISION_TO_COMMAND, now - (self.decision_ns or self.read_ns or now))
+        if tick_recv_ns > 0:
+            self.record(LAT_TICK_TO_ORDER, now - tick_recv_ns)
+        command.tick_recv_ns = tick_recv_ns
+        command.write_ns = now
+
+    def on_batch_done(self):
+        if self.read_ns > 0:
+            # Up to the signal if one fired (not the cool-down sleep after the order)
+            self.record(LAT_READ_TO_DECISION, (self.decision_ns or time.monotonic_ns()) - self.read_ns)
+        if time.monotonic() - self.last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        counts = np.ctypeslib.as_array(self.shared.counts)
+        counts += self.local
+        max_ns = np.ctypeslib.as_array(self.shared.max_ns)
+        np.maximum(max_ns, self.local_max, out=max_ns)
+        self.local[:] = 0
+        self.local_max[:] = 0
+        self.last_flush = time.monotonic()
+
+# -----------------------------------------------------------------------------
+# 3. REPORTER
+# -----------------------------------------------------------------------------
+def format_ns(ns):
+    if ns >= 1e9:
+        return f"{ns / 1e9:.2f}s"
+    if ns >= 1e6:
+        return f"{ns / 1e6:.2f}ms"
+    if ns >= 1e3:
+        return f"{ns / 1e3:.1f}us"
+    return f"{ns}ns"
+
+def report(histograms):
+    counts = np.ctypeslib.as_array(histograms.counts).copy()
+    max_ns = np.ctypeslib.as_array(histograms.max_ns).copy()
+    print(f"{'Stage':<22} {'count':>10} {'p50':>10} {'p99':>10} {'p99.9':>10} {'max':>10}")
+    print("-" * 77)
+    for stage, name in enumerate(LAT_STAGE_NAMES):
+        n = int(counts[stage].sum())
+        if n == 0:
+            print(f"{name:<22} {0:>10} {'-':>10} {'-':>10} {'-':>10} {'-':>10}")
+            continue
+        top = int(max_ns[stage])
+        p50, p99, p999 = (format_ns(percentile(counts[stage], q, top)) for q in (0.5, 0.99, 0.999))
+        print(f"{name:<22} {n:>10,} {p50:>10} {p99:>10} {p999:>10} {format_ns(top):>10}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Tick-to-order latency report from /hydra_shm")
+    parser.add_argument("--watch", type=float, default=0.0, help="refresh every N seconds")
+    parser.add_argument("--reset", action="store_true", help="zero all histograms and exit")
+    args = parser.parse_args()
+
+    try:
+        shm_fd = os.open(f"/dev/shm{SHM_NAME}", os.O_RDWR)
+    except FileNotFoundError:
+        print("[Latency] /hydra_shm not found. Is hydra_engine (or replayer.py) running?")
+        return
+
+    with mmap.mmap(shm_fd, SHM_SIZE, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE) as mm:
+        layout = SharedMemoryLayout.from_buffer(mm)
+        try:
+            if args.reset:
+                np.ctypeslib.as_array(layout.latency.counts)[:] = 0
+                np.ctypeslib.as_array(layout.latency.max_ns)[:] = 0
+                print("[Latency] Histograms cleared.")
+                return
+            while True:
+                if args.watch > 0:
+                    print("\033[2J\033[H", end="")
+                report(layout.latency)
+                if args.watch <= 0:
+                    break
+                time.sleep(args.watch)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            del layout # Release the mmap before it is closed
+    os.close(shm_fd)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Columnar backtest ledger: every fill plus the downsampled equity curve in
+# preallocated NumPy arrays that double when full (amortized O(1) appends,
+# memory = what was recorded, no per-fill Python objects), and the
+# performance metrics computed on those arrays.
+
+FILL_COLUMNS = [('tick', np.int64), ('time', np.int64), ('side', np.int8), ('price', np.float64),
+                ('qty', np.float64), ('fee', np.float64), ('cash', np.float64), ('position', np.float64)]
+EQUITY_COLUMNS = [('tick', np.int64), ('time', np.int64), ('equity', np.float64)]
+YEAR_MS = 365 * 86400000
+
+class ColumnBuffer:
+    """Growable set of equal-length NumPy columns"""
+
+    def __init__(self, columns, capacity=1024):
+        self.names = [name for name, _ in columns]
+        self.data = {name: np.zeros(capacity, dtype=dtype) for name, dtype in columns}
+        self.size = 0
+
+    def _reserve(self, n):
+        capacity = len(self.data[self.names[0]])
+        if self.size + n <= capacity:
+            return
+        while capacity < self.size + n:
+            capacity *= 2
+        for name, arr in self.data.items():
+            grown = np.zeros(capacity, dtype=arr.dtype)
+            grown[:self.size] = arr[:self.size]
+            self.data[name] = grown
+
+    def append(self, *values):
+        self._reserve(1)
+        for name, value in zip(self.names, values):
+            self.data[name][self.size] = value
+        self.size += 1
+
+    def extend(self, *columns):
+        n = len(columns[0])
+        self._reserve(n)
+        for name, values in zip(self.names, columns):
+            self.data[name][self.size:self.size + n] = values
+        self.size += n
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, name):
+        return self.data[name][:self.size]
+
+    def to_table(self):
+        return pa.table({name: self[name] for name in self.names})
+
+
+class Ledger:
+    """fills: tick, time (epoch ms), side (1=BUY 2=SELL), price, qty, fee, cash and position after
+    equity: tick, time, equity (sampled every 1000 ticks by BacktestEngine)"""
+
+    def __init__(self):
+        self.fills = ColumnBuffer(FILL_COLUMNS)
+        self.equity = ColumnBuffer(EQUITY_COLUMNS)
+
+    def to_parquet(self, path):
+        """Writes <path>_fills.parquet and <path>_equity.parquet"""
+        base = path[:-len('.parquet')] if path.endswith('.parquet') else path
+        pq.write_table(self.fills.to_table(), f"{base}_fills.parquet")
+        pq.write_table(self.equity.to_table(), f"{base}_equity.parquet")
+        return f"{base}_fills.parquet", f"{base}_equity.parquet"
+
+    def metrics(self, initial_cash, final_equity):
+        return performance_metrics(self.fills, self.equity, initial_cash, final_equity)
+
+
+def drawdown(equity, times):
+    """(max drawdown as a fraction, longest time spent below a previous peak in ms)"""
+    if len(equity) == 0:
+        return 0.0, 0
+    peak = np.maximum.accumulate(equity)
+    dd = equity / peak - 1.0
+    # Time since the most recent peak, for every sample
+    at_peak = np.flatnonzero(equity >= peak)
+    last_peak = at_peak[np.searchsorted(at_peak, np.arange(len(equity)), side='right') - 1]
+    return float(dd.min()), int((times - times[last_peak]).max())
+
+def round_trips(fills):
+    """PnL of every closed trade: FIFO matching of the engine's fixed-size lots
+    (k-th sell closes the k-th buy), fees on both legs included"""
+    side, price, qty, fee = fills['side'], fills['price'], fills['qty'], fills['fee']
+    buys, sells = np.flatnonzero(side == 1), np.flatnonzero(side == 2)
+    n = min(len(buys), len(sells))
+    b, s = buys[:n], sells[:n]
+    return price[s] * qty[s] - fee[s] - (price[b] * qty[b] + fee[b])
+
+def performance_metrics(fills, equity, initial_cash, final_equity):
+    values, times = equity['equity'], equity['time']
+    rets = np.diff(values) / values[:-1] if len(values) > 1 else np.zeros(0)
+
+    # Annualize with the average spacing of the equity samples (ticks arrive unevenly)
+    span_ms = float(times[-1] - times[0]) if len(times) > 1 else 0.0
+    periods = YEAR_MS * len(rets) / span_ms if span_ms > 0 else 0.0
+    scale = np.sqrt(periods) if periods > 0 else 1.0
+    std = rets.std() if len(rets) else 0.0
+    downside = np.sqrt(np.mean(np.minimum(rets, 0.0) ** 2)) if len(rets) else 0.0
+    sharpe = float(rets.mean() / std * scale) if std > 0 else 0.0
+    sortino = float(rets.mean() / downside * scale) if downside > 0 else 0.0
+
+    max_dd, dd_ms = drawdown(values, times)
+    notional = fills['price'] * fills['qty']
+    fees = float(fills['fee'].sum())
+    trips = round_trips(fills)
+    pnl = float(final_equity - initial_cash)
+    return {
+        'net_pnl': pnl,
+        'return_pct': pnl / initial_cash * 100,
+        'sharpe': sharpe,
+        'sortino': sortino,
+        'max_drawdown_pct': max_dd * 100,
+        'max_drawdown_hours': dd_ms / 3600000,
+        'fills': len(fills),
+        'round_trips': len(trips),
+        'win_rate_pct': float((trips > 0).mean() * 100) if len(trips) else 0.0,
+        'turnover': float(notional.sum()) / initial_cash,
+        'fees': fees,
+        'fee_drag_pct': fees / initial_cash * 100,
+    }
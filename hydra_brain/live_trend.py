@@ -3,7 +3,6 @@ import sys
 import os
 import mmap
 import ctypes
-from collections import deque
 
 # -----------------------------------------------------------------------------
 # 1. SYSTEM SETUP
@@ -11,6 +10,9 @@ from collections import deque
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(os.path.join(current_dir, '..'))
 from shared_defs.schema import SharedMemoryLayout, SHM_NAME, SHM_SIZE
+from hydra_brain.bridge import TickReader, make_wait_policy, make_conflator
+from hydra_brain.latency import LatencyProbe
+from hydra_brain.indicators import SMA
 
 # -----------------------------------------------------------------------------
 # 2. STRATEGY CONFIGURATION (The "Sniper" Settings)
@@ -26,6 +28,15 @@ MAX_INVENTORY = 0.005 # Max risk allowed (~$450)
 MIN_CASH = 15.0       # Minimum USDT required to trade
 TRAILING_STOP = 50.0  # Sell if price drops $50 from the highest point seen
 
+# CPU POLICY (spin | yield | sleep | doorbell, env HYDRA_WAIT overrides)
+WAIT_POLICY = "doorbell"  # Block on the engine's futex doorbell instead of pinning a core
+
+# CONFLATION (every | latest | aggregate, env HYDRA_CONFLATE overrides)
+# Ticks that pile up while we act (order sleeps, slow prints) are merged into one
+# decision instead of being replayed on stale quotes. The moving averages still
+# see every tick; only the decisions are conflated.
+CONFLATION = "aggregate"
+
 def main():
     print("-" * 60)
     print(f"[Hydra Sniper] Starting LIVE TREND STRATEGY ({SYMBOL})")
@@ -51,15 +62,12 @@ def main():
         # ---------------------------------------------------------------------
         # 4. INITIALIZE STATE
         # ---------------------------------------------------------------------
-        # High-Speed Deques for O(1) Moving Average Calculation
-        short_deque = deque(maxlen=SHORT_WINDOW)
-        long_deque = deque(maxlen=LONG_WINDOW)
-        short_sum = 0.0
-        long_sum = 0.0
+        # Same O(1) ring-buffer averages as TrendStrategy (backtest == live)
+        short_ma = SMA(SHORT_WINDOW)
+        long_ma = SMA(LONG_WINDOW)
         
         position = 0 # 0=Cash, 1=Long
         highest_price_seen = 0.0
-        last_time = 0
         
         # ---------------------------------------------------------------------
         # 5. STARTUP SYNC (The "Amnesia" Fix)
@@ -75,6 +83,9 @@ def main():
             highest_price_seen = layout.market.bid_price # Reset trailing stop base
         
         print("[Hydra Sniper] LIVE. Accumulating history...")
+        reader = TickReader(layout, wait=make_wait_policy(WAIT_POLICY))
+        probe = LatencyProbe(layout) # Report: python hydra_brain/latency.py
+        conflator = make_conflator(CONFLATION)
 
         # ---------------------------------------------------------------------
         # 6. THE HIGH-FREQUENCY LOOP
@@ -90,114 +101,129 @@ def main():
                 time.sleep(1)
                 continue
 
-            # B. Spinlock (Wait for NEW tick)
-            if layout.market.local_time_ms == last_time:
-                continue 
-            
-            # C. Read Market Data
-            bid = layout.market.bid_price
-            ask = layout.market.ask_price
-            price = (bid + ask) / 2
-            
-            real_usd = layout.market.real_usdt_balance
-            real_btc = layout.market.real_btc_balance 
-
-            # D. Update Moving Averages (O(1) Speed)
-            # Short Window
-            if len(short_deque) == SHORT_WINDOW:
-                short_sum -= short_deque[0]
-            short_deque.append(price)
-            short_sum += price
-            
-            # Long Window
-            if len(long_deque) == LONG_WINDOW:
-                long_sum -= long_deque[0]
-            long_deque.append(price)
-            long_sum += price
-            
-            # Warmup Progress Bar
-            if len(long_deque) < LONG_WINDOW:
-                if len(long_deque) % 100 == 0:
-                    pct = len(long_deque) / LONG_WINDOW * 100
-                    print(f"\r[Warmup] {len(long_deque)}/{LONG_WINDOW} ticks ({pct:.0f}%) | Price: {price:.2f}", end="", flush=True)
-                last_time = layout.market.local_time_ms
+            # B. Drain ALL new ticks from the ring (waits per WAIT_POLICY, wakes up
+            #    at least once a second so the stale check above keeps running)
+            ticks = reader.read(timeout=1.0)
+            if len(ticks) == 0:
                 continue
+            probe.on_read(ticks)
+
+            records = conflator.conflate(ticks)
+            if len(records) < len(ticks):
+                # Skipped ticks still move the averages (batch update == tick by tick)
+                skipped = ticks[:len(ticks) - len(records)]
+                mids = (skipped['bid_price'] + skipped['ask_price']) / 2
+                short_ma.update_batch(mids)
+                long_ma.update_batch(mids)
+            conflator.report()
 
-            # E. Calculate Signals
-            short_avg = short_sum / SHORT_WINDOW
-            long_avg = long_sum / LONG_WINDOW
+            for i, (bid, ask, recv_ns, mid_high) in enumerate(zip(records['bid_price'].tolist(), records['ask_price'].tolist(),
+                                                                  records['recv_ns'].tolist(), records['mid_high'].tolist())):
+                # C. Read Market Data (newest quote of this record)
+                price = (bid + ask) / 2
             
-            # -----------------------------------------------------------------
-            # 7. RISK MANAGER: TRAILING STOP
-            # -----------------------------------------------------------------
-            if position == 1:
-                # Track Peak Price
-                if price > highest_price_seen:
-                    highest_price_seen = price
+                real_usd = layout.market.real_usdt_balance
+                real_btc = layout.market.real_btc_balance 
+
+                # D. Update Moving Averages (O(1) Speed)
+                short_avg = short_ma.update(price)
+                long_avg = long_ma.update(price)
+            
+                # Warmup Progress Bar
+                if not long_ma.ready:
+                    if long_ma.count % 100 == 0:
+                        pct = long_ma.count / LONG_WINDOW * 100
+                        print(f"\r[Warmup] {long_ma.count}/{LONG_WINDOW} ticks ({pct:.0f}%) | Price: {price:.2f}", end="", flush=True)
+                    continue
+            
+                # -----------------------------------------------------------------
+                # 7. RISK MANAGER: TRAILING STOP
+                # -----------------------------------------------------------------
+                if position == 1:
+                    # Track Peak Price (including the conflated ticks)
+                    if mid_high > highest_price_seen:
+                        highest_price_seen = mid_high
                 
-                # Check Drawdown
-                drawdown = highest_price_seen - price
-                if drawdown > TRAILING_STOP:
-                    print(f"\n[RISK] TRAILING STOP HIT! Dropped ${drawdown:.2f} from Peak (${highest_price_seen:.2f})")
+                    # Check Drawdown
+                    drawdown = highest_price_seen - price
+                    if drawdown > TRAILING_STOP:
+                        probe.mark_decision()
+                        print(f"\n[RISK] TRAILING STOP HIT! Dropped ${drawdown:.2f} from Peak (${highest_price_seen:.2f})")
                     
-                    # Panic Sell (Limit Order inside spread to exit fast)
-                    target_price = ask - 10.0 
+                        # Panic Sell (Limit Order inside spread to exit fast)
+                        target_price = ask - 10.0 
                     
-                    layout.command.action = 2 # SELL
-                    layout.command.quantity = TRADE_SIZE
-                    layout.command.price = target_price 
-                    layout.command.command_id += 1
+                        layout.command.action = 2 # SELL
+                        layout.command.quantity = TRADE_SIZE
+                        layout.command.price = target_price 
+                        probe.stamp_command(layout.command, recv_ns)
+                        layout.command.command_id += 1
                     
-                    position = 0
-                    highest_price_seen = 0.0
-                    time.sleep(5) # Wait for dust to settle
-                    continue
+                        position = 0
+                        highest_price_seen = 0.0
+                        time.sleep(5) # Wait for dust to settle
+                        break # Next decision starts from a fresh read
 
-            # -----------------------------------------------------------------
-            # 8. STRATEGY: TREND SNIPER
-            # -----------------------------------------------------------------
+                # -----------------------------------------------------------------
+                # 8. STRATEGY: TREND SNIPER
+                # -----------------------------------------------------------------
             
-            # BUY SIGNAL (Golden Cross + Band)
-            if short_avg > long_avg * (1 + THRESHOLD):
-                # Filter: Cash Check & Inventory Check
-                if position == 0 and real_usd > MIN_CASH and real_btc < MAX_INVENTORY:
+                # BUY SIGNAL (Golden Cross + Band)
+                if short_avg > long_avg * (1 + THRESHOLD):
+                    # Filter: Cash Check & Inventory Check
+                    if position == 0 and real_usd > MIN_CASH and real_btc < MAX_INVENTORY:
+                        probe.mark_decision()
                     
-                    # EXECUTION: Limit Order @ Best Bid + 0.01 (Penny Jumping)
-                    target_price = bid + 0.01
+                        # EXECUTION: Limit Order @ Best Bid + 0.01 (Penny Jumping)
+                        target_price = bid + 0.01
                     
-                    print(f"\n[SNIPER] BUY SIGNAL! (S:{short_avg:.2f} > L:{long_avg:.2f})")
-                    print(f"         -> POSTING LIMIT BUY @ {target_price:.2f}")
+                        print(f"\n[SNIPER] BUY SIGNAL! (S:{short_avg:.2f} > L:{long_avg:.2f})")
+                        print(f"         -> POSTING LIMIT BUY @ {target_price:.2f}")
                     
-                    layout.command.action = 1 # BUY
-                    layout.command.quantity = TRADE_SIZE
-                    layout.command.price = target_price 
-                    layout.command.command_id += 1
+                        layout.command.action = 1 # BUY
+                        layout.command.quantity = TRADE_SIZE
+                        layout.command.price = target_price 
+                        probe.stamp_command(layout.command, recv_ns)
+                        layout.command.command_id += 1
                     
-                    position = 1
-                    highest_price_seen = price # Initialize stop loss baseline
-                    time.sleep(2)
+                        position = 1
+                        highest_price_seen = price # Initialize stop loss baseline
+                        time.sleep(2)
+                        break
             
-            # SELL SIGNAL (Trend Collapse)
-            elif short_avg < long_avg:
-                # Filter: Do we have inventory?
-                if position == 1 and real_btc >= TRADE_SIZE:
+                # SELL SIGNAL (Trend Collapse)
+                elif short_avg < long_avg:
+                    # Filter: Do we have inventory?
+                    if position == 1 and real_btc >= TRADE_SIZE:
+                        probe.mark_decision()
                     
-                    # EXECUTION: Limit Order @ Best Ask - 0.01
-                    target_price = ask - 0.01 
+                        # EXECUTION: Limit Order @ Best Ask - 0.01
+                        target_price = ask - 0.01 
                     
-                    print(f"\n[SNIPER] SELL SIGNAL! (Trend Down)")
-                    print(f"         -> POSTING LIMIT SELL @ {target_price:.2f}")
+                        print(f"\n[SNIPER] SELL SIGNAL! (Trend Down)")
+                        print(f"         -> POSTING LIMIT SELL @ {target_price:.2f}")
                     
-                    layout.command.action = 2 # SELL
-                    layout.command.quantity = TRADE_SIZE 
-                    layout.command.price = target_price 
-                    layout.command.command_id += 1
+                        layout.command.action = 2 # SELL
+                        layout.command.quantity = TRADE_SIZE 
+                        layout.command.price = target_price 
+                        probe.stamp_command(layout.command, recv_ns)
+                        layout.command.command_id += 1
                     
-                    position = 0
-                    highest_price_seen = 0.0
-                    time.sleep(2)
+                        position = 0
+                        highest_price_seen = 0.0
+                        time.sleep(2)
+                        break
+
+            # Records still queued after an order went out are seconds old by now:
+            # drop them like conflated ticks (they still move the averages)
+            stale = records[i + 1:]
+            if len(stale):
+                conflator.conflated += int(stale['n_ticks'].sum())
+                mids = (stale['bid_price'] + stale['ask_price']) / 2
+                short_ma.update_batch(mids)
+                long_ma.update_batch(mids)
 
-            last_time = layout.market.local_time_ms
+            probe.on_batch_done()
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,162 @@
+import os
+import sys
+import argparse
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Torch-free inference for the RecurrentPPO MlpLstmPolicy.
+#
+# export_policy() copies the actor half of the trained policy (LSTM ->
+# policy MLP -> action_net) into one small .npz; LstmPolicy replays
+# predict(..., deterministic=True) on it with plain NumPy in float32, the
+# dtype SB3 runs in, so the live loop never has to import torch:
+#
+#   python hydra_brain/lstm_policy.py checkpoints/hydra_lstm_v1.zip checkpoints/hydra_lstm_v1.npz
+#
+# The critic is not exported (it never influences the action).
+
+ACTIVATIONS = {
+    'Tanh': np.tanh,
+    'ReLU': lambda x, out: np.maximum(x, 0, out=out),
+}
+
+def export_policy(model, out_path):
+    """model: a RecurrentPPO instance or the path of its .zip. Writes the actor weights to out_path (.npz)."""
+    if isinstance(model, str):
+        from sb3_contrib import RecurrentPPO # Torch is only needed here
+        model = RecurrentPPO.load(model, device='cpu')
+
+    policy = model.policy
+    if not hasattr(policy.action_space, 'n'):
+        raise ValueError("Only Discrete action spaces can be exported")
+    activation = policy.activation_fn.__name__
+    if activation not in ACTIVATIONS:
+        raise ValueError(f"Unsupported activation {activation}")
+
+    state = {k: v.detach().cpu().numpy().astype(np.float32) for k, v in policy.state_dict().items()}
+    lstm = policy.lstm_actor
+    arrays = {}
+    for layer in range(lstm.num_layers):
+        for name in ('weight_ih', 'weight_hh', 'bias_ih', 'bias_hh'):
+            arrays[f'lstm_{name}_{layer}'] = state[f'lstm_actor.{name}_l{layer}']
+
+    # policy_net is Sequential(Linear, act, Linear, act, ...): keep the Linear layers in order
+    mlp = [k[:-len('.weight')] for k in state if k.startswith('mlp_extractor.policy_net.') and k.endswith('.weight')]
+    mlp.sort(key=lambda k: int(k.rsplit('.', 1)[1]))
+    for i, key in enumerate(mlp):
+        arrays[f'mlp_weight_{i}'] = state[f'{key}.weight']
+        arrays[f'mlp_bias_{i}'] = state[f'{key}.bias']
+    arrays['action_weight'] = state['action_net.weight']
+    arrays['action_bias'] = state['action_net.bias']
+
+    meta = np.array([lstm.num_layers, lstm.hidden_size, len(mlp)], dtype=np.int64)
+    np.savez(out_path, meta=meta, activation=np.array(activation), **arrays)
+    size = os.path.getsize(out_path if out_path.endswith('.npz') else out_path + '.npz')
+    print(f"[Export] {lstm.num_layers}x LSTM({lstm.input_size}, {lstm.hidden_size}) + {len(mlp)} {activation} layers -> {out_path} ({size / 1024:.0f} KB)")
+    return out_path
+
+
+class LstmPolicy:
+    """Deterministic MlpLstmPolicy for a single env. Hidden/cell state and every
+    intermediate vector are preallocated, so act() allocates nothing per tick."""
+
+    def __init__(self, path):
+        with np.load(path) as f:
+            n_layers, hidden, n_mlp = (int(v) for v in f['meta'])
+            self.activation = ACTIVATIONS[str(f['activation'])]
+            # Weights are kept transposed: x @ W.T (what torch's linear computes) runs
+            # as a row-vector product over contiguous rows, ~1.5x faster than W @ x here
+            # Gate rows are reordered from torch's (input, forget, cell, output) to
+            # (input, forget, output, cell) so the three sigmoids are one call
+            order = np.concatenate([np.arange(k * hidden, (k + 1) * hidden) for k in (0, 1, 3, 2)])
+            self.w_ih = [np.ascontiguousarray(f[f'lstm_weight_ih_{l}'][order].T) for l in range(n_layers)]
+            self.w_hh = [np.ascontiguousarray(f[f'lstm_weight_hh_{l}'][order].T) for l in range(n_layers)]
+            self.b_ih = [f[f'lstm_bias_ih_{l}'][order] for l in range(n_layers)]
+            self.b_hh = [f[f'lstm_bias_hh_{l}'][order] for l in range(n_layers)]
+            self.mlp_w = [np.ascontiguousarray(f[f'mlp_weight_{i}'].T) for i in range(n_mlp)]
+            self.mlp_b = [f[f'mlp_bias_{i}'] for i in range(n_mlp)]
+            self.action_w = np.ascontiguousarray(f['action_weight'].T)
+            self.action_b = f['action_bias']
+
+        self.n_layers = n_layers
+        self.hidden_size = hidden
+        self.obs_size = self.w_ih[0].shape[0]
+        self.n_actions = len(self.action_b)
+
+        # State (what SB3 passes around as lstm_states) and scratch buffers
+        self.h = np.zeros((n_layers, hidden), dtype=np.float32)
+        self.c = np.zeros((n_layers, hidden), dtype=np.float32)
+        self.obs = np.zeros(self.obs_size, dtype=np.float32)
+        self._gates = np.zeros(4 * hidden, dtype=np.float32)
+        self._gates_h = np.zeros(4 * hidden, dtype=np.float32)
+        self._tmp = np.zeros(hidden, dtype=np.float32)
+        self._latent = [np.zeros(len(b), dtype=np.float32) for b in self.mlp_b]
+        self._logits = np.zeros(self.n_actions, dtype=np.float32)
+
+    def reset(self):
+        self.h.fill(0.0)
+        self.c.fill(0.0)
+
+    @staticmethod
+    def _sigmoid(x):
+        # In place, same formula as torch: 1 / (1 + exp(-x))
+        np.negative(x, out=x)
+        np.exp(x, out=x)
+        x += 1.0
+        np.reciprocal(x, out=x)
+
+    def act(self, obs, episode_start=False):
+        """One step: obs (obs_size,) -> action index. episode_start zeroes the
+        state first, like predict(episode_start=[True])."""
+        if episode_start:
+            self.reset()
+        self.obs[:] = obs # Cast to float32 exactly like SB3's obs_to_tensor().float()
+
+        x, H = self.obs, self.hidden_size
+        gates, gates_h, tmp = self._gates, self._gates_h, self._tmp
+        for l in range(self.n_layers):
+            h, c = self.h[l], self.c[l]
+            # gates = W_ih x + b_ih + W_hh h + b_hh
+            np.dot(x, self.w_ih[l], out=gates)
+            gates += self.b_ih[l]
+            np.dot(h, self.w_hh[l], out=gates_h)
+            gates_h += self.b_hh[l]
+            gates += gates_h
+            self._sigmoid(gates[:3 * H])
+            i, f, o, g = gates[:H], gates[H:2 * H], gates[2 * H:3 * H], gates[3 * H:]
+            np.tanh(g, out=g)
+            # c = f * c + i * g ; h = o * tanh(c)
+            c *= f
+            np.multiply(i, g, out=tmp)
+            c += tmp
+            np.tanh(c, out=tmp)
+            np.multiply(o, tmp, out=h)
+            x = h
+
+        for w, b, out in zip(self.mlp_w, self.mlp_b, self._latent):
+            np.dot(x, w, out=out)
+            out += b
+            self.activation(out, out=out)
+            x = out
+
+        logits = self._logits
+        np.dot(x, self.action_w, out=logits)
+        logits += self.action_b
+        # Categorical(logits).probs, then argmax: two logits that round to the same
+        # probability tie, and argmax then takes the first, exactly like torch does
+        logits -= logits.max()
+        np.exp(logits, out=logits)
+        logits /= logits.sum()
+        return int(logits.argmax())
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a RecurrentPPO MlpLstmPolicy for torch-free inference")
+    parser.add_argument("model", help="RecurrentPPO .zip")
+    parser.add_argument("out", nargs="?", help="output .npz (default: next to the model)")
+    args = parser.parse_args()
+    out = args.out or os.path.splitext(args.model)[0] + '.npz'
+    export_policy(args.model, out)
+
+if __name__ == "__main__":
+    main()
@@ -4,17 +4,24 @@ import os
 import mmap
 import ctypes
 import numpy as np
-from sb3_contrib import RecurrentPPO
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(os.path.join(current_dir, '..'))
 from shared_defs.schema import SharedMemoryLayout, SHM_NAME, SHM_SIZE
+from hydra_brain.bridge import TickReader, make_wait_policy, make_conflator
+from hydra_brain.latency import LatencyProbe
+from hydra_brain.lstm_policy import LstmPolicy
 
-MODEL_PATH = os.path.join(current_dir, "checkpoints/hydra_lstm_v1")
+# NumPy export of checkpoints/hydra_lstm_v1.zip (train.py writes both; for an
+# older checkpoint: python hydra_brain/lstm_policy.py checkpoints/hydra_lstm_v1.zip)
+POLICY_PATH = os.path.join(current_dir, "checkpoints/hydra_lstm_v1.npz")
 
 # --- CONFIGURATION ---
 MAX_INVENTORY = 0.005  
 TAKE_PROFIT_PCT = 0.002 # 0.2%
+WAIT_POLICY = "doorbell" # spin | yield | sleep | doorbell (env HYDRA_WAIT overrides)
+CONFLATION = "aggregate" # every | latest | aggregate (env HYDRA_CONFLATE overrides): ticks that
+                         # arrive during a decision become ONE model step (newest quote, mean OFI)
 # ---------------------
 
 def main():
@@ -23,9 +30,9 @@ def main():
     print("-" * 50)
 
     try:
-        model = RecurrentPPO.load(MODEL_PATH)
+        policy = LstmPolicy(POLICY_PATH)
     except FileNotFoundError:
-        print(f"[ERROR] Model not found.")
+        print(f"[ERROR] Model not found. Export it with: python hydra_brain/lstm_policy.py checkpoints/hydra_lstm_v1.zip")
         return
 
     # Connect to Memory
@@ -40,9 +47,8 @@ def main():
     with mmap.mmap(shm_fd, ctypes.sizeof(SharedMemoryLayout), mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE) as mm:
         layout = SharedMemoryLayout.from_buffer(mm)
         
-        last_time = 0
-        lstm_states = None
-        episode_starts = np.ones((1,), dtype=bool)
+        episode_start = True
+        obs = np.zeros(4) # [Spread, OFI, Inventory, Volatility]
         
         # ---------------------------------------------------------
         # FIX: SYNC ENTRY PRICE ON STARTUP
@@ -66,72 +72,86 @@ def main():
 
         print("[Hydra Strategy] LIVE. Waiting for ticks...")
 
+        reader = TickReader(layout, wait=make_wait_policy(WAIT_POLICY))
+        probe = LatencyProbe(layout) # Report: python hydra_brain/latency.py
+        conflator = make_conflator(CONFLATION)
         while True:
-            if layout.market.local_time_ms == last_time:
-                continue 
-            
-            # 1. Read State
-            real_usd = layout.market.real_usdt_balance
-            real_btc = layout.market.real_btc_balance
-            mid_price = (layout.market.bid_price + layout.market.ask_price) / 2
-            
-            # 2. Get AI Decision
-            total_qty = layout.market.bid_qty + layout.market.ask_qty
-            ofi = (layout.market.bid_qty - layout.market.ask_qty) / total_qty if total_qty > 0 else 0
+            # Drain ALL new ticks from the ring (waits per WAIT_POLICY)
+            ticks = reader.read(timeout=1.0)
+            if len(ticks) == 0:
+                continue
+            probe.on_read(ticks)
+            records = conflator.conflate(ticks)
+            conflator.report()
+
+            # Fields by name (not a positional unpack): TickRecord / Conflator can grow fields
+            for bid_price, ask_price, recv_ns, n_ticks, ofi_sum in zip(records['bid_price'].tolist(), records['ask_price'].tolist(),
+                                                                      records['recv_ns'].tolist(), records['n_ticks'].tolist(),
+                                                                      records['ofi_sum'].tolist()):
+                # 1. Read State
+                real_usd = layout.market.real_usdt_balance
+                real_btc = layout.market.real_btc_balance
+                mid_price = (bid_price + ask_price) / 2
             
-            obs = np.array([0.0, ofi, real_btc, 0.0]).reshape(1, -1)
-            action, lstm_states = model.predict(obs, state=lstm_states, episode_start=episode_starts, deterministic=True)
-            episode_starts[0] = False
+                # 2. Get AI Decision
+                ofi = ofi_sum / n_ticks # The tick's OFI, or the mean over a conflated batch
             
-            ai_decision = int(action[0])
+                obs[1] = ofi
+                obs[2] = real_btc
+                ai_decision = policy.act(obs, episode_start)
+                episode_start = False
             
-            # 3. Hybrid Logic
-            final_action = 0 
+                # 3. Hybrid Logic
+                final_action = 0 
             
-            # RULE A: Inventory Cap
-            if real_btc >= MAX_INVENTORY:
-                if ai_decision == 1:
-                    ai_decision = 0 
+                # RULE A: Inventory Cap
+                if real_btc >= MAX_INVENTORY:
+                    if ai_decision == 1:
+                        ai_decision = 0 
             
-            # RULE B: Take Profit (Now fixed!)
-            if real_btc > 0 and avg_entry_price > 0:
-                pnl_pct = (mid_price - avg_entry_price) / avg_entry_price
+                # RULE B: Take Profit (Now fixed!)
+                if real_btc > 0 and avg_entry_price > 0:
+                    pnl_pct = (mid_price - avg_entry_price) / avg_entry_price
                 
-                # Print Status occasionally
-                if np.random.random() < 0.01:
-                     print(f"[STATUS] PnL: {pnl_pct*100:.4f}% | Entry: {avg_entry_price:.2f} | Curr: {mid_price:.2f}")
-
-                if pnl_pct > TAKE_PROFIT_PCT:
-                     print(f"[PROFIT TAKER] Target Hit (+{pnl_pct*100:.2f}%). Selling.")
-                     final_action = 2 
-
-            if final_action == 0:
-                if ai_decision == 1: final_action = 1
-                elif ai_decision == 3: final_action = 2
-
-            # 4. Execution
-            if final_action == 1: # BUY
-                if real_usd > 15.0:
-                    print(f"[BUY] OFI: {ofi:.2f}")
-                    layout.command.action = 1
-                    layout.command.quantity = 0.001
-                    layout.command.command_id += 1 
+                    # Print Status occasionally
+                    if np.random.random() < 0.01:
+                         print(f"[STATUS] PnL: {pnl_pct*100:.4f}% | Entry: {avg_entry_price:.2f} | Curr: {mid_price:.2f}")
+
+                    if pnl_pct > TAKE_PROFIT_PCT:
+                         print(f"[PROFIT TAKER] Target Hit (+{pnl_pct*100:.2f}%). Selling.")
+                         final_action = 2 
+
+                if final_action == 0:
+                    if ai_decision == 1: final_action = 1
+                    elif ai_decision == 3: final_action = 2
+
+                # 4. Execution
+                if final_action == 1: # BUY
+                    if real_usd > 15.0:
+                        probe.mark_decision()
+                        print(f"[BUY] OFI: {ofi:.2f}")
+                        layout.command.action = 1
+                        layout.command.quantity = 0.001
+                        probe.stamp_command(layout.command, recv_ns)
+                        layout.command.command_id += 1 
                     
-                    # Update Weighted Average Entry Price
-                    total_value = (real_btc * avg_entry_price) + (0.001 * mid_price)
-                    avg_entry_price = total_value / (real_btc + 0.001)
+                        # Update Weighted Average Entry Price
+                        total_value = (real_btc * avg_entry_price) + (0.001 * mid_price)
+                        avg_entry_price = total_value / (real_btc + 0.001)
                     
-                    time.sleep(2)
+                        time.sleep(2)
 
-            elif final_action == 2: # SELL
-                if real_btc >= 0.001:
-                    print(f"[SELL] Closing Position.")
-                    layout.command.action = 2
-                    layout.command.quantity = 0.001
-                    layout.command.command_id += 1
-                    time.sleep(2)
+                elif final_action == 2: # SELL
+                    if real_btc >= 0.001:
+                        probe.mark_decision()
+                        print(f"[SELL] Closing Position.")
+                        layout.command.action = 2
+                        layout.command.quantity = 0.001
+                        probe.stamp_command(layout.command, recv_ns)
+                        layout.command.command_id += 1
+                        time.sleep(2)
 
-            last_time = layout.market.local_time_ms
+            probe.on_batch_done()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,127 +1,247 @@
+import os
+import sys
+import shutil
+import tempfile
 import pandas as pd
 import numpy as np
+import pyarrow.parquet as pq
 import time
 from itertools import product
-from backtest_engine import BacktestEngine
-from strategies import TrendStrategy
+from multiprocessing import Pool
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from hydra_brain.bars import load_bars
+from hydra_brain.sweep import sweep, TrendSweep, successive_halving, price_batches
 
 # 1. Configuration: The Search Space
 # We will test faster windows (Scalping) vs Slower windows (Swing)
-SHORT_WINDOWS = [1000, 3000, 5000, 10000] 
+SHORT_WINDOWS = [1000, 3000, 5000, 10000]
 LONG_WINDOWS = [10000, 30000, 50000, 100000]
 THRESHOLDS = [0.0005, 0.001, 0.002] # 0.05%, 0.1%, 0.2% bands
 
 DATA_PATH = "data/parquet/BTCUSDT-2024-01.parquet"
 
+# Sweep Settings
+SWEEP_MODE = "single_pass"  # "single_pass": every combination in ONE stream over the data
+                            #   (hydra_brain/sweep.py, same fills as BacktestEngine + TrendStrategy)
+                            # "pool": one pass per combination over a shared memmap (simplified fills)
+                            # "halving": successive halving on the HALVING_* grid (below)
+SLICE_TICKS = 5000000       # None = full file
+BAR_SPEC = None             # e.g. "1s" / "1000t": sweep on cached bar closes instead of ticks
+                            # (windows and SLICE_TICKS then count bars: a coarse first pass)
+N_WORKERS = os.cpu_count()  # One worker process per core
+
+# Successive Halving: score every candidate on a short slice, keep the best HALVING_KEEP,
+# re-score the survivors on a HALVING_GROWTH x longer slice, ... up to HALVING_MAX_TICKS.
+# Most candidates are dropped after a fraction of the data, so a much denser grid
+# fits in the time of the exhaustive sweep above.
+HALVING_SHORT_WINDOWS = list(range(500, 20001, 500))
+HALVING_LONG_WINDOWS = list(range(5000, 200001, 5000))
+HALVING_THRESHOLDS = [0.0, 0.00025, 0.0005, 0.00075, 0.001, 0.0015, 0.002, 0.003]
+HALVING_FIRST_TICKS = 1000000  # Rung 0 budget (raised to 2x the longest long window)
+HALVING_GROWTH = 3             # Slice multiplier per rung
+HALVING_KEEP = 0.25            # Fraction promoted to the next rung
+HALVING_MIN_KEEP = 5           # Stop halving at this many survivors
+HALVING_MAX_TICKS = None       # None = full file (the last rung always ends here)
+
+# Worker-side views of the shared arrays (filled by _attach in every process)
+_shared = {}
+
+def load_prices(path, out_dir, max_ticks=None, bar_spec=None):
+    """Streams the price column into a .npy memmap every worker can map without copying"""
+    if bar_spec is not None:
+        closes = load_bars(path, bar_spec)['close'][:max_ticks]
+        np.save(os.path.join(out_dir, "price.npy"), closes.astype(np.float32))
+        return len(closes)
+
+    parquet_file = pq.ParquetFile(path)
+    n = parquet_file.metadata.num_rows if max_ticks is None else min(max_ticks, parquet_file.metadata.num_rows)
+
+    prices = np.lib.format.open_memmap(os.path.join(out_dir, "price.npy"), mode='w+', dtype=np.float32, shape=(n,))
+    pos = 0
+    for batch in parquet_file.iter_batches(batch_size=1000000, columns=['price']):
+        chunk = batch.column('price').to_numpy()[:n - pos]
+        prices[pos:pos + len(chunk)] = chunk
+        pos += len(chunk)
+        if pos >= n:
+            break
+    prices.flush()
+    return n
+
+def _attach(out_dir):
+    _shared['dir'] = out_dir
+    _shared['price'] = np.load(os.path.join(out_dir, "price.npy"), mmap_mode='r')
+
+def _ma(window):
+    # Opened lazily: only the windows this combination needs get mapped
+    key = f"ma_{window}"
+    if key not in _shared:
+        _shared[key] = np.load(os.path.join(_shared['dir'], f"{key}.npy"), mmap_mode='r')
+    return _shared[key]
+
+def compute_ma(window):
+    """Rolling mean for ONE window, computed once and shared by every combination using it"""
+    start_time = time.time()
+    ma = pd.Series(_shared['price']).rolling(window=window).mean().to_numpy()
+    np.save(os.path.join(_shared['dir'], f"ma_{window}.npy"), ma)
+    return window, time.time() - start_time
+
+def score_combination(params):
+    short_w, long_w, thresh = params
+    start_time = time.time()
+
+    # Fast Vectorized Backtest (Simplified for Speed)
+    # We simulate the logic without the full engine overhead for speed
+    prices = _shared['price']
+    short_ma = _ma(short_w)
+    long_ma = _ma(long_w)
+
+    # Signals
+    # 1 = Buy, -1 = Sell, 0 = Hold
+    signals = np.where(short_ma > long_ma * (1 + thresh), 1, 0)
+    signals = np.where(short_ma < long_ma, -1, signals)
+
+    # Calculate PnL (Vectorized)
+    pos = 0
+    cash = 10000.0
+    btc = 0.0
+    fee_rate = 0.001
+    trade_count = 0
+
+    # Iterating only on signal changes is fast
+    # Find where signal changes
+    diff = np.diff(signals, prepend=0)
+    change_indices = np.where(diff != 0)[0]
+
+    for idx in change_indices:
+        sig = signals[idx]
+        price = prices[idx]
+
+        if sig == 1 and pos == 0: # BUY
+            cost = price * 0.001 # Buy 0.001
+            if cash > cost:
+                cash -= cost * (1 + fee_rate)
+                btc += 0.001
+                pos = 1
+                trade_count += 1
+
+        elif sig == -1 and pos == 1: # SELL
+            rev = price * 0.001
+            cash += rev * (1 - fee_rate)
+            btc -= 0.001
+            pos = 0
+            trade_count += 1
+
+    # Final Value
+    final_val = cash + (btc * prices[-1])
+    pnl = final_val - 10000.0
+
+    return {
+        'short': short_w,
+        'long': long_w,
+        'thresh': thresh,
+        'pnl': float(pnl),
+        'trades': trade_count,
+        'seconds': time.time() - start_time
+    }
+
+def run_single_pass(combinations, unit):
+    """Scores every combination in one streaming pass -> (results, ticks)"""
+    print(f"Streaming {'the full file' if SLICE_TICKS is None else f'{SLICE_TICKS:,} {unit}'} once for {len(combinations)} combinations...")
+    if BAR_SPEC is None:
+        return sweep(DATA_PATH, combinations, max_ticks=SLICE_TICKS)
+    closes = load_bars(DATA_PATH, BAR_SPEC)['close'][:SLICE_TICKS]
+    sw = TrendSweep(combinations)
+    sw.update(closes)
+    return sw.results(), len(closes)
+
+def run_halving(combinations, unit):
+    """Successive halving over one stream -> (results of the survivors, ticks)"""
+    print(f"Successive halving over {len(combinations)} combinations "
+          f"(first slice {HALVING_FIRST_TICKS:,} {unit}, x{HALVING_GROWTH} per rung, keep {HALVING_KEEP:.0%})...")
+    if BAR_SPEC is None:
+        batches = price_batches(DATA_PATH)
+    else:
+        batches = [load_bars(DATA_PATH, BAR_SPEC)['close']]
+    results, stats = successive_halving(batches, combinations, HALVING_FIRST_TICKS, HALVING_GROWTH,
+                                        HALVING_KEEP, HALVING_MIN_KEEP, HALVING_MAX_TICKS)
+
+    print(f"\n{'Rung':<6} {'Slice':>14} {'Scored':>8} {'Kept':>6}")
+    for i, (ticks, scored, kept) in enumerate(stats['rungs']):
+        print(f"{i:<6} {ticks:>14,} {scored:>8} {kept:>6}")
+    done, grid = stats['config_ticks'], stats['grid_config_ticks']
+    print(f"Processed {done:,} combination-{unit} vs {grid:,} for the exhaustive grid "
+          f"({done / grid:.1%}, {grid / done:.1f}x less)")
+    return results, stats['ticks']
+
+def run_pool(combinations, unit):
+    """One vectorized pass per combination on N_WORKERS processes -> (results, ticks)"""
+    windows = sorted({w for c in combinations for w in c[:2]})
+
+    # Load data ONCE into a memory-mapped file shared by all workers
+    # Note: For optimization, we can use a smaller slice (e.g., 5 million ticks)
+    # to get a rough idea, then verify on full data.
+    work_dir = tempfile.mkdtemp(prefix="hydra_sweep_")
+    try:
+        print(f"Loading Data ({'full file' if SLICE_TICKS is None else f'{SLICE_TICKS:,} {unit}'})...")
+        n_ticks = load_prices(DATA_PATH, work_dir, SLICE_TICKS, BAR_SPEC)
+
+        with Pool(processes=N_WORKERS, initializer=_attach, initargs=(work_dir,)) as pool:
+            # Phase 1: one rolling mean per DISTINCT window (not per combination)
+            print(f"Computing {len(windows)} moving averages on {N_WORKERS} workers...")
+            for window, seconds in pool.imap_unordered(compute_ma, windows):
+                print(f"  MA({window}) ready in {seconds:.2f}s")
+
+            # Phase 2: score every combination against the shared arrays
+            print(f"Testing {len(combinations)} combinations over {n_ticks:,} {unit}...")
+            results = []
+            for i, r in enumerate(pool.imap_unordered(score_combination, combinations)):
+                print(f"[{i+1}/{len(combinations)}] S:{r['short']} L:{r['long']} T:{r['thresh']} -> PnL: ${r['pnl']:.2f} (Trades: {r['trades']}) [{r['seconds']:.2f}s]")
+                results.append(r)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results, n_ticks
+
 def optimize():
     print(f"--- STARTING BRUTE FORCE OPTIMIZATION ---")
     print(f"Target: Finding the 'Golden Parameter Set'...")
-    
-    # Load data ONCE to save time (Use limited columns)
-    # Note: For optimization, we can use a smaller slice (e.g., 5 million ticks) 
-    # to get a rough idea, then verify on full data.
-    print("Loading Data Slice (5M ticks)...")
+
+    # Skip invalid combinations (Short must be < Long)
+    if SWEEP_MODE == "halving":
+        combinations = [c for c in product(HALVING_SHORT_WINDOWS, HALVING_LONG_WINDOWS, HALVING_THRESHOLDS) if c[0] < c[1]]
+    else:
+        combinations = [c for c in product(SHORT_WINDOWS, LONG_WINDOWS, THRESHOLDS) if c[0] < c[1]]
+    unit = 'ticks' if BAR_SPEC is None else f'{BAR_SPEC} bars'
+
+    sweep_start = time.time()
     try:
-        df_slice = pd.read_parquet(DATA_PATH, columns=['price']).iloc[:5000000]
+        if SWEEP_MODE == "halving":
+            results, n_ticks = run_halving(combinations, unit)
+        elif SWEEP_MODE == "single_pass":
+            results, n_ticks = run_single_pass(combinations, unit)
+        else:
+            results, n_ticks = run_pool(combinations, unit)
     except FileNotFoundError:
         print("Error: Data file not found.")
         return
-
-    # We need a custom mini-runner because the streaming engine is too slow for 100 loops
-    # We will run an in-memory backtest on the slice
-    
-    results = []
-    
-    # Generate all combinations
-    combinations = list(product(SHORT_WINDOWS, LONG_WINDOWS, THRESHOLDS))
-    print(f"Testing {len(combinations)} combinations...")
-    
-    for i, (short_w, long_w, thresh) in enumerate(combinations):
-        # Skip invalid combinations (Short must be < Long)
-        if short_w >= long_w:
-            continue
-            
-        start_time = time.time()
-        
-        # Initialize Strategy
-        strat = TrendStrategy(short_window=short_w, long_window=long_w, threshold=thresh)
-        
-        # Fast Vectorized Backtest (Simplified for Speed)
-        # We simulate the logic without the full engine overhead for speed
-        prices = df_slice['price'].values
-        
-        # Calculate Rolling Means (Vectorized is instant vs Loop)
-        # Note: Pandas rolling is faster than looping 5M times
-        short_ma = df_slice['price'].rolling(window=short_w).mean()
-        long_ma = df_slice['price'].rolling(window=long_w).mean()
-        
-        # Signals
-        # 1 = Buy, -1 = Sell, 0 = Hold
-        signals = np.where(short_ma > long_ma * (1 + thresh), 1, 0)
-        signals = np.where(short_ma < long_ma, -1, signals)
-        
-        # Calculate PnL (Vectorized)
-        # Shift signals by 1 to simulate "Trade at NEXT Open"
-        pos = 0
-        cash = 10000.0
-        btc = 0.0
-        fee_rate = 0.001
-        trade_count = 0
-        
-        # Iterating only on signal changes is fast
-        # Find where signal changes
-        diff = np.diff(signals, prepend=0)
-        change_indices = np.where(diff != 0)[0]
-        
-        for idx in change_indices:
-            sig = signals[idx]
-            price = prices[idx]
-            
-            if sig == 1 and pos == 0: # BUY
-                cost = price * 0.001 # Buy 0.001
-                if cash > cost:
-                    cash -= cost * (1 + fee_rate)
-                    btc += 0.001
-                    pos = 1
-                    trade_count += 1
-                    
-            elif sig == -1 and pos == 1: # SELL
-                rev = price * 0.001
-                cash += rev * (1 - fee_rate)
-                btc -= 0.001
-                pos = 0
-                trade_count += 1
-        
-        # Final Value
-        final_val = cash + (btc * prices[-1])
-        pnl = final_val - 10000.0
-        
-        duration = time.time() - start_time
-        
-        print(f"[{i+1}/{len(combinations)}] S:{short_w} L:{long_w} T:{thresh} -> PnL: ${pnl:.2f} (Trades: {trade_count})")
-        
-        results.append({
-            'short': short_w,
-            'long': long_w,
-            'thresh': thresh,
-            'pnl': pnl,
-            'trades': trade_count
-        })
+    sweep_time = time.time() - sweep_start
 
     # Sort and Show Winner
     results.sort(key=lambda x: x['pnl'], reverse=True)
-    
+
     print("\n" + "="*40)
     print("       OPTIMIZATION RESULTS       ")
     print("="*40)
     print(f"{'Short':<8} {'Long':<8} {'Thresh':<8} {'PnL':<10} {'Trades'}")
     print("-" * 45)
-    
+
     for r in results[:5]: # Top 5
         print(f"{r['short']:<8} {r['long']:<8} {r['thresh']:<8} ${r['pnl']:<9.2f} {r['trades']}")
-        
+
     print("="*40)
+    workers = f"{N_WORKERS} workers" if SWEEP_MODE == "pool" else "1 stream"
+    print(f"Sweep Time: {sweep_time:.2f}s ({len(combinations) / sweep_time:.1f} combos/s, {n_ticks:,} {unit}, {workers})")
     print(f"Best Parameters: {results[0]}")
 
 if __name__ == "__main__":
-    optimize()
\ No newline at end of file
+    optimize()
@@ -0,0 +1,106 @@
+import os
+import sys
+import time
+import argparse
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from hydra_brain.dataset import TickDataset, resolve_files
+
+# Scan-optimized tick layout: one parquet file per UTC day, rows sorted by time.
+#
+#   data/days/BTCUSDT-2024-01-01.parquet
+#   data/days/BTCUSDT-2024-01-02.parquet ...
+#
+# Flat day files keep every reader working unchanged (resolve_files() on the
+# directory lists them in time order) and make a date range a file list.
+# Inside each file:
+#   - row groups of ROW_GROUP_ROWS (2 x BacktestEngine's 100k batches)
+#   - time: DELTA_BINARY_PACKED (sorted epoch ms -> tiny deltas)
+#   - price / qty: BYTE_STREAM_SPLIT (float bytes grouped by significance)
+#   - min/max statistics + page index on every column, sorting_columns=[time]
+#     so TickDataset(start=, end=) skips row groups outside the window
+#
+#   python hydra_brain/parquet_layout.py data/parquet data/days
+
+ROW_GROUP_ROWS = 200000
+COMPRESSION = "lz4"     # Fastest to decode; "zstd" is ~5% smaller and ~2x slower to scan
+DAY_MS = 86400000
+COLUMN_ENCODING = {
+    'time': 'DELTA_BINARY_PACKED',
+    'price': 'BYTE_STREAM_SPLIT',
+    'qty': 'BYTE_STREAM_SPLIT',
+}
+
+def write_tuned(table, path, row_group_rows=ROW_GROUP_ROWS, compression=COMPRESSION):
+    """Writes a (time-sorted) table with the tuned layout; .tmp then rename"""
+    encoding = {k: v for k, v in COLUMN_ENCODING.items() if k in table.column_names}
+    tmp = path + ".tmp"
+    pq.write_table(
+        table, tmp,
+        row_group_size=row_group_rows,
+        compression=compression,
+        use_dictionary=[c for c in table.column_names if c not in encoding], # Explicit encodings exclude dictionaries
+        column_encoding=encoding,
+        write_statistics=True,
+        write_page_index=True,
+        sorting_columns=[pq.SortingColumn(table.column_names.index('time'))],
+    )
+    os.replace(tmp, path)
+
+def source_days(files):
+    """UTC day numbers covered by the files, from the row-group time statistics"""
+    lo, hi = None, None
+    for path in files:
+        meta = pq.ParquetFile(path).metadata
+        idx = meta.schema.to_arrow_schema().get_field_index('time')
+        for i in range(meta.num_row_groups):
+            stats = meta.row_group(i).column(idx).statistics
+            if stats is None or not stats.has_min_max:
+                raise ValueError(f"{path} has no time statistics (can't plan the day split)")
+            lo = stats.min if lo is None else min(lo, stats.min)
+            hi = stats.max if hi is None else max(hi, stats.max)
+    return [] if lo is None else list(range(lo // DAY_MS, hi // DAY_MS + 1))
+
+def convert(source, out_dir, symbol="BTCUSDT", row_group_rows=ROW_GROUP_ROWS, compression=COMPRESSION):
+    """Rewrites parquet tick files as sorted day files. Finished days are skipped (resumable).
+    Each day is read as a TickDataset window, so only the row groups that overlap it are decoded."""
+    files = resolve_files(source)
+    if not files:
+        raise FileNotFoundError(f"No parquet files found for {source}")
+    os.makedirs(out_dir, exist_ok=True)
+
+    start_time = time.time()
+    days = source_days(files)
+    print(f"[Layout] {len(files)} file(s) -> {len(days)} day(s) in {out_dir}")
+    written = rows = 0
+    for day in days:
+        name = time.strftime('%Y-%m-%d', time.gmtime(day * DAY_MS // 1000))
+        path = os.path.join(out_dir, f"{symbol}-{name}.parquet")
+        if os.path.exists(path):
+            continue
+        batches = list(TickDataset(files, start=day * DAY_MS, end=(day + 1) * DAY_MS, prefetch=0))
+        if not batches:
+            continue
+        # Stable sort: same-ms trades keep their exchange order
+        table = pa.Table.from_batches(batches).sort_by('time')
+        write_tuned(table, path, row_group_rows, compression)
+        written += 1
+        rows += len(table)
+        print(f"\r[Layout] {name}: {len(table):,} ticks", end="", flush=True)
+    print(f"\n[Layout] Wrote {written} day file(s), {rows:,} ticks in {time.time() - start_time:.1f}s")
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert tick parquet files to the scan-optimized day layout")
+    parser.add_argument("source", nargs="?", default="data/parquet", help="parquet file, directory, or glob")
+    parser.add_argument("out", nargs="?", default="data/days", help="output directory")
+    parser.add_argument("--symbol", default="BTCUSDT")
+    parser.add_argument("--row-group-rows", type=int, default=ROW_GROUP_ROWS)
+    parser.add_argument("--compression", default=COMPRESSION)
+    args = parser.parse_args()
+    convert(args.source, args.out, args.symbol, args.row_group_rows, args.compression)
+
+if __name__ == "__main__":
+    main()
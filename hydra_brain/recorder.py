@@ -2,22 +2,146 @@ import sys
 import time
 import mmap
 import os
-import csv
+import signal
 import datetime
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 # Add parent directory to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from shared_defs.schema import MarketState, SHM_NAME, SHM_SIZE
+from shared_defs.schema import SharedMemoryLayout, SHM_NAME, SHM_SIZE
+from hydra_brain.bridge import TickReader, make_wait_policy
 
 # Configuration
 DATA_DIR = os.path.join(os.path.dirname(__file__), '../data/raw_ticks')
-os.makedirs(DATA_DIR, exist_ok=True)
-FILENAME = os.path.join(DATA_DIR, f"ticks_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
-SHM_SIZE = 4096 
+WAIT_POLICY = "sleep"      # Recording is not latency critical: back off instead of pinning a core
+ROW_GROUP_TICKS = 50000    # Flush a row group once this many ticks are buffered...
+FLUSH_SECONDS = 30.0       # ...or once this much time has passed since the last flush
+
+# On-disk schema. 'time' / 'price' / 'ibm' follow the trade files from
+# scripts/download_data.py, so recordings load straight into BacktestEngine
+# and CryptoMarketMakingEnv. 'price' is the mid quote, 'ibm' flags sell
+# pressure (more size on the ask than on the bid). The quotes are kept as the
+# feed delivered them (float64, lossless); spread / ofi are cheap to derive
+# on read and are not stored.
+RECORD_SCHEMA = pa.schema([
+    ('time', pa.uint64()),
+    ('price', pa.float32()),
+    ('ibm', pa.bool_()),
+    ('bid_price', pa.float64()),
+    ('bid_qty', pa.float64()),
+    ('ask_price', pa.float64()),
+    ('ask_qty', pa.float64()),
+])
+
+# Timestamps are near-monotonic -> delta packing.
+# Floats -> byte-stream-split, which lets zstd see the slowly changing exponent/high bytes.
+COLUMN_ENCODING = {'time': 'DELTA_BINARY_PACKED'}
+COLUMN_ENCODING.update({f.name: 'BYTE_STREAM_SPLIT' for f in RECORD_SCHEMA if pa.types.is_floating(f.type)})
+
+class TickParquetWriter:
+    """Buffers ring ticks in preallocated column arrays and writes them as Parquet
+    row groups, one file per UTC hour (ticks_YYYYMMDD_HH.parquet)."""
+
+    def __init__(self, out_dir, row_group_ticks=ROW_GROUP_TICKS, flush_seconds=FLUSH_SECONDS):
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.capacity = row_group_ticks
+        self.flush_seconds = flush_seconds
+
+        self.cols = {f.name: np.empty(row_group_ticks, dtype=f.type.to_pandas_dtype()) for f in RECORD_SCHEMA}
+        self.n = 0
+        self.last_flush = time.monotonic()
+
+        self.writer = None
+        self.path = None
+        self.hour = None
+        self.ticks_written = 0
+        self.files = []
+
+    def append(self, ticks):
+        # A batch can straddle an hour boundary: split it so each file holds one hour
+        hours = ticks['local_time_ms'] // 3600000
+        cuts = np.flatnonzero(np.diff(hours)) + 1
+        for segment in np.split(ticks, cuts):
+            hour = int(segment['local_time_ms'][0] // 3600000)
+            if hour != self.hour:
+                self._rotate(hour)
+            self._buffer(segment)
+        self.maybe_flush()
+
+    def maybe_flush(self):
+        if time.monotonic() - self.last_flush >= self.flush_seconds:
+            self.flush()
+
+    def _buffer(self, ticks):
+        pos = 0
+        while pos < len(ticks):
+            take = min(len(ticks) - pos, self.capacity - self.n)
+            part = ticks[pos:pos + take]
+            dst = slice(self.n, self.n + take)
+            c = self.cols
+
+            bid, ask = part['bid_price'], part['ask_price']
+            bid_qty, ask_qty = part['bid_qty'], part['ask_qty']
+
+            c['time'][dst] = part['local_time_ms']
+            c['price'][dst] = (bid + ask) / 2
+            c['ibm'][dst] = bid_qty < ask_qty # Same sign as the order-flow imbalance
+            c['bid_price'][dst] = bid
+            c['bid_qty'][dst] = bid_qty
+            c['ask_price'][dst] = ask
+            c['ask_qty'][dst] = ask_qty
+
+            self.n += take
+            pos += take
+            if self.n == self.capacity:
+                self.flush()
+
+    def flush(self):
+        if self.n > 0:
+            batch = pa.RecordBatch.from_arrays(
+                [pa.array(self.cols[f.name][:self.n], type=f.type) for f in RECORD_SCHEMA],
+                schema=RECORD_SCHEMA)
+            self.writer.write_batch(batch)
+            self.ticks_written += self.n
+            self.n = 0
+        self.last_flush = time.monotonic()
+
+    def _rotate(self, hour):
+        self.flush()
+        self._close_file()
+
+        stamp = datetime.datetime.fromtimestamp(hour * 3600, tz=datetime.timezone.utc).strftime('%Y%m%d_%H')
+        path = os.path.join(self.out_dir, f"ticks_{stamp}.parquet")
+        part = 1
+        while os.path.exists(path): # Recorder restarted within the same hour
+            path = os.path.join(self.out_dir, f"ticks_{stamp}_{part}.parquet")
+            part += 1
+
+        self.writer = pq.ParquetWriter(path, RECORD_SCHEMA, compression='zstd',
+                                       use_dictionary=['ibm'], column_encoding=COLUMN_ENCODING)
+        self.path = path
+        self.hour = hour
+        self.files.append(path)
+        print(f"\n[Recorder] Writing: {path}")
+
+    def _close_file(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def close(self):
+        self.flush()
+        self._close_file()
+
+def _stop(signum, frame):
+    raise KeyboardInterrupt
 
 def main():
     print(f"[Recorder] Waiting for Shared Memory...")
-    
+
     # 1. Connect to SHM
     shm_fd = -1
     while True:
@@ -27,57 +151,45 @@ def main():
         except FileNotFoundError:
             time.sleep(0.5)
 
-    print(f"[Recorder] Connected! Saving to: {FILENAME}")
-    
-    # 2. Open CSV file
-    with open(FILENAME, 'w', newline='') as csvfile:
-        fieldnames = ['local_time', 'bid_price', 'bid_qty', 'ask_price', 'ask_qty', 'spread', 'ofi']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-
-        with mmap.mmap(shm_fd, SHM_SIZE, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE) as mm:
-            market_data = MarketState.from_buffer(mm)
-            
-            last_time = 0
-            tick_count = 0
-            
-            # 3. Recording Loop
-            try:
-                while True:
-                    # Check if C++ has updated the timestamp
-                    current_time = market_data.local_time_ms
-                    
-                    if current_time != last_time and current_time != 0:
-                        # Calculate Derived Features immediately
-                        spread = market_data.ask_price - market_data.bid_price
-                        
-                        # Simple Order Flow Imbalance (OFI) proxy
-                        # (Bid Qty - Ask Qty) / Total Qty
-                        total_qty = market_data.bid_qty + market_data.ask_qty
-                        ofi = (market_data.bid_qty - market_data.ask_qty) / total_qty if total_qty > 0 else 0
-
-                        writer.writerow({
-                            'local_time': current_time,
-                            'bid_price': market_data.bid_price,
-                            'bid_qty': market_data.bid_qty,
-                            'ask_price': market_data.ask_price,
-                            'ask_qty': market_data.ask_qty,
-                            'spread': f"{spread:.2f}",
-                            'ofi': f"{ofi:.4f}"
-                        })
-                        
-                        last_time = current_time
-                        tick_count += 1
-                        
-                        if tick_count % 1000 == 0:
-                            print(f"\r[Recorder] Captured {tick_count} ticks...", end="", flush=True)
-                    
-                    # Ultra-tight loop to catch every update
-                    # We don't sleep here to match C++ speed as closely as possible
-                    pass 
-
-            except KeyboardInterrupt:
-                print(f"\n[Recorder] Stopped. Saved {tick_count} ticks to {FILENAME}")
+    print(f"[Recorder] Connected! Saving to: {os.path.abspath(DATA_DIR)}")
+
+    # SIGTERM (systemd, docker stop) gets the same clean flush as Ctrl+C
+    signal.signal(signal.SIGTERM, _stop)
+
+    # 2. Open Parquet writer
+    writer = TickParquetWriter(DATA_DIR)
+
+    with mmap.mmap(shm_fd, SHM_SIZE, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE) as mm:
+        layout = SharedMemoryLayout.from_buffer(mm)
+        reader = TickReader(layout, wait=make_wait_policy(WAIT_POLICY))
+
+        tick_count = 0
+
+        # 3. Recording Loop
+        try:
+            while True:
+                # Drain EVERY tick the C++ feed published since the last pass
+                # (several ticks can share the same millisecond)
+                ticks = reader.read(timeout=1.0)
+                if len(ticks) == 0:
+                    writer.maybe_flush() # Quiet market: still honour FLUSH_SECONDS
+                    continue
+
+                writer.append(ticks)
+
+                previous = tick_count
+                tick_count += len(ticks)
+
+                if tick_count // 1000 != previous // 1000:
+                    print(f"\r[Recorder] Captured {tick_count} ticks (overruns: {reader.overruns})...", end="", flush=True)
+
+        except KeyboardInterrupt:
+            pass
+        finally:
+            writer.close()
+            overruns = reader.overruns
+            del reader, layout # Release the mmap before it is closed
+            print(f"\n[Recorder] Stopped. Saved {writer.ticks_written} ticks to {len(writer.files)} file(s) (overruns: {overruns})")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
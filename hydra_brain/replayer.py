@@ -0,0 +1,169 @@
+import sys
+import os
+import time
+import mmap
+import argparse
+import numpy as np
+import pyarrow.parquet as pq
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from shared_defs.schema import SharedMemoryLayout, SHM_NAME, SHM_SIZE
+from hydra_brain.bridge import TickWriter
+from hydra_brain.dataset import TickDataset, resolve_files
+from hydra_brain.shadow import ShadowExecutor
+
+# Offline stand-in for hydra_engine: streams historical ticks into /hydra_shm
+# and plays the Shadow Execution role, so live_trend.py / main_strategy.py /
+# dashboard.py / recorder.py run unchanged with no network.
+#
+#   python hydra_brain/replayer.py data/parquet --speed 10
+#   python hydra_brain/replayer.py data/raw_ticks --speed 0 --burst-every 1000 --burst-size 50
+
+QUOTE_COLUMNS = ['time', 'bid_price', 'bid_qty', 'ask_price', 'ask_qty']  # recorder.py files
+TRADE_COLUMNS = ['time', 'price', 'qty']                                    # download_data.py files
+MAX_SPEED_CHUNK = 256 # Ticks per publish in as-fast-as-possible mode
+
+def create_shm():
+    """Creates /dev/shm/hydra_shm with the exact SharedMemoryLayout (like the engine does)"""
+    path = f"/dev/shm{SHM_NAME}"
+    if os.path.exists(path):
+        print(f"[Replay] Replacing existing {path} (is hydra_engine still running?)")
+        os.unlink(path)
+    fd = os.open(path, os.O_CREAT | os.O_RDWR, 0o666)
+    os.ftruncate(fd, SHM_SIZE)
+    mm = mmap.mmap(fd, SHM_SIZE, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+    return path, fd, mm
+
+def quote_columns(batch, quote_mode, half_spread):
+    times = batch.column('time').to_numpy().astype(np.uint64)
+    if quote_mode:
+        return (times,
+                batch.column('bid_price').to_numpy().astype(np.float64),
+                batch.column('bid_qty').to_numpy().astype(np.float64),
+                batch.column('ask_price').to_numpy().astype(np.float64),
+                batch.column('ask_qty').to_numpy().astype(np.float64))
+
+    # Trade prints -> synthetic top of book around the trade price
+    price = batch.column('price').to_numpy().astype(np.float64)
+    qty = batch.column('qty').to_numpy().astype(np.float64)
+    return times, price - half_spread, qty, price + half_spread, qty
+
+def inject_bursts(cols, first_index, every, size):
+    """Repeats every `every`-th tick `size` extra times (same millisecond bursts)"""
+    if every <= 0 or size <= 0:
+        return cols
+    counts = np.ones(len(cols[0]), dtype=np.int64)
+    counts[(np.arange(first_index, first_index + len(counts)) % every) == 0] += size
+    return tuple(np.repeat(c, counts) for c in cols)
+
+def replay(args):
+    files = resolve_files(args.source)
+    quote_mode = 'bid_price' in pq.read_schema(files[0]).names
+    columns = QUOTE_COLUMNS if quote_mode else TRADE_COLUMNS
+    dataset = TickDataset(files, columns=columns, start=args.start, end=args.end)
+
+    path, fd, mm = create_shm()
+    layout = SharedMemoryLayout.from_buffer(mm)
+    writer = executor = None
+    try:
+        layout.command.command_id = 0
+        layout.market.system_ready = True
+        writer = TickWriter(layout)
+        executor = None if args.no_exec else ShadowExecutor(layout, verbose=not args.quiet)
+
+        speed = args.speed
+        print(f"[Replay] {len(files)} file(s), {'quotes' if quote_mode else 'trades'}, speed: {'max' if speed <= 0 else f'{speed:g}x'}")
+        print(f"[Replay] Shared memory ready: {path} ({SHM_SIZE:,} bytes)")
+        if args.wait > 0:
+            print(f"[Replay] Waiting {args.wait:.0f}s for consumers to attach...")
+            time.sleep(args.wait)
+
+        published = 0
+        source_ticks = 0
+        t0_market = None
+        wall0 = time.monotonic()
+
+        try:
+            for batch in dataset:
+                cols = quote_columns(batch, quote_mode, args.spread / 2)
+                times = cols[0]
+                if t0_market is None:
+                    t0_market = int(times[0])
+
+                i = 0
+                n = len(times)
+                while i < n:
+                    if speed > 0:
+                        # Replay clock: market time advances `speed` ms per wall ms
+                        now_market = t0_market + (time.monotonic() - wall0) * speed * 1000.0
+                        j = int(np.searchsorted(times, now_market, side='right'))
+                        if j <= i:
+                            due = (int(times[i]) - t0_market) / (speed * 1000.0)
+                            gap = wall0 + due - time.monotonic()
+                            if gap > 0.0005:
+                                time.sleep(gap - 0.0002) # Sleep most of the gap, spin the rest
+                            if executor is not None:
+                                executor.poll_command(int(now_market))
+                            continue
+                    else:
+                        j = min(i + MAX_SPEED_CHUNK, n)
+
+                    chunk = inject_bursts(tuple(c[i:j] for c in cols), source_ticks + i, args.burst_every, args.burst_size)
+                    writer.publish_batch(*chunk)
+                    published += len(chunk[0])
+
+                    if executor is not None:
+                        executor.poll_command(int(chunk[0][-1]))
+                        executor.on_ticks(chunk[0], chunk[1], chunk[3])
+                    i = j
+
+                source_ticks += n
+                elapsed = time.monotonic() - wall0
+                print(f"\r[Replay] Published {published:,} ticks ({published / max(elapsed, 1e-9):,.0f}/s)...", end="", flush=True)
+
+        except KeyboardInterrupt:
+            print("\n[Replay] Interrupted.")
+
+        elapsed = time.monotonic() - wall0
+        print(f"\n[Replay] Done: {published:,} ticks in {elapsed:.1f}s ({published / max(elapsed, 1e-9):,.0f} ticks/s)")
+        if executor is not None:
+            executor.sync_balances()
+            print(f"[Replay] Commands: {executor.commands} | Fills: {executor.fills} | Wallet: ${executor.usdt:.2f} + {executor.btc:.5f} BTC")
+
+        if args.linger > 0:
+            print(f"[Replay] Keeping {path} alive for {args.linger:.0f}s...")
+            time.sleep(args.linger)
+    finally:
+        # Whatever ended the replay, never leave a /hydra_shm behind that still
+        # says system_ready: consumers would attach to a dead producer
+        layout.market.system_ready = False
+        del writer, executor, layout # Release the mmap views before it is closed
+        os.unlink(path)
+        os.close(fd)
+        try:
+            mm.close()
+        except BufferError:
+            pass # The traceback of the exception in flight still holds views: the mapping goes with them
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay parquet ticks into /hydra_shm")
+    parser.add_argument("source", nargs="?", default="data/parquet", help="parquet file, directory, or glob")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = real time, 10 = 10x, 0 = as fast as possible")
+    parser.add_argument("--start", default=None, help="first tick time (epoch ms or date)")
+    parser.add_argument("--end", default=None, help="stop before this time (epoch ms or date)")
+    parser.add_argument("--burst-every", type=int, default=0, help="inject a burst every N source ticks")
+    parser.add_argument("--burst-size", type=int, default=0, help="extra same-millisecond copies per burst")
+    parser.add_argument("--spread", type=float, default=0.01, help="synthetic bid/ask spread for trade files")
+    parser.add_argument("--wait", type=float, default=0.0, help="seconds to wait for consumers before streaming")
+    parser.add_argument("--linger", type=float, default=0.0, help="seconds to keep the segment after the last tick")
+    parser.add_argument("--no-exec", action="store_true", help="don't simulate fills for StrategyCommands")
+    parser.add_argument("--quiet", action="store_true", help="don't print every order/fill")
+    args = parser.parse_args()
+
+    args.start = int(args.start) if args.start is not None and args.start.isdigit() else args.start
+    args.end = int(args.end) if args.end is not None and args.end.isdigit() else args.end
+    replay(args)
+
+if __name__ == "__main__":
+    main()
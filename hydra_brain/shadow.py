@@ -0,0 +1,106 @@
+import time
+import numpy as np
+from shared_defs.schema import LAT_COMMAND_TO_PICKUP, LAT_PICKUP_TO_FILL
+from hydra_brain.latency import record_latency
+
+# Same constants as hydra_core/src/main.cpp (SHADOW MODE)
+SIM_FEE_RATE = 0.00075
+SIM_START_CASH = 10000.0
+ORDER_LATENCY_MS = 20     # execution_loop sleeps 20ms after picking up a command
+BALANCE_SYNC_MS = 500     # balance_sync_loop period
+
+class ShadowExecutor:
+    """Python port of the C++ execution_loop + balance_sync_loop, driven by market time.
+
+    Fill rules (identical to the engine):
+    - a new command becomes the pending order ORDER_LATENCY_MS after it is seen
+      (a newer command replaces it)
+    - BUY fills at the ask once price == 0 (market) or price >= ask
+    - SELL fills at the bid once price == 0 (market) or price <= bid
+    - fee = notional * SIM_FEE_RATE; the fill is dropped (order cleared) if the
+      wallet can't cover it
+    - the wallet is copied into market.real_* every BALANCE_SYNC_MS
+
+    Like the engine, it records command -> pickup and pickup -> fill into the
+    shared latency histograms (wall clock, so they scale with --speed).
+    """
+
+    def __init__(self, layout, start_cash=SIM_START_CASH, fee_rate=SIM_FEE_RATE, latency_ms=ORDER_LATENCY_MS, verbose=True):
+        self.layout = layout
+        self.fee_rate = fee_rate
+        self.latency_ms = latency_ms
+        self.verbose = verbose
+
+        self.usdt = start_cash
+        self.btc = 0.0
+        self.last_cmd_id = layout.command.command_id
+
+        self.pending_action = 0
+        self.pending_qty = 0.0
+        self.pending_price = 0.0
+        self.pending_from_ms = 0
+        self.pickup_ns = 0
+        self.next_sync_ms = 0
+
+        self.commands = 0
+        self.fills = 0
+        self.sync_balances()
+
+    def sync_balances(self):
+        self.layout.market.real_usdt_balance = self.usdt
+        self.layout.market.real_btc_balance = self.btc
+
+    def poll_command(self, now_ms):
+        cmd = self.layout.command
+        if cmd.command_id > self.last_cmd_id:
+            self.last_cmd_id = cmd.command_id
+            self.pickup_ns = time.monotonic_ns()
+            if cmd.write_ns != 0 and self.pickup_ns >= cmd.write_ns:
+                record_latency(self.layout.latency, LAT_COMMAND_TO_PICKUP, self.pickup_ns - cmd.write_ns)
+            self.pending_action = cmd.action
+            self.pending_qty = cmd.quantity
+            self.pending_price = cmd.price
+            self.pending_from_ms = now_ms + self.latency_ms
+            self.commands += 1
+            if self.verbose:
+                side = "BUY" if self.pending_action == 1 else "SELL"
+                print(f"\n[ORDER] Placed {side} {self.pending_qty} @ {self.pending_price}")
+
+    def on_ticks(self, times, bid, ask):
+        """Checks the pending order against a chunk of quotes (first crossing tick wins)"""
+        if len(times) == 0:
+            return
+
+        if self.pending_action != 0:
+            live = times >= self.pending_from_ms
+            if self.pending_action == 1:
+                crossed = live & ((self.pending_price == 0.0) | (self.pending_price >= ask))
+            else:
+                crossed = live & ((self.pending_price == 0.0) | (self.pending_price <= bid))
+
+            hits = np.flatnonzero(crossed)
+            if len(hits) > 0:
+                i = hits[0]
+                self._fill(float(ask[i]) if self.pending_action == 1 else float(bid[i]))
+
+        if times[-1] >= self.next_sync_ms:
+            self.sync_balances()
+            self.next_sync_ms = int(times[-1]) + BALANCE_SYNC_MS
+
+    def _fill(self, fill_price):
+        record_latency(self.layout.latency, LAT_PICKUP_TO_FILL, time.monotonic_ns() - self.pickup_ns)
+        cost = fill_price * self.pending_qty
+        fee = cost * self.fee_rate
+        if self.pending_action == 1 and self.usdt >= cost + fee:
+            self.usdt -= (cost + fee)
+            self.btc += self.pending_qty
+            self.fills += 1
+            if self.verbose:
+                print(f"[SHADOW EXEC] BOUGHT {self.pending_qty} BTC @ {fill_price}")
+        elif self.pending_action == 2 and self.btc >= self.pending_qty:
+            self.btc -= self.pending_qty
+            self.usdt += (cost - fee)
+            self.fills += 1
+            if self.verbose:
+                print(f"[SHADOW EXEC] SOLD {self.pending_qty} BTC @ {fill_price}")
+        self.pending_action = 0
@@ -1,47 +1,36 @@
 import numpy as np
-from collections import deque
+from hydra_brain.indicators import SMA
 
 # ... (GridStrategy and OFIStrategy remain unchanged) ...
 # Paste them here if you want, or just ensure TrendStrategy below replaces the old one
 
 class TrendStrategy:
+    # Columns the backtest engine needs to decode for this strategy
+    columns = ['price']
+
     def __init__(self, short_window=10000, long_window=50000, threshold=0.0005):
         self.short_window = short_window
         self.long_window = long_window
         self.threshold = threshold # <--- NEW FILTER
         
-        self.short_deque = deque(maxlen=short_window)
-        self.long_deque = deque(maxlen=long_window)
-        
-        self.short_sum = 0.0
-        self.long_sum = 0.0
+        # Ring-buffer moving averages (hydra_brain/indicators.py), shared with live_trend.py
+        self.short_ma = SMA(short_window)
+        self.long_ma = SMA(long_window)
         
         self.position = 0
 
     def decide(self, row, inventory, cash):
         price = row.price
         
-        # 1. Update Short Window
-        if len(self.short_deque) == self.short_window:
-            self.short_sum -= self.short_deque[0]
-        self.short_deque.append(price)
-        self.short_sum += price
-        
-        # 2. Update Long Window
-        if len(self.long_deque) == self.long_window:
-            self.long_sum -= self.long_deque[0]
-        self.long_deque.append(price)
-        self.long_sum += price
+        # 1. Update Both Windows (O(1))
+        short_avg = self.short_ma.update(price)
+        long_avg = self.long_ma.update(price)
         
         # Warmup
-        if len(self.long_deque) < self.long_window:
+        if not self.long_ma.ready:
             return 0
-            
-        # 3. Calculate Averages
-        short_avg = self.short_sum / self.short_window
-        long_avg = self.long_sum / self.long_window
         
-        # 4. Logic: Golden Cross WITH BAND FILTER
+        # 2. Logic: Golden Cross WITH BAND FILTER
         # Only buy if Short is SIGNIFICANTLY higher than Long
         if short_avg > long_avg * (1 + self.threshold):
             if self.position == 0:
@@ -54,4 +43,40 @@ class TrendStrategy:
                 self.position = 0
                 return 2 # SELL
                 
-        return 0
\ No newline at end of file
+        return 0
+
+    def decide_batch(self, columns, inventory, cash):
+        """Vectorized decide() over a whole chunk, for BacktestEngine.run_batch.
+
+        SMA.update_batch() returns the same averages update() would, tick for
+        tick, so the actions are identical to decide() for any chunking (and
+        the two can be mixed on one instance).
+        """
+        prices = np.asarray(columns['price'], dtype=np.float64)
+        n = len(prices)
+        if n == 0:
+            return np.zeros(0, dtype=np.int8)
+
+        # 1. Averages for every tick in the chunk
+        # Warmup: nothing happens until the long window is full
+        seen = self.long_ma.count + np.arange(1, n + 1)
+        active = seen >= self.long_window
+        short_avg = self.short_ma.update_batch(prices)
+        long_avg = self.long_ma.update_batch(prices)
+
+        # 2. Band Filter (same expressions as decide)
+        buy = active & (short_avg > long_avg * (1 + self.threshold))
+        sell = active & ~buy & (short_avg < long_avg)
+
+        # 3. Position Latch: position = target of the most recent buy/sell signal
+        signal_idx = np.where(buy | sell, np.arange(n), -1)
+        last_signal = np.maximum.accumulate(signal_idx)
+        position = np.where(last_signal >= 0, buy[np.maximum(last_signal, 0)], self.position).astype(np.int8)
+        prev_position = np.concatenate(([self.position], position[:-1]))
+
+        actions = np.zeros(n, dtype=np.int8)
+        actions[(position == 1) & (prev_position == 0)] = 1 # BUY
+        actions[(position == 0) & (prev_position == 1)] = 2 # SELL
+
+        self.position = int(position[-1])
+        return actions
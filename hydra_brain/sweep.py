@@ -0,0 +1,240 @@
+import time
+import numpy as np
+from hydra_brain.dataset import TickDataset
+from hydra_brain.indicators import SMA
+
+# Single-pass parameter sweep: K TrendStrategy configs scored in ONE stream over
+# the data, with all per-config state held as arrays:
+#
+#   one SMA per DISTINCT window (shared by every config using it)
+#   position latch, cash, btc, fill count    -> shape (K,)
+#   per chunk: averages, signals, positions  -> shape (K, chunk)
+#
+# Work arrays are (row block x chunk) with at most max_cells cells: chunk is
+# max_cells // K but never under MIN_CHUNK ticks (short chunks leave the
+# per-pair Python loop dominating), and large grids go through in blocks of
+# rows. Memory depends on max_cells, not on the length of the data or the
+# number of configs. Every config gets the
+# exact numbers of BacktestEngine.run_batch(TrendStrategy(...).decide_batch):
+# same SMA arithmetic, same band filter expressions, same wallet updates.
+
+SMA_SLICE = 250000
+MIN_CHUNK = 4096
+
+class TrendSweep:
+    def __init__(self, configs, initial_cash=10000.0, fee_rate=0.001, max_cells=2000000):
+        """configs: list of (short_window, long_window, threshold)"""
+        self.initial_cash = initial_cash
+        self.fee_rate = fee_rate
+        self.max_cells = max_cells
+        self.ticks = 0
+        self.last_price = None
+        self._layout([tuple(c) for c in configs], {})
+        k = len(self.configs)
+        self.position = np.zeros(k, dtype=np.int8)
+        self.cash = np.full(k, float(initial_cash))
+        self.btc = np.zeros(k)
+        self.fills = np.zeros(k, dtype=np.int64)
+
+    def _layout(self, configs, smas):
+        """Row layout for these configs; smas: {window: SMA} to carry over"""
+        self.configs = configs
+        k = len(configs)
+
+        # Internally the configs are grouped by (short, long) window pair: a pair's rows
+        # compare the same two averages and only differ in the threshold band
+        self.order = sorted(range(k), key=lambda i: configs[i])
+        self.row_of = np.empty(k, dtype=np.int64)
+        self.row_of[self.order] = np.arange(k)
+        internal = [configs[i] for i in self.order]
+        self.windows = sorted({w for c in internal for w in c[:2]})
+        self.smas = [smas.get(w) or SMA(w) for w in self.windows]
+        slot = {w: i for i, w in enumerate(self.windows)}
+        self.pairs = []  # (short slot, long slot, first row, end row)
+        for i, (short_w, long_w, _) in enumerate(internal):
+            if self.pairs and internal[i - 1][:2] == (short_w, long_w):
+                self.pairs[-1][3] = i + 1
+            else:
+                self.pairs.append([slot[short_w], slot[long_w], i, i + 1])
+        self.long_window = np.array([c[1] for c in internal], dtype=np.int64)[:, None]
+        self.band = np.array([1 + c[2] for c in internal])[:, None] # Same float as long_avg * (1 + threshold)
+        self.chunk = max(MIN_CHUNK, self.max_cells // max(k, 1))
+        self.row_block = max(1, min(k, self.max_cells // self.chunk))
+        self._work_n = 0
+
+    def keep(self, indices):
+        """Drops every config but these (indices into self.configs); the survivors keep
+        their averages, position and wallet, so they continue exactly where they were"""
+        rows = self.row_of[np.asarray(indices, dtype=np.int64)]
+        state = [(name, getattr(self, name)[rows]) for name in ('position', 'cash', 'btc', 'fills')]
+        self._layout([self.configs[i] for i in indices], dict(zip(self.windows, self.smas)))
+        for name, values in state:
+            setattr(self, name, values[self.order])
+
+    def _work(self, n):
+        if self._work_n != n:
+            self._work_arrays = {name: np.empty((self.row_block, n), dtype=dtype) for name, dtype in
+                                 (('band', np.float64), ('buy', bool), ('signal', np.int8), ('starts', bool))}
+            self._work_n = n
+        return self._work_arrays
+
+    def update(self, prices):
+        prices = np.asarray(prices, dtype=np.float64)
+        # Averages in longer slices than the config chunks: update_batch() copies the
+        # whole window once per call, which would dominate for short chunks
+        span = max(self.chunk, SMA_SLICE)
+        for s in range(0, len(prices), span):
+            part = prices[s:s + span]
+            avgs = [sma.update_batch(part) for sma in self.smas]
+            for c in range(0, len(part), self.chunk):
+                self._step(part[c:c + self.chunk], [a[c:c + self.chunk] for a in avgs])
+        if len(prices) > 0:
+            self.last_price = float(prices[-1])
+
+    def _step(self, prices, avgs):
+        n = len(prices)
+        if n == 0:
+            return
+        for r0 in range(0, len(self.configs), self.row_block):
+            self._step_rows(prices, avgs, r0, min(r0 + self.row_block, len(self.configs)))
+        self.ticks += n
+
+    def _step_rows(self, prices, avgs, r0, r1):
+        """One chunk for config rows r0:r1"""
+        n = len(prices)
+        # Work arrays are reused between chunks (no fresh pages for every chunk)
+        w = self._work(n)
+        band, buy, signal, starts = (w[name][:r1 - r0] for name in ('band', 'buy', 'signal', 'starts'))
+
+        # 1. Band Filter (TrendStrategy.decide_batch), one broadcast per window pair
+        # signal: 2 = buy, 1 = sell, 0 = neither
+        for short_slot, long_slot, a, b in self.pairs:
+            a, b = max(a, r0), min(b, r1)
+            if a >= b:
+                continue
+            short_avg, long_avg = avgs[short_slot], avgs[long_slot]
+            i, j = a - r0, b - r0
+            np.multiply(long_avg, self.band[a:b], out=band[i:j])
+            np.greater(short_avg, band[i:j], out=buy[i:j])
+            np.add(buy[i:j].view(np.int8), buy[i:j].view(np.int8), out=signal[i:j])
+            np.maximum(signal[i:j], (short_avg < long_avg).view(np.int8), out=signal[i:j]) # = where(buy, 2, sell)
+        long_window = self.long_window[r0:r1]
+        if self.ticks < long_window.max(): # Warmup: nothing until the long window is full
+            signal[(self.ticks + np.arange(1, n + 1))[None, :] < long_window] = 0
+
+        # 2. Position Latch, on the ticks where a signal starts (the signal is a level, so
+        # those are few). Position = side of the latest buy/sell signal; orders where it flips.
+        starts[:, 0] = True
+        np.not_equal(signal[:, 1:], signal[:, :-1], out=starts[:, 1:])
+        np.logical_and(starts, signal, out=starts)
+        idx = np.flatnonzero(starts) # Row-major: config by config, in tick order
+        if len(idx) == 0:
+            return
+        rows, cols = np.divmod(idx, n)
+        rows += r0
+        position = signal.ravel()[idx] == 2
+        same_row = np.concatenate(([False], rows[1:] == rows[:-1]))
+        prev = np.where(same_row, np.roll(position, 1), self.position[rows] == 1)
+        last = np.flatnonzero(np.append(rows[1:] != rows[:-1], True))
+        self.position[rows[last]] = position[last]
+
+        flips = position != prev
+        if flips.any():
+            self._settle(rows[flips], cols[flips], position[flips], prices)
+
+    def _settle(self, rows, cols, is_buy, prices):
+        """Wallet updates in tick order per config: the j-th order of every config at once"""
+        counts = np.bincount(rows, minlength=len(self.configs))
+        rank = np.arange(len(rows)) - (np.cumsum(counts) - counts)[rows]
+        order = np.argsort(rank, kind='stable')
+        bounds = np.searchsorted(rank[order], np.arange(counts.max() + 1))
+
+        for j in range(counts.max()):
+            sel = order[bounds[j]:bounds[j + 1]]
+            r, buy = rows[sel], is_buy[sel]
+            notional = prices[cols[sel]] * 0.001
+            fee = notional * self.fee_rate
+            buy_cost = notional + fee
+            cash, btc = self.cash[r], self.btc[r]
+
+            # Same arithmetic as BacktestEngine: cash -= (cost + fee) / cash += (revenue - fee)
+            ok = np.where(buy, cash >= buy_cost, btc >= 0.001)
+            self.cash[r] = np.where(ok, np.where(buy, cash - buy_cost, cash + (notional - fee)), cash)
+            self.btc[r] = np.where(ok, np.where(buy, btc + 0.001, btc - 0.001), btc)
+            self.fills[r] += ok
+
+    def results(self, final_price=None):
+        """One dict per config (input order): short, long, thresh, pnl, trades"""
+        price = self.last_price if final_price is None else final_price
+        equity = np.empty(len(self.configs))
+        fills = np.empty(len(self.configs), dtype=np.int64)
+        equity[self.order] = self.cash + self.btc * (price or 0.0)
+        fills[self.order] = self.fills
+        return [{'short': s, 'long': l, 'thresh': t, 'pnl': float(e - self.initial_cash), 'trades': int(f)}
+                for (s, l, t), e, f in zip(self.configs, equity, fills)]
+
+
+def price_batches(source, start=None, end=None, batch_size=1000000):
+    """The price column of a parquet source as a stream of NumPy arrays"""
+    for batch in TickDataset(source, columns=['price'], start=start, end=end, batch_size=batch_size):
+        yield batch.column('price').to_numpy()
+
+def sweep(source, configs, start=None, end=None, max_ticks=None, batch_size=1000000, **kwargs):
+    """Streams the price column once and scores every config -> (results, ticks)"""
+    sw = TrendSweep(configs, **kwargs)
+    start_time = time.time()
+    for prices in price_batches(source, start, end, batch_size):
+        if max_ticks is not None:
+            prices = prices[:max_ticks - sw.ticks]
+        sw.update(prices)
+        print(f"\r[Sweep] {sw.ticks:,} ticks x {len(sw.configs)} configs ({sw.ticks / (time.time() - start_time) / 1e6:.1f}M ticks/s)",
+              end="", flush=True)
+        if max_ticks is not None and sw.ticks >= max_ticks:
+            break
+    print()
+    return sw.results(), sw.ticks
+
+def successive_halving(batches, configs, first_ticks=1000000, growth=3.0, keep=0.25, min_keep=5, max_ticks=None, **kwargs):
+    """Successive halving on ONE stream of prices (batches: iterable of price arrays).
+
+    Rung 0 scores every config on the first `first_ticks` ticks, keeps the best `keep`
+    fraction by PnL (at least min_keep) and the survivors continue on a `growth` x longer
+    prefix, and so on until max_ticks / the end of the data. Continuing is the same as
+    re-scoring from tick 0 (a prefix is a prefix), so nothing is replayed.
+    The first rung is at least 2x the longest long window: configs still warming up
+    would all score 0 and look better than every losing one.
+    -> (results of the final survivors, stats)"""
+    sw = TrendSweep(configs, **kwargs)
+    n_configs = len(sw.configs)
+    budget = max(first_ticks, 2 * max(c[1] for c in sw.configs)) if n_configs > min_keep else None
+    config_ticks = 0
+    rungs = []  # (ticks, configs scored, configs kept)
+
+    for prices in batches:
+        if max_ticks is not None:
+            prices = prices[:max_ticks - sw.ticks]
+        pos = 0
+        while pos < len(prices):
+            if sw.ticks == budget:
+                # Promotion (only once more data exists): best `keep` fraction goes on to a longer slice
+                results = sw.results()
+                n_keep = max(min_keep, int(np.ceil(len(results) * keep)))
+                best = sorted(range(len(results)), key=lambda i: results[i]['pnl'], reverse=True)[:n_keep]
+                top = results[best[0]]
+                print(f"[Halving] {sw.ticks:,} ticks: {len(results)} configs -> keeping {len(best)} "
+                      f"(best S:{top['short']} L:{top['long']} T:{top['thresh']} ${top['pnl']:.2f})")
+                rungs.append((sw.ticks, len(results), len(best)))
+                sw.keep(sorted(best))
+                budget = int(budget * growth) if len(best) > min_keep else None
+
+            take = len(prices) - pos if budget is None else min(len(prices) - pos, budget - sw.ticks)
+            sw.update(prices[pos:pos + take])
+            config_ticks += take * len(sw.configs)
+            pos += take
+        if max_ticks is not None and sw.ticks >= max_ticks:
+            break
+
+    results = sw.results()
+    rungs.append((sw.ticks, len(results), len(results)))
+    stats = {'ticks': sw.ticks, 'config_ticks': config_ticks, 'grid_config_ticks': n_configs * sw.ticks, 'rungs': rungs}
+    return results, stats
@@ -0,0 +1,318 @@
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from hydra_brain.parquet_layout import COLUMN_ENCODING, COMPRESSION, ROW_GROUP_ROWS
+
+# Synthetic Binance-style tick data, for build boxes that can't download archives.
+#
+#   data/synthetic/BTCUSDT-2024-01.parquet                    trades, exact download_data.py schema
+#   data/synthetic/bookTicker/BTCUSDT-bookTicker-2024-01.parquet  best bid/ask (--quotes)
+#
+#   python hydra_brain/synthetic.py --ticks 50000000 --seed 7
+#   python hydra_brain/synthetic.py --ticks 5000000 --quotes --regimes trend,mean_revert,gaps
+#
+# Everything is generated in CHUNK_TICKS blocks of NumPy arrays (no per-tick
+# Python), so 50M ticks take seconds and memory stays flat; a writer thread
+# encodes block k (parquet_layout's tuned encodings, time statistics on every
+# row group) while block k+1 is generated. The price path is
+# a chain of regime segments (mean length REGIME_TICKS), each one of:
+#   walk         plain random walk
+#   trend        random walk + constant drift (TREND_MOVE over the segment)
+#   mean_revert  quiet walk + a band-limited swing around it (MR_AMPLITUDE)
+#   vol_burst    VOL_BURST_MULT x volatility, trades arriving that much faster
+# plus two kinds of events on top:
+#   gaps         feed outage: minutes without trades, price jumps across it
+#   bursts       market-order sweeps: same-ms trades, one side, price walking one way
+# Same seed + same arguments -> byte-identical files.
+
+# Configuration
+SYMBOL = "BTCUSDT"
+OUT_DIR = "data/synthetic"
+START = "2024-01-01"
+START_PRICE = 42000.0
+TICK_SIZE = 0.01
+LOT_SIZE = 0.00001
+CHUNK_TICKS = 2000000             # Ticks generated per block (also fixes the random stream)
+
+SEGMENT_REGIMES = ("walk", "trend", "mean_revert", "vol_burst")
+EVENT_REGIMES = ("gaps", "bursts")
+REGIMES = SEGMENT_REGIMES + EVENT_REGIMES
+
+MEAN_INTERVAL_MS = 50.0           # Mean gap between trades (exponential, whole ms)
+TICK_VOL = 0.000015               # Std of one trade's log-return in a plain walk
+REGIME_TICKS = 250000             # Mean regime segment length
+TREND_MOVE = 0.03                 # Drift over a whole trend segment
+MR_AMPLITUDE = 0.004              # Std of the mean-reversion swing (log-price)
+MR_PERIOD_TICKS = 20000           # Spacing of the swing's turning points
+MR_WALK_VOL = 0.3                 # Walk volatility multiplier under mean reversion
+VOL_BURST_MULT = 4.0
+RAMP_TICKS = 2000                 # Swing fades in / out over this many ticks (no price jumps)
+GAPS_PER_MILLION = 2.0
+GAP_MINUTES = 15.0                # Mean outage length
+GAP_JUMP = 0.005                  # Std of the log-price jump across an outage
+BURSTS_PER_MILLION = 400.0
+BURST_TICKS = 12.0                # Mean trades per sweep
+MEAN_QTY = 0.005                  # Median trade size (lognormal)
+QUOTES_PER_TRADE = 3.0            # Mean bookTicker updates per trade
+MEAN_BOOK_QTY = 1.5               # Mean top-of-book size
+
+# Same as scripts/download_data.py
+SCHEMA = pa.schema([("time", pa.uint64()), ("price", pa.float32()), ("qty", pa.float32()), ("ibm", pa.bool_())])
+QUOTE_SCHEMA = pa.schema([("time", pa.uint64()), ("bid_price", pa.float64()), ("bid_qty", pa.float64()),
+                          ("ask_price", pa.float64()), ("ask_qty", pa.float64())])
+
+class TickGenerator:
+    """Streams synthetic trades as dicts of NumPy arrays, CHUNK_TICKS at a time"""
+
+    def __init__(self, ticks, seed=0, regimes=REGIMES, start=START, start_price=START_PRICE):
+        unknown = set(regimes) - set(REGIMES)
+        if unknown:
+            raise ValueError(f"Unknown regime(s) {sorted(unknown)}; choose from {', '.join(REGIMES)}")
+        self.ticks = ticks
+        self.regimes = set(regimes)
+        self.start_price = start_price
+        self.rng = np.random.default_rng(seed)
+        self.pos = 0
+        self.last_time = int(np.datetime64(start, 'ms').astype(np.int64))
+        self.last_log = 0.0   # Walk part of the log-price
+        self.last_price = start_price
+        self.burst_until = 0  # Absolute tick where the running sweep ends...
+        self.burst_side = 1   # ...and its direction
+        self._schedule(np.random.default_rng([seed, 1]))
+
+    def _schedule(self, rng):
+        """Regime segments for the whole run + the swing's turning points (tiny arrays)"""
+        kinds = [k for k in SEGMENT_REGIMES if k in self.regimes] or ["walk"]
+        n_seg = int(self.ticks / REGIME_TICKS * 2) + 2
+        lengths = np.maximum(1, rng.exponential(REGIME_TICKS, n_seg)).astype(np.int64)
+        while lengths.sum() < self.ticks:
+            lengths = np.concatenate((lengths, lengths))
+        self.seg_start = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        self.seg_end = np.cumsum(lengths)
+        kind = np.array(kinds)[rng.integers(0, len(kinds), len(lengths))]
+        self.seg_kind = kind
+        self.seg_drift = np.where(kind == "trend", rng.choice([-1.0, 1.0], len(lengths)) * TREND_MOVE / lengths, 0.0)
+        self.seg_vol = np.select([kind == "vol_burst", kind == "mean_revert"], [VOL_BURST_MULT, MR_WALK_VOL], 1.0)
+        self.seg_mr = kind == "mean_revert"
+        self.knots = rng.standard_normal(self.ticks // MR_PERIOD_TICKS + 2)
+
+    def __iter__(self):
+        while self.pos < self.ticks:
+            yield self.next_chunk(min(CHUNK_TICKS, self.ticks - self.pos))
+
+    def next_chunk(self, n):
+        rng = self.rng
+        lo, hi = self.pos, self.pos + n
+        # Regime segments overlapping this chunk, each repeated over its ticks
+        first = np.searchsorted(self.seg_start, lo, side='right') - 1
+        last = np.searchsorted(self.seg_start, hi - 1, side='right')
+        counts = np.minimum(self.seg_end[first:last], hi) - np.maximum(self.seg_start[first:last], lo)
+        vol = self.seg_vol[first:last].astype(np.float32)
+
+        # 1. Returns: regime drift + regime volatility (float32 steps, summed in float64)
+        ret = rng.standard_normal(n, dtype=np.float32)
+        ret *= np.repeat(vol * np.float32(TICK_VOL), counts)
+        if self.seg_drift[first:last].any():
+            ret += np.repeat(self.seg_drift[first:last].astype(np.float32), counts)
+        dt = rng.standard_exponential(n, dtype=np.float32)
+        dt *= np.repeat(np.float32(MEAN_INTERVAL_MS) / vol.clip(1.0), counts) # Faster tape when volatile
+        vol = np.repeat(vol, counts)
+        if "gaps" in self.regimes:
+            gap = rng.integers(0, n, rng.binomial(n, GAPS_PER_MILLION / 1e6))
+            dt[gap] += rng.exponential(GAP_MINUTES * 60000, len(gap))
+            ret[gap] += rng.normal(0, GAP_JUMP, len(gap))
+
+        # 2. Sweeps: the trades after a sweep's opening one share its ms and its side, and the
+        # price only moves the sweep's way (union of [start + 1, end) intervals, may run into the next chunk)
+        depth = np.zeros(n + 1, dtype=np.int32)
+        depth[0] += self.burst_until > lo
+        depth[min(max(self.burst_until - lo, 0), n)] -= self.burst_until > lo
+        side = np.full(n, self.burst_side, dtype=np.int8)
+        if "bursts" in self.regimes:
+            starts = np.unique(rng.integers(0, n, rng.binomial(n, BURSTS_PER_MILLION / 1e6)))
+            ends = starts + rng.geometric(1.0 / BURST_TICKS, len(starts))
+            sides = rng.choice(np.array([-1, 1], dtype=np.int8), len(starts))
+            np.add.at(depth, starts + 1, 1)
+            np.add.at(depth, np.minimum(ends, n), -1)
+            side = np.repeat(np.concatenate(([self.burst_side], sides)), np.diff(np.concatenate(([0], starts, [n]))))
+            self.burst_until = max(self.burst_until, lo + int(ends.max(initial=0)))
+        in_burst = np.cumsum(depth[:n]) > 0
+        ret[in_burst] = side[in_burst] * np.abs(ret[in_burst])
+        self.burst_side = int(side[-1])
+
+        # 3. Times: whole ms, sweeps add 0 ms
+        dt = np.rint(dt).astype(np.int64)
+        dt[in_burst] = 0
+        times = self.last_time + np.cumsum(dt)
+
+        # 4. Prices: walk + mean-reversion swing (faded in/out at the segment edges), on the tick grid
+        walk = self.last_log + np.cumsum(ret, dtype=np.float64)
+        log_price = walk
+        mr = np.flatnonzero(np.repeat(self.seg_mr[first:last], counts))
+        if len(mr):
+            log_price = walk.copy()
+            idx = lo + mr
+            seg = first + np.searchsorted(self.seg_start[first:last], idx, side='right') - 1
+            ramp = (np.minimum(idx - self.seg_start[seg], self.seg_end[seg] - idx) / RAMP_TICKS).clip(0.0, 1.0)
+            log_price[mr] += MR_AMPLITUDE * ramp * np.interp(idx / MR_PERIOD_TICKS, np.arange(len(self.knots)), self.knots)
+        prices = np.exp(log_price)
+        prices *= self.start_price / TICK_SIZE
+        np.maximum(np.rint(prices, out=prices), 1.0, out=prices)
+        prices *= TICK_SIZE
+
+        # 5. Aggressor side: the tick direction with 15% noise (ties: a coin flip), sweeps one-sided
+        move = np.empty(n)
+        move[0] = prices[0] - self.last_price
+        np.subtract(prices[1:], prices[:-1], out=move[1:])
+        u = rng.random(n, dtype=np.float32)
+        buyer_taker = np.where(move == 0, u < 0.5, (move > 0) ^ (u < 0.15))
+        buyer_taker[in_burst] = side[in_burst] > 0
+
+        # 6. Sizes: lognormal on the lot grid, sweeps trade bigger
+        qty = rng.standard_normal(n, dtype=np.float32)
+        qty *= np.float32(1.2)
+        np.exp(qty, out=qty)
+        qty *= np.float32(MEAN_QTY / LOT_SIZE)
+        qty[in_burst] *= 3
+        np.maximum(np.rint(qty, out=qty), 1.0, out=qty)
+        qty *= np.float32(LOT_SIZE)
+
+        self.pos = hi
+        self.last_time, self.last_log, self.last_price = int(times[-1]), float(walk[-1]), float(prices[-1])
+        return {'time': times, 'price': prices, 'qty': qty, 'ibm': ~buyer_taker, 'vol': vol}
+
+def quotes_from_trades(chunk, rng, per_trade=QUOTES_PER_TRADE):
+    """bookTicker updates around the trades: each trade sits on the touch it hit (sells at
+    the bid, buys at the ask), the spread widens with the regime's volatility, and a few
+    size-only updates follow each trade before the next one"""
+    times, prices, ibm = chunk['time'], chunk['price'], chunk['ibm']
+    n = len(times)
+    spread = rng.geometric(1.0 / chunk['vol'].clip(1.0)) * TICK_SIZE
+    bid = np.round(np.where(ibm, prices, prices - spread), 2)
+    ask = np.round(np.where(ibm, prices + spread, prices), 2)
+
+    count = 1 + rng.poisson(max(per_trade - 1.0, 0.0), n)
+    total = int(count.sum())
+    src = np.repeat(np.arange(n), count)
+    rank = np.arange(total) - np.repeat(np.cumsum(count) - count, count)
+    next_gap = np.diff(times, append=times[-1])
+    quote_times = times[src] + next_gap[src] * rank // count[src] # Spread evenly up to the next trade
+
+    lot = 1.0 / LOT_SIZE
+    return {
+        'time': quote_times,
+        'bid_price': bid[src],
+        'bid_qty': np.maximum(np.round(rng.exponential(MEAN_BOOK_QTY, total) * lot), 1) / lot,
+        'ask_price': ask[src],
+        'ask_qty': np.maximum(np.round(rng.exponential(MEAN_BOOK_QTY, total) * lot), 1) / lot,
+    }
+
+class MonthlyWriter:
+    """Appends time-ordered arrays to {prefix}-{YYYY-MM}.parquet files (.tmp until closed)"""
+
+    def __init__(self, out_dir, prefix, schema):
+        self.out_dir, self.prefix, self.schema = out_dir, prefix, schema
+        # parquet_layout's encodings, BYTE_STREAM_SPLIT for the quote columns too
+        self.encoding = {f.name: COLUMN_ENCODING.get(f.name, 'BYTE_STREAM_SPLIT') for f in schema
+                         if f.name in COLUMN_ENCODING or pa.types.is_floating(f.type)}
+        self.writer = self.month = self.path = None
+        self.paths = []
+        os.makedirs(out_dir, exist_ok=True)
+
+    def write(self, columns):
+        months = columns['time'].astype('datetime64[ms]').astype('datetime64[M]')
+        cuts = np.flatnonzero(months[1:] != months[:-1]) + 1
+        for s, e in zip(np.concatenate(([0], cuts)), np.concatenate((cuts, [len(months)]))):
+            if months[s] != self.month:
+                self._open(months[s])
+            table = pa.table({f.name: pa.array(columns[f.name][s:e].astype(f.type.to_pandas_dtype())) for f in self.schema},
+                             schema=self.schema)
+            self.writer.write_table(table, row_group_size=ROW_GROUP_ROWS)
+
+    def _open(self, month):
+        self.close()
+        self.month = month
+        self.path = os.path.join(self.out_dir, f"{self.prefix}-{month}.parquet")
+        self.writer = pq.ParquetWriter(
+            self.path + ".tmp", self.schema,
+            compression=COMPRESSION,
+            use_dictionary=[n for n in self.schema.names if n not in self.encoding],
+            column_encoding=self.encoding,
+            write_statistics=True,
+            write_page_index=True,
+            sorting_columns=[pq.SortingColumn(self.schema.get_field_index('time'))],
+        )
+
+    def close(self, keep=True):
+        """keep=False drops the unfinished month (an aborted run leaves no partial file)"""
+        if self.writer is not None:
+            self.writer.close()
+            if keep:
+                os.replace(self.path + ".tmp", self.path)
+                self.paths.append(self.path)
+            else:
+                os.remove(self.path + ".tmp")
+            self.writer = None
+
+def generate(ticks, out_dir=OUT_DIR, seed=0, regimes=REGIMES, quotes=False, symbol=SYMBOL, start=START):
+    """Writes `ticks` synthetic trades (+ bookTicker quotes) -> (trade files, quote files)"""
+    gen = TickGenerator(ticks, seed, regimes, start)
+    quote_rng = np.random.default_rng([seed, 2])
+    trades = MonthlyWriter(out_dir, symbol, SCHEMA)
+    book = MonthlyWriter(os.path.join(out_dir, "bookTicker"), f"{symbol}-bookTicker", QUOTE_SCHEMA) if quotes else None
+
+    def write(chunk):
+        trades.write(chunk)
+        if book is None:
+            return 0
+        q = quotes_from_trades(chunk, quote_rng)
+        book.write(q)
+        return len(q['time'])
+
+    start_time = time.time()
+    n_quotes = 0
+    pending = None
+    try:
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            for chunk in gen:
+                if pending is not None:
+                    n_quotes += pending.result() # At most one block waiting: memory stays at ~2 blocks
+                pending = pool.submit(write, chunk)
+                print(f"\r[Synth] {gen.pos:,}/{ticks:,} ticks ({gen.pos / (time.time() - start_time) / 1e6:.1f}M ticks/s)",
+                      end="", flush=True)
+            if pending is not None:
+                n_quotes += pending.result()
+    except BaseException:
+        for writer in (trades, book):
+            if writer is not None:
+                writer.close(keep=False)
+        raise
+    for writer in (trades, book):
+        if writer is not None:
+            writer.close()
+    print(f"\n[Synth] Wrote {ticks:,} trades{f' + {n_quotes:,} quotes' if quotes else ''} "
+          f"in {time.time() - start_time:.1f}s -> {out_dir} (last price {gen.last_price:,.2f})")
+    return trades.paths, book.paths if book is not None else []
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic trade / bookTicker parquet files")
+    parser.add_argument("--ticks", type=int, default=10000000)
+    parser.add_argument("--out", default=OUT_DIR, help="output directory")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--regimes", default=",".join(REGIMES), help=f"comma-separated subset of {','.join(REGIMES)}")
+    parser.add_argument("--quotes", action="store_true", help="also write bookTicker files")
+    parser.add_argument("--symbol", default=SYMBOL)
+    parser.add_argument("--start", default=START, help="UTC date of the first trade")
+    args = parser.parse_args()
+    regimes = [r.strip() for r in args.regimes.split(",") if r.strip()]
+    generate(args.ticks, args.out, args.seed, regimes, args.quotes, args.symbol, args.start)
+
+if __name__ == "__main__":
+    main()
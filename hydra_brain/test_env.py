@@ -2,6 +2,7 @@ import sys
 import os
 import glob
 import time
+import pandas as pd
 
 # --- FIX IMPORT PATHS ---
 # 1. Add 'hydra_brain' folder to path (so we can find 'envs')
@@ -15,18 +16,18 @@ sys.path.append(root_dir)
 
 from envs.crypto_env import CryptoMarketMakingEnv
 
-# Auto-find the CSV file
+# Auto-find the latest recording (recorder.py writes Parquet)
 data_dir = os.path.join(root_dir, 'data/raw_ticks')
-list_of_files = glob.glob(f'{data_dir}/*.csv') 
+list_of_files = glob.glob(f'{data_dir}/*.parquet') 
 
 if not list_of_files:
-    print(f"Error: No CSV files found in {data_dir}")
+    print(f"Error: No Parquet files found in {data_dir}")
     sys.exit(1)
 
 latest_file = max(list_of_files, key=os.path.getctime)
 print(f"Loading: {latest_file}")
 
-env = CryptoMarketMakingEnv(latest_file)
+env = CryptoMarketMakingEnv(pd.read_parquet(latest_file))
 obs, _ = env.reset()
 
 print(f"Initial State: {obs}")
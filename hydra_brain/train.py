@@ -1,50 +1,49 @@
 import sys
 import os
-import glob
-import pandas as pd
 import numpy as np
 from sb3_contrib import RecurrentPPO
-from stable_baselines3.common.vec_env import DummyVecEnv
 
-# Fix Import Path
+# Fix Import Path (repo root only: the envs load as hydra_brain.envs.*, one module identity)
 current_dir = os.path.dirname(os.path.abspath(__file__))
-sys.path.append(current_dir)
 sys.path.append(os.path.dirname(current_dir))
 
-from envs.crypto_env import CryptoMarketMakingEnv
+from hydra_brain.envs.vec_env import VecMarketMakingEnv, SubprocMarketMakingEnv
+from hydra_brain.dataset import resolve_files
+from hydra_brain.feature_store import build_feature_store, is_fresh, open_feature_store
+from hydra_brain.lstm_policy import export_policy
 
-def load_all_data():
-    """Loads and merges ALL Parquet files from data/parquet"""
-    data_dir = os.path.join(os.path.dirname(current_dir), 'data/parquet')
-    files = glob.glob(f'{data_dir}/*.parquet')
-    
-    if not files:
-        print(f"Error: No Parquet files found in {data_dir}")
+DATA_DIR = os.path.join(os.path.dirname(current_dir), 'data/parquet')
+FEATURE_DIR = os.path.join(os.path.dirname(current_dir), 'data/features')
+N_ENVS = 8               # Parallel episodes, stepped together as arrays
+EPISODE_STEPS = 50000    # Ticks per episode, sampled at a random offset on every reset
+N_WORKERS = 1            # >1: split the N_ENVS over this many processes (all map the same feature store)
+
+def load_features():
+    """Memory-maps the feature store (built from data/parquet once, rebuilt when files change)"""
+    if not resolve_files(DATA_DIR):
+        print(f"Error: No Parquet files found in {DATA_DIR}")
         print("Did you run scripts/download_data.py?")
         sys.exit(1)
-        
-    print(f"[Hydra] Found {len(files)} data files. Loading...")
-    
-    # Load all files into a list of DataFrames
-    dfs = []
-    for f in files:
-        print(f"  - Loading {os.path.basename(f)}...")
-        df = pd.read_parquet(f)
-        dfs.append(df)
-        
-    # Concatenate into one massive timeline
-    full_df = pd.concat(dfs).sort_values('time').reset_index(drop=True)
-    print(f"[Hydra] Data Loaded. Total Ticks: {len(full_df):,}")
-    return full_df
+
+    if not is_fresh(FEATURE_DIR, DATA_DIR):
+        build_feature_store(DATA_DIR, FEATURE_DIR)
+
+    features, manifest = open_feature_store(FEATURE_DIR)
+    print(f"[Hydra] Feature store mapped: {manifest['ticks']:,} ticks from {len(manifest['sources'])} file(s)")
+    return features
 
 def train():
-    # 1. Load Big Data
-    df = load_all_data()
+    # 1. Map Big Data (pages are read as episodes touch them)
+    features = load_features()
 
     # 2. Setup Environment
-    # We pass the DataFrame directly to the Env
-    print("[Hydra] Initializing Environment...")
-    env = DummyVecEnv([lambda: CryptoMarketMakingEnv(df)])
+    # One rollout = n_steps x N_ENVS ticks from random episode windows
+    if N_WORKERS > 1:
+        print(f"[Hydra] Initializing {N_ENVS} Environments in {N_WORKERS} Worker Processes...")
+        env = SubprocMarketMakingEnv(FEATURE_DIR, num_envs=N_ENVS, n_workers=N_WORKERS, max_steps=EPISODE_STEPS, random_start=True)
+    else:
+        print(f"[Hydra] Initializing {N_ENVS} Vectorized Environments...")
+        env = VecMarketMakingEnv(features, num_envs=N_ENVS, max_steps=EPISODE_STEPS, random_start=True)
 
     # 3. Define the LSTM Brain (RecurrentPPO)
     print("[Hydra] Initializing RecurrentPPO (LSTM)...")
@@ -70,6 +69,8 @@ def train():
     save_path = os.path.join(current_dir, "checkpoints/hydra_lstm_v1")
     model.save(save_path)
     print(f"[Hydra] LSTM Brain saved to {save_path}.zip")
+    export_policy(model, save_path + ".npz") # What main_strategy.py loads (no torch at runtime)
+    env.close()
 
 if __name__ == "__main__":
     train()
\ No newline at end of file
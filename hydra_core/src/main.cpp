@@ -14,6 +14,11 @@
 #include <iomanip>
 #include <sstream>
 #include <random> 
+#include <atomic>
+#include <climits>
+#include <linux/futex.h>
+#include <sys/syscall.h>
+#include <unistd.h>
 
 #include "../../shared_defs/schema.h"
 
@@ -41,6 +46,12 @@ uint64_t current_timestamp() {
         std::chrono::system_clock::now().time_since_epoch()).count();
 }
 
+uint64_t monotonic_ns() {
+    // steady_clock == CLOCK_MONOTONIC on Linux, same clock as Python's time.monotonic_ns()
+    return std::chrono::duration_cast<std::chrono::nanoseconds>(
+        std::chrono::steady_clock::now().time_since_epoch()).count();
+}
+
 double get_json_value(const std::string& json, std::string key) {
     std::string search = "\"" + key + "\":\"";
     size_t start = json.find(search);
@@ -50,6 +61,55 @@ double get_json_value(const std::string& json, std::string key) {
     try { return std::stod(json.substr(start, end - start)); } catch (...) { return 0.0; }
 }
 
+// Unquoted integer field (e.g. the event time "E":1700000000000); 0 if missing
+uint64_t get_json_uint(const std::string& json, std::string key) {
+    std::string search = "\"" + key + "\":";
+    size_t start = json.find(search);
+    if (start == std::string::npos) return 0;
+    start += search.length();
+    uint64_t v = 0;
+    while (start < json.size() && json[start] >= '0' && json[start] <= '9') {
+        v = v * 10 + (json[start++] - '0');
+    }
+    return v;
+}
+
+// --- LATENCY HISTOGRAMS (see LatencyHistograms in schema.h) ---
+void record_latency(LatencyHistograms& lat, int stage, uint64_t ns) {
+    std::atomic_ref<uint64_t>(lat.counts[stage][latency_bucket(ns)]).fetch_add(1, std::memory_order_relaxed);
+    std::atomic_ref<uint64_t> max_ref(lat.max_ns[stage]);
+    uint64_t prev = max_ref.load(std::memory_order_relaxed);
+    while (ns > prev && !max_ref.compare_exchange_weak(prev, ns, std::memory_order_relaxed)) {}
+}
+
+// --- TICK RING PUBLISH (feed thread is the only producer) ---
+uint64_t publish_tick(TickRing& ring, uint64_t time_ms, double bid, double bid_qty, double ask, double ask_qty, uint64_t recv_ns) {
+    uint64_t publish_ns = monotonic_ns();
+    uint64_t seq = ring.write_seq + 1;
+    TickRecord& slot = ring.slots[seq & (TICK_RING_CAPACITY - 1)];
+
+    // Seqlock: invalidate the slot, write the payload, then stamp it with its sequence
+    std::atomic_ref<uint64_t>(slot.seq).store(0, std::memory_order_relaxed);
+    std::atomic_thread_fence(std::memory_order_release);
+    slot.local_time_ms = time_ms;
+    slot.bid_price = bid;
+    slot.bid_qty = bid_qty;
+    slot.ask_price = ask;
+    slot.ask_qty = ask_qty;
+    slot.recv_ns = recv_ns;
+    slot.publish_ns = publish_ns;
+    std::atomic_ref<uint64_t>(slot.seq).store(seq, std::memory_order_release);
+    std::atomic_ref<uint64_t>(ring.write_seq).store(seq, std::memory_order_release);
+
+    // Doorbell for readers blocked in futex_wait (see hydra_brain/bridge.py DoorbellWait)
+    std::atomic_ref<uint32_t>(ring.doorbell).fetch_add(1, std::memory_order_seq_cst);
+    // seq_cst: must not move above the bump (the reader arms, reads the bell, then sleeps)
+    if (std::atomic_ref<uint32_t>(ring.doorbell_armed).load(std::memory_order_seq_cst)) {
+        syscall(SYS_futex, &ring.doorbell, FUTEX_WAKE, INT_MAX, nullptr, nullptr, 0);
+    }
+    return publish_ns;
+}
+
 // --- SHADOW SYNC THREAD ---
 void balance_sync_loop(SharedMemoryLayout* layout) {
     std::cout << "[SHADOW SYNC] Thread Started." << std::endl;
@@ -70,10 +130,16 @@ void execution_loop(SharedMemoryLayout* layout) {
     int pending_action = 0; 
     double pending_price = 0.0;
     double pending_qty = 0.0;
+    uint64_t pickup_ns = 0;
 
     while(true) {
          if (layout->command.command_id > last_cmd_id) {
             last_cmd_id = layout->command.command_id;
+            pickup_ns = monotonic_ns();
+            uint64_t write_ns = layout->command.write_ns;
+            if (write_ns != 0 && pickup_ns >= write_ns) {
+                record_latency(layout->latency, LAT_COMMAND_TO_PICKUP, pickup_ns - write_ns);
+            }
             std::this_thread::sleep_for(std::chrono::milliseconds(20));
 
             pending_action = layout->command.action;
@@ -100,6 +166,7 @@ void execution_loop(SharedMemoryLayout* layout) {
              }
 
              if (filled) {
+                 record_latency(layout->latency, LAT_PICKUP_TO_FILL, monotonic_ns() - pickup_ns);
                  double cost = fill_price * pending_qty;
                  double fee = cost * SIM_FEE_RATE;
                  if (pending_action == 1 && sim_wallet.usdt >= cost + fee) {
@@ -129,6 +196,10 @@ int main() {
         bip::mapped_region region(shm, bip::read_write);
         SharedMemoryLayout *layout = static_cast<SharedMemoryLayout*>(region.get_address());
         layout->command.command_id = 0;
+        layout->ticks.write_seq = 0;
+        layout->ticks.capacity = TICK_RING_CAPACITY;
+        layout->ticks.doorbell = 0;
+        layout->ticks.doorbell_armed = 0;
 
         std::thread exec_thread(execution_loop, layout);
         exec_thread.detach(); 
@@ -176,16 +247,32 @@ int main() {
                     beast::get_lowest_layer(ws).expires_after(std::chrono::seconds(10));
                     
                     ws.read(buffer);
+                    uint64_t recv_ns = monotonic_ns();
                     
                     // Reset
                     beast::get_lowest_layer(ws).expires_never(); 
 
                     std::string msg = beast::buffers_to_string(buffer.data());
-                    layout->market.bid_price = get_json_value(msg, "b");
-                    layout->market.ask_price = get_json_value(msg, "a");
-                    layout->market.bid_qty = get_json_value(msg, "B");
-                    layout->market.ask_qty = get_json_value(msg, "A");
-                    layout->market.local_time_ms = current_timestamp();
+                    double bid = get_json_value(msg, "b");
+                    double ask = get_json_value(msg, "a");
+                    double bid_qty = get_json_value(msg, "B");
+                    double ask_qty = get_json_value(msg, "A");
+                    uint64_t now_ms = current_timestamp();
+                    uint64_t event_ms = get_json_uint(msg, "E"); // Not sent on every stream
+                    if (event_ms != 0 && now_ms >= event_ms) {
+                        record_latency(layout->latency, LAT_EXCHANGE_TO_RECV, (now_ms - event_ms) * 1000000ULL);
+                    }
+
+                    // Latest-quote snapshot (dashboard, execution thread)
+                    layout->market.bid_price = bid;
+                    layout->market.ask_price = ask;
+                    layout->market.bid_qty = bid_qty;
+                    layout->market.ask_qty = ask_qty;
+                    layout->market.local_time_ms = now_ms;
+
+                    // Every tick, in order (strategies, recorder)
+                    uint64_t publish_ns = publish_tick(layout->ticks, now_ms, bid, bid_qty, ask, ask_qty, recv_ns);
+                    record_latency(layout->latency, LAT_RECV_TO_PUBLISH, publish_ns - recv_ns);
                     buffer.consume(buffer.size());
                 }
             }
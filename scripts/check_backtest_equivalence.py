@@ -0,0 +1,78 @@
+import sys
+import os
+import time
+import numpy as np
+import pyarrow.parquet as pq
+from types import SimpleNamespace
+
+# Run from the repo root: python scripts/check_backtest_equivalence.py [parquet_path]
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from hydra_brain.backtest_engine import BacktestEngine
+from hydra_brain.strategies import TrendStrategy
+
+DATA_PATH = sys.argv[1] if len(sys.argv) > 1 else "data/parquet/BTCUSDT-2024-01.parquet"
+PARAMS = dict(short_window=20000, long_window=80000, threshold=0.001)
+
+def row_strategy_as_batch(decide):
+    """Wraps a per-row decide() so it can be driven by BacktestEngine.run_batch"""
+    def decide_batch(columns, btc, cash):
+        prices = columns['price'].astype(np.float64)
+        actions = np.zeros(len(prices), dtype=np.int8)
+        row = SimpleNamespace(price=0.0)
+        for i, price in enumerate(prices.tolist()):
+            row.price = price
+            actions[i] = decide(row, btc, cash)
+        return actions
+    return decide_batch
+
+def check_strategy():
+    """decide() vs decide_batch(): actions must match tick for tick"""
+    row_decide = row_strategy_as_batch(TrendStrategy(**PARAMS).decide)
+    batch_strat = TrendStrategy(**PARAMS)
+
+    mismatches = 0
+    ticks = 0
+    # Odd batch size on purpose: the kernel must carry its windows across any chunk boundary
+    for batch in pq.ParquetFile(DATA_PATH).iter_batches(batch_size=33333, columns=['price']):
+        columns = {'price': batch.column('price').to_numpy()}
+        expected = row_decide(columns, 0.0, 0.0)
+        got = batch_strat.decide_batch(columns, 0.0, 0.0)
+        mismatches += int(np.count_nonzero(expected != got))
+        ticks += len(got)
+
+    print(f"[Strategy] {ticks:,} ticks compared, {mismatches} mismatching actions")
+    return mismatches == 0
+
+def check_engine():
+    """run(decide) vs run_batch(decide_batch): final wallet must match"""
+    print("--- ROW MODE (reference) ---")
+    t0 = time.time()
+    row_engine = BacktestEngine()
+    row_engine.run(DATA_PATH, TrendStrategy(**PARAMS).decide)
+    row_time = time.time() - t0
+
+    print("\n--- BATCH MODE ---")
+    t0 = time.time()
+    batch_engine = BacktestEngine()
+    batch_engine.run_batch(DATA_PATH, TrendStrategy(**PARAMS).decide_batch)
+    batch_time = time.time() - t0
+
+    print("\n" + "="*40)
+    print(f"Row   : cash={row_engine.cash!r} btc={row_engine.btc!r} ({row_time:.1f}s)")
+    print(f"Batch : cash={batch_engine.cash!r} btc={batch_engine.btc!r} ({batch_time:.1f}s)")
+    print(f"Fills : row={len(row_engine.ledger.fills):,} batch={len(batch_engine.ledger.fills):,}")
+
+    return (row_engine.cash == batch_engine.cash
+            and row_engine.btc == batch_engine.btc
+            and row_engine.total_ticks == batch_engine.total_ticks
+            and np.array_equal(row_engine.equity_curve, batch_engine.equity_curve)
+            and all(np.array_equal(row_engine.ledger.fills[c], batch_engine.ledger.fills[c]) for c in row_engine.ledger.fills.names))
+
+def main():
+    same = check_strategy() and check_engine()
+    print("RESULT: IDENTICAL" if same else "RESULT: MISMATCH")
+    print("="*40)
+    sys.exit(0 if same else 1)
+
+if __name__ == "__main__":
+    main()
@@ -1,71 +1,158 @@
-import pandas as pd
-import requests
-import zipfile
-import io
 import os
+import sys
+import time
+import shutil
+import zipfile
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pyarrow as pa
+import pyarrow.csv as pcsv
 import pyarrow.parquet as pq
 
+# Binance monthly trade archives -> data/parquet/{SYMBOL}-{YYYY-MM}.parquet
+#
+#   python scripts/download_data.py                                  # MONTHS below
+#   python scripts/download_data.py --months 2024-01 2024-02 2024-03 --workers 3
+#   python scripts/download_data.py --source /mnt/archives           # local zips, no network
+#
+# Pipeline per month: the zip is streamed to disk (never held in RAM), its CSV
+# is parsed by Arrow's multi-threaded reader block by block and written
+# straight to parquet (no pandas). Months run concurrently in threads (network
+# and Arrow both release the GIL). Outputs only appear under their final name
+# once complete, so an interrupted run resumes at file granularity: finished
+# parquet files are skipped, finished downloads are not fetched again.
+
 # Configuration
 SYMBOL = "BTCUSDT"
-# Let's start with just ONE month to test. 
-# If this works, you can add "2024-02", "2024-03" back to this list.
-MONTHS = ["2024-01"] 
+MONTHS = ["2024-01"]
 BASE_URL = "https://data.binance.vision/data/spot/monthly/trades"
 DATA_DIR = "data/parquet"
+WORKERS = 3                       # Months in flight at once
+CSV_BLOCK_SIZE = 16 << 20         # Bytes of CSV per Arrow block (one record batch)
+DOWNLOAD_CHUNK = 1 << 20
 
-os.makedirs(DATA_DIR, exist_ok=True)
+CSV_COLUMNS = ["id", "price", "qty", "q_qty", "time", "ibm", "ibm2"]
+SCHEMA = pa.schema([("time", pa.uint64()), ("price", pa.float32()), ("qty", pa.float32()), ("ibm", pa.bool_())])
 
-for date in MONTHS:
-    year, month = date.split("-")
-    url = f"{BASE_URL}/{SYMBOL}/{SYMBOL}-trades-{year}-{month}.zip"
-    output = f"{DATA_DIR}/{SYMBOL}-{date}.parquet"
-    
-    if os.path.exists(output):
-        print(f"Skipping {date}, already exists.")
-        continue
-
-    print(f"Downloading {url}...")
-    try:
-        r = requests.get(url, stream=True)
-        z = zipfile.ZipFile(io.BytesIO(r.content))
-        csv_filename = z.namelist()[0]
-        
-        print(f"  Processing {date} in chunks (Low RAM mode)...")
-        
-        with z.open(csv_filename) as f:
-            writer = None
-            
-            # Read CSV in chunks of 500,000 rows (Approx 50MB RAM)
-            chunk_iterator = pd.read_csv(
-                f, 
-                names=["id", "price", "qty", "q_qty", "time", "ibm", "ibm2"], 
-                chunksize=500000
-            )
-            
-            for i, chunk in enumerate(chunk_iterator):
-                # 1. Optimize Types immediately to save RAM
-                df_chunk = chunk[['time', 'price', 'qty', 'ibm']].copy()
-                df_chunk['time'] = df_chunk['time'].astype('uint64')
-                df_chunk['price'] = df_chunk['price'].astype('float32')
-                df_chunk['qty'] = df_chunk['qty'].astype('float32')
-                
-                # 2. Create Parquet Writer on first chunk
-                if writer is None:
-                    table = pa.Table.from_pandas(df_chunk)
-                    writer = pq.ParquetWriter(output, table.schema)
-                
-                # 3. Write chunk to disk and clear from RAM
-                table = pa.Table.from_pandas(df_chunk)
+_print_lock = threading.Lock()
+
+def log(msg):
+    with _print_lock: # Months report from several threads
+        print(msg, flush=True)
+
+def archive_name(symbol, month):
+    return f"{symbol}-trades-{month}.zip"
+
+def is_local(source):
+    return not source.startswith(("http://", "https://"))
+
+def fetch_archive(source, symbol, month, cache_dir):
+    """Path of the month's zip: used in place from a local source, otherwise
+    streamed to cache_dir (.part until complete, then renamed)"""
+    name = archive_name(symbol, month)
+    if is_local(source):
+        path = os.path.join(source, name)
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        return path
+
+    path = os.path.join(cache_dir, name)
+    if os.path.exists(path) and zipfile.is_zipfile(path):
+        return path # Finished by an earlier run
+
+    import requests # Only needed for remote sources
+    part = path + ".part"
+    with requests.get(f"{source.rstrip('/')}/{symbol}/{name}", stream=True, timeout=60) as r:
+        r.raise_for_status()
+        with open(part, "wb") as f:
+            for chunk in r.iter_content(DOWNLOAD_CHUNK):
+                f.write(chunk)
+    if not zipfile.is_zipfile(part):
+        os.remove(part)
+        raise IOError(f"{name}: download is not a valid zip")
+    os.replace(part, path)
+    return path
+
+def convert_archive(zip_path, output):
+    """Streams the zip's CSV through Arrow into output (written as .tmp, renamed at the end). Returns rows."""
+    tmp = output + ".tmp"
+    rows = 0
+    with zipfile.ZipFile(zip_path) as z:
+        member = z.namelist()[0]
+        # Some archives start with a header line, most don't
+        with z.open(member) as f:
+            has_header = not f.read(1).isdigit()
+
+        read_options = pcsv.ReadOptions(column_names=CSV_COLUMNS, skip_rows=int(has_header), block_size=CSV_BLOCK_SIZE, use_threads=True)
+        convert_options = pcsv.ConvertOptions(
+            include_columns=["time", "price", "qty", "ibm"],
+            column_types={"time": pa.uint64(), "price": pa.float64(), "qty": pa.float64(), "ibm": pa.bool_()},
+        )
+        with z.open(member) as f, pq.ParquetWriter(tmp, SCHEMA) as writer:
+            reader = pcsv.open_csv(f, read_options=read_options, convert_options=convert_options)
+            for batch in reader:
+                # CSV decimals -> float64 -> float32 (same rounding as the old pandas path)
+                table = pa.Table.from_batches([batch]).select(SCHEMA.names).cast(SCHEMA)
                 writer.write_table(table)
-                
-                if i % 10 == 0:
-                    print(f"    Processed chunk {i}...")
-
-            if writer:
-                writer.close()
-                
-        print(f"  Saved: {output}")
-        
-    except Exception as e:
-        print(f"Failed to process {date}: {e}")
\ No newline at end of file
+                rows += len(table)
+    os.replace(tmp, output)
+    return rows
+
+def ingest_month(source, symbol, month, out_dir, keep_archives=False):
+    output = os.path.join(out_dir, f"{symbol}-{month}.parquet")
+    if os.path.exists(output):
+        log(f"[Download] {month}: already converted, skipping")
+        return month, 0, 0.0
+
+    start_time = time.time()
+    cache_dir = os.path.join(out_dir, ".archives")
+    os.makedirs(cache_dir, exist_ok=True)
+    zip_path = fetch_archive(source, symbol, month, cache_dir)
+    log(f"[Download] {month}: archive ready ({os.path.getsize(zip_path) / 1e6:,.0f} MB), converting...")
+    rows = convert_archive(zip_path, output)
+
+    if not is_local(source) and not keep_archives:
+        os.remove(zip_path)
+    elapsed = time.time() - start_time
+    log(f"[Download] {month}: saved {output} ({rows:,} trades, {elapsed:.1f}s)")
+    return month, rows, elapsed
+
+def ingest(months, source=BASE_URL, out_dir=DATA_DIR, symbol=SYMBOL, workers=WORKERS, keep_archives=False):
+    """Converts every month (workers at a time). Failed months are reported and retried on the next run."""
+    os.makedirs(out_dir, exist_ok=True)
+    done, failed = [], []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        jobs = {pool.submit(ingest_month, source, symbol, m, out_dir, keep_archives): m for m in months}
+        for job in as_completed(jobs):
+            try:
+                done.append(job.result())
+            except Exception as e:
+                log(f"[Download] {jobs[job]}: FAILED ({e})")
+                failed.append(jobs[job])
+
+    cache_dir = os.path.join(out_dir, ".archives")
+    if os.path.isdir(cache_dir) and not os.listdir(cache_dir):
+        shutil.rmtree(cache_dir)
+    return sorted(done), sorted(failed)
+
+def main():
+    parser = argparse.ArgumentParser(description="Download Binance trade archives into parquet")
+    parser.add_argument("--months", nargs="+", default=MONTHS, help="YYYY-MM ...")
+    parser.add_argument("--symbol", default=SYMBOL)
+    parser.add_argument("--source", default=BASE_URL, help="base URL, or a local directory of <SYMBOL>-trades-<YYYY-MM>.zip")
+    parser.add_argument("--out", default=DATA_DIR)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--keep-archives", action="store_true", help="keep downloaded zips after conversion")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    done, failed = ingest(args.months, args.source, args.out, args.symbol, args.workers, args.keep_archives)
+    rows = sum(r for _, r, _ in done)
+    print(f"[Download] {len(done)} month(s) ok, {rows:,} trades converted in {time.time() - start_time:.1f}s")
+    if failed:
+        print(f"[Download] Failed: {', '.join(failed)} (run again to retry)")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,10 @@
 #ifndef HYDRA_SCHEMA_H
 #define HYDRA_SCHEMA_H
 
+#include <cstddef>
 #include <cstdint>
 
 const char SHM_NAME[] = "/hydra_shm";
-const size_t SHM_SIZE = 4096; 
 
 // 1. Market & Account Data (C++ -> Python)
 struct MarketState {
@@ -28,12 +28,80 @@ struct StrategyCommand {
     int action;               // 1=BUY, 2=SELL
     double quantity;
     double price;             
+    uint64_t write_ns;        // CLOCK_MONOTONIC when the strategy wrote this command (0 = not instrumented)
+    uint64_t tick_recv_ns;    // recv_ns of the tick that triggered it
 };
 
-// 3. Master Layout
+// 3. Tick Ring (C++ -> Python), single producer / single consumer per reader
+// Every bookTicker message gets its own slot, so ticks inside the same
+// millisecond are no longer overwritten before Python sees them.
+const uint64_t TICK_RING_CAPACITY = 65536; // Power of 2 (~4 MB)
+
+struct TickRecord {
+    uint64_t seq;              // Sequence number of the tick in this slot (0 = being written)
+    uint64_t local_time_ms;
+    double bid_price;
+    double bid_qty;
+    double ask_price;
+    double ask_qty;
+    uint64_t recv_ns;          // CLOCK_MONOTONIC when the websocket frame was read
+    uint64_t publish_ns;       // CLOCK_MONOTONIC right before the slot was stamped
+};
+
+struct TickRing {
+    uint64_t write_seq;        // Last published sequence number (1, 2, 3, ...)
+    uint64_t capacity;         // = TICK_RING_CAPACITY, lets readers sanity-check the build
+    uint32_t doorbell;         // Futex word: bumped after every publish
+    uint32_t doorbell_armed;   // Set by the reader only while it may sleep on the doorbell -> producer issues FUTEX_WAKE
+    uint8_t _pad[40];          // Keep the producer cursor on its own cache line
+    TickRecord slots[TICK_RING_CAPACITY];
+};
+
+// 4. Latency Histograms (both sides write, hydra_brain/latency.py reads)
+// All stage timestamps are CLOCK_MONOTONIC ns (steady_clock / time.monotonic_ns),
+// except exchange -> receive which compares the exchange's event time with the wall clock.
+enum LatencyStage {
+    LAT_EXCHANGE_TO_RECV = 0,  // C++ feed  (only when the stream carries an event time "E")
+    LAT_RECV_TO_PUBLISH,       // C++ feed  (parse + snapshot + ring write)
+    LAT_PUBLISH_TO_READ,       // Python    (ring -> strategy process)
+    LAT_READ_TO_DECISION,      // Python    (strategy logic)
+    LAT_DECISION_TO_COMMAND,   // Python    (order checks + command write)
+    LAT_COMMAND_TO_PICKUP,     // C++ exec  (command write -> execution_loop sees it)
+    LAT_PICKUP_TO_FILL,        // C++ exec  (simulated latency + waiting for the cross)
+    LAT_TICK_TO_ORDER,         // End to end: websocket read -> command write
+    LAT_STAGES
+};
+
+// Log-linear buckets: values 0..7 exact, then 8 sub-buckets per power of two (<= 12.5% wide)
+const uint32_t LAT_BUCKETS = 320;
+
+inline uint32_t latency_bucket(uint64_t ns) {
+    if (ns < 8) return static_cast<uint32_t>(ns);
+    uint32_t e = 63 - __builtin_clzll(ns);                 // floor(log2(ns)) >= 3
+    uint32_t idx = (e - 2) * 8 + ((ns >> (e - 3)) & 7);
+    return idx < LAT_BUCKETS ? idx : LAT_BUCKETS - 1;
+}
+
+struct LatencyHistograms {
+    uint64_t counts[LAT_STAGES][LAT_BUCKETS];   // One writer per stage; relaxed atomic adds in C++
+    uint64_t max_ns[LAT_STAGES];
+};
+
+// 5. Master Layout
 struct SharedMemoryLayout {
     MarketState market;
     StrategyCommand command;
+    uint8_t _pad0[16];         // Ring starts on a fresh cache line
+    TickRing ticks;
+    LatencyHistograms latency;
 };
 
+const size_t SHM_SIZE = sizeof(SharedMemoryLayout);
+
+// Python mirrors this layout byte for byte (shared_defs/schema.py)
+static_assert(sizeof(MarketState) == 64, "MarketState layout changed");
+static_assert(sizeof(StrategyCommand) == 48, "StrategyCommand layout changed");
+static_assert(sizeof(TickRecord) == 64, "TickRecord layout changed");
+static_assert(offsetof(SharedMemoryLayout, ticks) % 64 == 0, "Tick ring must be cache-line aligned");
+
 #endif
\ No newline at end of file
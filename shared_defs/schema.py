@@ -22,13 +22,72 @@ class StrategyCommand(ctypes.Structure):
         ("action", ctypes.c_int),
         ("quantity", ctypes.c_double),
         ("price", ctypes.c_double),
+        ("write_ns", ctypes.c_uint64), # time.monotonic_ns() at command write (0 = not instrumented)
+        ("tick_recv_ns", ctypes.c_uint64), # recv_ns of the tick that triggered it
+    ]
+
+# Tick Ring (C++ -> Python): one slot per bookTicker message
+TICK_RING_CAPACITY = 65536 # Must match schema.h
+
+class TickRecord(ctypes.Structure):
+    _fields_ = [
+        ("seq", ctypes.c_uint64), # 0 while the producer is writing the slot
+        ("local_time_ms", ctypes.c_uint64),
+        ("bid_price", ctypes.c_double),
+        ("bid_qty", ctypes.c_double),
+        ("ask_price", ctypes.c_double),
+        ("ask_qty", ctypes.c_double),
+        ("recv_ns", ctypes.c_uint64), # CLOCK_MONOTONIC at websocket read
+        ("publish_ns", ctypes.c_uint64), # CLOCK_MONOTONIC right before the slot was stamped
+    ]
+
+class TickRing(ctypes.Structure):
+    _fields_ = [
+        ("write_seq", ctypes.c_uint64),
+        ("capacity", ctypes.c_uint64),
+        ("doorbell", ctypes.c_uint32), # Futex word, bumped after every publish
+        ("doorbell_armed", ctypes.c_uint32),
+        ("_pad", ctypes.c_uint8 * 40),
+        ("slots", TickRecord * TICK_RING_CAPACITY),
+    ]
+
+# Latency Histograms (stage order must match enum LatencyStage in schema.h)
+LAT_STAGE_NAMES = [
+    "exchange -> recv",
+    "recv -> publish",
+    "publish -> read",
+    "read -> decision",
+    "decision -> command",
+    "command -> pickup",
+    "pickup -> fill",
+    "tick -> order",
+]
+(LAT_EXCHANGE_TO_RECV, LAT_RECV_TO_PUBLISH, LAT_PUBLISH_TO_READ, LAT_READ_TO_DECISION,
+ LAT_DECISION_TO_COMMAND, LAT_COMMAND_TO_PICKUP, LAT_PICKUP_TO_FILL, LAT_TICK_TO_ORDER) = range(8)
+LAT_STAGES = len(LAT_STAGE_NAMES)
+LAT_BUCKETS = 320
+
+def latency_bucket(ns):
+    """Same log-linear bucketing as latency_bucket() in schema.h"""
+    if ns < 8:
+        return max(int(ns), 0)
+    e = int(ns).bit_length() - 1
+    return min((e - 2) * 8 + ((int(ns) >> (e - 3)) & 7), LAT_BUCKETS - 1)
+
+class LatencyHistograms(ctypes.Structure):
+    _fields_ = [
+        ("counts", (ctypes.c_uint64 * LAT_BUCKETS) * LAT_STAGES),
+        ("max_ns", ctypes.c_uint64 * LAT_STAGES),
     ]
 
 class SharedMemoryLayout(ctypes.Structure):
     _fields_ = [
         ("market", MarketState),
         ("command", StrategyCommand),
+        ("_pad0", ctypes.c_uint8 * 16),
+        ("ticks", TickRing),
+        ("latency", LatencyHistograms),
     ]
 
 SHM_NAME = "/hydra_shm"
-SHM_SIZE = 4096
\ No newline at end of file
+SHM_SIZE = ctypes.sizeof(SharedMemoryLayout)